@@ -2,9 +2,21 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict
 
+from core.metrics import instrument_adapter_method
+
 class BaseAdapter(ABC):
     """Base adapter interface for scrapers."""
 
+    # Calls to these are timed per adapter class (see core.metrics)
+    TIMED_METHODS = ("search", "fetch_product")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in cls.TIMED_METHODS:
+            method = cls.__dict__.get(name)
+            if callable(method) and not getattr(method, "__instrumented__", False):
+                setattr(cls, name, instrument_adapter_method(name, method))
+
     @abstractmethod
     def search(self, query: str, max_results: int = 10) -> List[Dict]:
         pass
@@ -3,17 +3,16 @@ from .base import BaseAdapter
 import random
 import time
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from core.embeddings import get_model
 
 class DevMockAdapter(BaseAdapter):
     def __init__(self, source_name="dev_mock"):
         self.source = source_name
-        # Initialize semantic matching model
-        try:
-            self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        except:
-            self.model = None  # Fallback if model not available
+
+    @property
+    def model(self):
+        # Semantic matching model, shared and loaded on first search (None if unavailable)
+        return get_model()
 
     def search(self, query: str, max_results: int = 5):
         now = int(time.time())
@@ -41,11 +40,14 @@ class DevMockAdapter(BaseAdapter):
         # Semantic product matching using sentence transformers
         matching_products = []
         
-        if self.model:
+        model = self.model
+        if model:
+            from sklearn.metrics.pairwise import cosine_similarity
+            
             # Use semantic matching
-            query_embedding = self.model.encode([query])
+            query_embedding = model.encode([query])
             product_names = [p["name"] for p in product_database]
-            product_embeddings = self.model.encode(product_names)
+            product_embeddings = model.encode(product_names)
             
             # Calculate similarity scores
             similarities = cosine_similarity(query_embedding, product_embeddings)[0]
@@ -1,6 +1,16 @@
 # backend/api/__init__.py
 from flask import Blueprint, jsonify, request
 
+# Fields clients may request through ?fields= on the listing endpoints
+TRACKED_PRODUCT_FIELDS = (
+    "product_name", "current_price", "target_price", "user_email", "product_url",
+    "image_url", "platform", "created_at", "is_active", "notifications_sent"
+)
+NOTIFICATION_FIELDS = (
+    "product_name", "old_price", "new_price", "target_price", "savings", "user_email",
+    "user_id", "type", "message", "product_id", "created_at", "is_read", "read"
+)
+
 def create_api_blueprint():
     api = Blueprint("api", __name__)
     
@@ -36,6 +46,20 @@ def create_api_blueprint():
     except Exception as e:
         print(f"❌ Notifications blueprint failed: {e}")
 
+    try:
+        from .admin import bp as admin_bp
+        api.register_blueprint(admin_bp, url_prefix="/admin")
+        print("✅ Admin blueprint registered")
+    except Exception as e:
+        print(f"❌ Admin blueprint failed: {e}")
+
+    try:
+        from .products import bp as products_bp
+        api.register_blueprint(products_bp, url_prefix="/products")
+        print("✅ Products blueprint registered")
+    except Exception as e:
+        print(f"❌ Products blueprint failed: {e}")
+
     # API Health check
     @api.route("/health", methods=["GET"])
     def api_health():
@@ -52,11 +76,53 @@ def create_api_blueprint():
         except Exception as e:
             return jsonify({"status": "error", "message": str(e)}), 500
     
+    def run_search(query, max_results):
+        from adapters.dev_mock import DevMockAdapter
+        
+        # Use universal adapter for all products
+        from adapters.universal_adapter import UniversalAdapter
+        universal_adapter = UniversalAdapter()
+        results = universal_adapter.search(query, max_results)
+        
+        # Add price comparison and recommendations
+        mock_adapter = DevMockAdapter()
+        recommendations = mock_adapter.get_search_recommendations(query)
+        
+        # Group results by product and find best prices
+        grouped_results = {}
+        for result in results:
+            product_name = result["title"]
+            if product_name not in grouped_results:
+                grouped_results[product_name] = []
+            grouped_results[product_name].append(result)
+        
+        # Add best price indicators
+        final_results = []
+        for product_name, product_variants in grouped_results.items():
+            if len(product_variants) > 1:
+                # Find best price
+                best_price = min(p["price"] for p in product_variants)
+                for variant in product_variants:
+                    variant["is_best_price"] = variant["price"] == best_price
+                    if variant["is_best_price"]:
+                        variant["recommendation"] = "💰 Best Price!"
+                    else:
+                        savings = variant["price"] - best_price
+                        variant["recommendation"] = f"💸 ${savings:.2f} more than best price"
+                    final_results.append(variant)
+            else:
+                product_variants[0]["is_best_price"] = True
+                product_variants[0]["recommendation"] = "💰 Best Price!"
+                final_results.append(product_variants[0])
+        
+        return {"results": final_results, "recommendations": recommendations}
+    
     @api.route("/search", methods=["POST"])
     def simple_search():
         try:
-            from adapters.realtime_adapter import RealtimeAdapter
-            from adapters.dev_mock import DevMockAdapter
+            from flask import current_app
+            from core.compression import EncodedBody
+            from services.search_cache import get_search_cache, search_key
             
             data = request.get_json() or {}
             query = data.get("query", "")
@@ -65,43 +131,16 @@ def create_api_blueprint():
             if not query:
                 return jsonify({"error": "Query required"}), 400
             
-            # Use universal adapter for all products
-            from adapters.universal_adapter import UniversalAdapter
-            universal_adapter = UniversalAdapter()
-            results = universal_adapter.search(query, max_results)
-            
-            # Add price comparison and recommendations
-            mock_adapter = DevMockAdapter()
-            recommendations = mock_adapter.get_search_recommendations(query)
-            
-            # Group results by product and find best prices
-            grouped_results = {}
-            for result in results:
-                product_name = result["title"]
-                if product_name not in grouped_results:
-                    grouped_results[product_name] = []
-                grouped_results[product_name].append(result)
-            
-            # Add best price indicators
-            final_results = []
-            for product_name, product_variants in grouped_results.items():
-                if len(product_variants) > 1:
-                    # Find best price
-                    best_price = min(p["price"] for p in product_variants)
-                    for variant in product_variants:
-                        variant["is_best_price"] = variant["price"] == best_price
-                        if variant["is_best_price"]:
-                            variant["recommendation"] = "💰 Best Price!"
-                        else:
-                            savings = variant["price"] - best_price
-                            variant["recommendation"] = f"💸 ${savings:.2f} more than best price"
-                        final_results.append(variant)
-                else:
-                    product_variants[0]["is_best_price"] = True
-                    product_variants[0]["recommendation"] = "💰 Best Price!"
-                    final_results.append(product_variants[0])
-            
-            return jsonify({"results": final_results, "recommendations": recommendations}), 200
+            # Cached as encoded (and, once requested, compressed) bytes
+            provider = current_app.json
+            body, state = get_search_cache(current_app.config).get(
+                search_key(query, max_results),
+                None,
+                lambda: EncodedBody.from_obj(run_search(query, max_results), provider)
+            )
+            response = body.to_response()
+            response.headers["X-Cache"] = state
+            return response
         except Exception as e:
             return jsonify({"error": f"Search failed: {str(e)}"}), 500
     
@@ -228,10 +267,38 @@ def create_api_blueprint():
         try:
             from flask import current_app
             
-            db = current_app.db
-            products = list(db.tracked_products.find({"is_active": True}).sort("created_at", -1))
+            from core.pagination import (
+                InvalidCursor, iterate, paginate, paging_requested, parse_page_size, parse_fields
+            )
+            from core.streaming import ndjson_response, stream_batch_size, wants_ndjson
             
-            return jsonify({"products": products}), 200
+            db = current_app.db
+            projection = parse_fields(request.args.get("fields"), TRACKED_PRODUCT_FIELDS)
+            try:
+                if wants_ndjson():
+                    # Whole result set, one product per line, in constant memory
+                    return ndjson_response(iterate(
+                        db.tracked_products,
+                        {"is_active": True},
+                        cursor=request.args.get("cursor"),
+                        projection=projection,
+                        batch_size=stream_batch_size()
+                    ))
+                if not paging_requested(request.args):
+                    # Clients that don't page get every active product, as before pagination
+                    products = list(iterate(db.tracked_products, {"is_active": True}, projection=projection))
+                    return jsonify({"products": products}), 200
+                products, next_cursor = paginate(
+                    db.tracked_products,
+                    {"is_active": True},
+                    limit=parse_page_size(request.args.get("limit")),
+                    cursor=request.args.get("cursor"),
+                    projection=projection
+                )
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
+            
+            return jsonify({"products": products, "next_cursor": next_cursor}), 200
         except Exception as e:
             return jsonify({"error": f"Failed to get products: {str(e)}"}), 500
     
@@ -241,10 +308,26 @@ def create_api_blueprint():
         try:
             from flask import current_app
             
-            db = current_app.db
-            notifications = list(db.notifications.find().sort("created_at", -1).limit(50))
+            from core.pagination import InvalidCursor, paginate, parse_page_size, parse_fields
             
-            return jsonify({"notifications": notifications}), 200
+            db = current_app.db
+            try:
+                notifications, next_cursor = paginate(
+                    db.notifications,
+                    {},
+                    limit=parse_page_size(request.args.get("limit")),
+                    cursor=request.args.get("cursor"),
+                    projection=parse_fields(request.args.get("fields"), NOTIFICATION_FIELDS)
+                )
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
+            
+            for notification in notifications:
+                notification["_id"] = str(notification["_id"])
+                if notification.get("product_id"):
+                    notification["product_id"] = str(notification["product_id"])
+            
+            return jsonify({"notifications": notifications, "next_cursor": next_cursor}), 200
         except Exception as e:
             return jsonify({"error": f"Failed to get notifications: {str(e)}"}), 500
     
@@ -338,6 +421,8 @@ Happy price tracking! 🐦💰
                 
                 if price_dropped:
                     # Create notification
+                    from services.notifications import notification_expires_at
+                    created_at = datetime.utcnow()
                     notification = {
                         "_id": str(uuid.uuid4()),
                         "product_name": product["product_name"],
@@ -346,8 +431,9 @@ Happy price tracking! 🐦💰
                         "target_price": product["target_price"],
                         "savings": current_price - new_price,
                         "user_email": product["user_email"],
-                        "created_at": datetime.utcnow(),
-                        "is_read": False,
+                        "created_at": created_at,
+                        "expires_at": notification_expires_at("price_drop", created_at),
+                        "read": False,
                         "type": "price_drop"
                     }
                     
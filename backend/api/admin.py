@@ -0,0 +1,120 @@
+# backend/api/admin.py
+import logging
+from functools import wraps
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+
+from core.db import get_db
+
+logger = logging.getLogger(__name__)
+bp = Blueprint("admin", __name__)
+
+def admin_required(fn):
+    """Require a JWT whose identity is listed in ADMIN_USER_IDS."""
+    @wraps(fn)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if get_jwt_identity() not in current_app.config.get("ADMIN_USER_IDS", []):
+            return jsonify({"status": "error", "message": "Admin access required"}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+@bp.route("/refresh-runs", methods=["GET"])
+@admin_required
+def get_refresh_runs():
+    """Get recent price refresh runs with their counts, timings and errors."""
+    try:
+        from jobs.runs import RefreshRunStore
+        
+        limit = min(request.args.get("limit", default=50, type=int), 500)
+        shard = request.args.get("shard", default=None, type=int)
+        
+        runs = RefreshRunStore(get_db(), owner=None).recent(limit, shard)
+        for run in runs:
+            run["_id"] = str(run["_id"])
+            if run.get("checkpoint"):
+                run["checkpoint"]["_id"] = str(run["checkpoint"]["_id"])
+        
+        return jsonify({
+            "status": "success",
+            "count": len(runs),
+            "runs": runs
+        }), 200
+    except Exception as e:
+        logger.error(f"Error retrieving refresh runs: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to retrieve refresh runs"
+        }), 500
+
+SLOW_QUERY_SORTS = ("total_ms", "count", "max_ms", "avg_ms")
+
+@bp.route("/slow-queries", methods=["GET"])
+@admin_required
+def get_slow_queries():
+    """
+    Get recorded slow query shapes, worst first.
+    
+    Query params: limit, sort (total_ms, count, max_ms or avg_ms),
+    collscan=true to list only shapes whose explained plan scans the collection.
+    """
+    try:
+        from core.slow_queries import slow_query_report
+        
+        limit = min(request.args.get("limit", default=50, type=int), 500)
+        sort = request.args.get("sort", default="total_ms")
+        if sort not in SLOW_QUERY_SORTS:
+            return jsonify({"status": "error", "message": f"sort must be one of {', '.join(SLOW_QUERY_SORTS)}"}), 400
+        collscan_only = request.args.get("collscan", "").lower() in ("1", "true", "yes")
+        
+        queries = slow_query_report(get_db(), limit, sort, collscan_only)
+        return jsonify({
+            "status": "success",
+            "threshold_ms": current_app.config.get("SLOW_QUERY_THRESHOLD_MS", 100),
+            "count": len(queries),
+            "queries": queries
+        }), 200
+    except Exception as e:
+        logger.error(f"Error retrieving slow queries: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": "Failed to retrieve slow queries"
+        }), 500
+
+def _parse_date(value):
+    return datetime.fromisoformat(value) if value else None
+
+@bp.route("/export/price-history", methods=["GET"])
+@admin_required
+def export_price_history():
+    """
+    Stream price history as a single Parquet file.
+    
+    Query params: product_id (repeatable), since, until (ISO dates),
+    source, category.
+    """
+    from services.price_export import PYARROW_AVAILABLE, stream_parquet
+    
+    if not PYARROW_AVAILABLE:
+        return jsonify({"status": "error", "message": "Parquet export requires pyarrow"}), 501
+    
+    try:
+        filters = {
+            "product_ids": request.args.getlist("product_id") or None,
+            "since": _parse_date(request.args.get("since")),
+            "until": _parse_date(request.args.get("until")),
+            "source": request.args.get("source"),
+            "category": request.args.get("category")
+        }
+    except ValueError:
+        return jsonify({"status": "error", "message": "since/until must be ISO dates"}), 400
+    
+    db = get_db()
+    batch_rows = current_app.config.get("PRICE_EXPORT_BATCH_ROWS", 50000)
+    filename = f"price-history-{datetime.utcnow():%Y%m%dT%H%M%S}.parquet"
+    return Response(
+        stream_with_context(stream_parquet(db, batch_rows=batch_rows, **filters)),
+        mimetype="application/vnd.apache.parquet",
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
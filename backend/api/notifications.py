@@ -3,17 +3,25 @@ import logging
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
+from werkzeug.local import LocalProxy
 import smtplib
 from email.message import EmailMessage
 
-from services.notifications import NotificationService
+from services.notifications import get_notification_service
 from core.schemas import NotificationRequest
+from core.pagination import InvalidCursor, parse_page_size, parse_fields
 
 logger = logging.getLogger(__name__)
 bp = Blueprint("notifications", __name__)
 
-# Initialize notification service
-notification_service = NotificationService()
+# Service is built on first use, inside the app context (get_db needs one)
+notification_service = LocalProxy(get_notification_service)
+
+# Fields clients may request through ?fields=
+NOTIFICATION_FIELDS = (
+    "user_id", "type", "message", "product_id", "read", "created_at",
+    "old_price", "new_price", "url", "image_url", "product_name"
+)
 
 def send_email(to_email: str, subject: str, body: str):
     """Send an email notification."""
@@ -48,16 +56,21 @@ def get_notifications():
     user_id = get_jwt_identity()
     
     try:
-        limit = request.args.get("limit", default=50, type=int)
+        limit = parse_page_size(request.args.get("limit"))
         unread_only = request.args.get("unread_only", default=False, type=bool)
+        cursor = request.args.get("cursor")
+        projection = parse_fields(request.args.get("fields"), NOTIFICATION_FIELDS)
         
-        notifications = notification_service.get_notifications(user_id, limit, unread_only)
+        page = notification_service.get_notifications_page(user_id, limit, unread_only, cursor, projection)
         
         return jsonify({
             "status": "success",
-            "count": len(notifications),
-            "notifications": notifications
+            "count": len(page["notifications"]),
+            "notifications": page["notifications"],
+            "next_cursor": page["next_cursor"]
         }), 200
+    except InvalidCursor as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         logger.error(f"Error retrieving notifications: {str(e)}")
         return jsonify({
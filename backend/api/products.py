@@ -1,12 +1,25 @@
 # backend/api/products.py
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from datetime import datetime
 from core.db import get_db
+from core.http_cache import conditional, get_version_map
+from core.leases import random_shard_key
+from core.pagination import InvalidCursor, iterate, paginate, paging_requested, parse_page_size, parse_fields
+from core.streaming import ndjson_response, stream_batch_size, wants_ndjson
 from bson.objectid import ObjectId
 
 bp = Blueprint("products", __name__)
 
+# Fields clients may request through ?fields=
+PRODUCT_FIELDS = (
+    "name", "url", "image_url", "description", "current_price", "original_price",
+    "currency", "source", "category", "in_stock", "target_price", "created_at", "last_checked"
+)
+
 # -------------------- Existing Routes --------------------
 @bp.route("/<product_id>", methods=["GET"])
+@conditional("version")
 def get_product(product_id):
     db = get_db()
     p = db.products.find_one({"_id": ObjectId(product_id)})
@@ -19,16 +32,44 @@ def get_product(product_id):
 
 @bp.route("/", methods=["GET"])
 def list_products():
+    """
+    List products newest first.
+
+    Without ?limit= or ?cursor= the response is the original bare list of
+    up to 100 products; with either it is {items, next_cursor}.
+    """
     db = get_db()
-    items = []
-    for p in db.products.find().limit(100):
-        p["id"] = str(p["_id"])
-        p.pop("_id", None)
-        items.append(p)
-    return jsonify(items), 200
+    limit = parse_page_size(request.args.get("limit"), default=100)
+    # price_history is unbounded, so it is never returned from the listing
+    projection = parse_fields(request.args.get("fields"), PRODUCT_FIELDS) or {"price_history": 0}
+    try:
+        if wants_ndjson():
+            # Full export, one product per line, in constant memory
+            rows = iterate(
+                db.products, {}, cursor=request.args.get("cursor"), projection=projection,
+                batch_size=stream_batch_size()
+            )
+            return ndjson_response(rows, transform=_with_id)
+        products, next_cursor = paginate(
+            db.products, {}, limit=limit, cursor=request.args.get("cursor"), projection=projection
+        )
+    except InvalidCursor as e:
+        return jsonify({"error": str(e)}), 400
+
+    items = [_with_id(p) for p in products]
+    if not paging_requested(request.args):
+        return jsonify(items), 200
+    return jsonify({"items": items, "next_cursor": next_cursor}), 200
+
+
+def _with_id(product):
+    """Expose _id as a string id field."""
+    product["id"] = str(product.pop("_id"))
+    return product
 
 # -------------------- New Routes --------------------
 @bp.route("/", methods=["POST"])
+@jwt_required()
 def add_product():
     """Add a new product to track"""
     data = request.json
@@ -42,16 +83,20 @@ def add_product():
         "url": data["url"],
         "target_price": float(data["target_price"]),
         "current_price": None,
+        "created_at": datetime.utcnow(),
+        "shard_key": random_shard_key(),
     }
     result = db.products.insert_one(product)
     return jsonify({"message": "Product added", "id": str(result.inserted_id)}), 201
 
 
 @bp.route("/<product_id>", methods=["DELETE"])
+@jwt_required()
 def delete_product(product_id):
     """Delete a tracked product"""
     db = get_db()
     result = db.products.delete_one({"_id": ObjectId(product_id)})
+    get_version_map().invalidate(product_id)
     if result.deleted_count == 0:
         return jsonify({"error": "Product not found"}), 404
     return jsonify({"message": "Product deleted"}), 200
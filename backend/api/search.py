@@ -1,13 +1,21 @@
 # backend/api/search.py
 from flask import Blueprint, request, jsonify, current_app
-from adapters.dev_mock import DevMockAdapter
 
 bp = Blueprint("search", __name__)
 
-# adapter registry (simple)
+# adapter registry (simple): import path per name, instantiated on first use
 ADAPTERS = {
-    "mock": DevMockAdapter()
+    "mock": ("adapters.dev_mock", "DevMockAdapter")
 }
+_instances = {}
+
+def get_adapter(name: str):
+    adapter = _instances.get(name)
+    if adapter is None:
+        from importlib import import_module
+        module_name, class_name = ADAPTERS[name]
+        adapter = _instances[name] = getattr(import_module(module_name), class_name)()
+    return adapter
 
 @bp.route("/", methods=["GET", "POST"])
 def search():
@@ -21,7 +29,7 @@ def search():
             return jsonify({"error": "Query is required"}), 400
         
         # Use mock adapter
-        adapter = ADAPTERS["mock"]
+        adapter = get_adapter("mock")
         results = adapter.search(query, max_results)
         
         return jsonify({"results": results, "best": results[:3]}), 200
@@ -3,15 +3,23 @@ import logging
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from bson.objectid import ObjectId
+from werkzeug.local import LocalProxy
 
+from core.compression import EncodedBody
+from core.http_cache import conditional
 from core.schemas import TrackProductRequest, UpdateTrackingRequest
-from services.tracking import TrackingService
+from core.streaming import ndjson_response, stream_batch_size, wants_ndjson
+from services.tracking import get_tracking_service
 
 logger = logging.getLogger(__name__)
 bp = Blueprint("tracking", __name__)
 
-# Initialize services
-tracking_service = TrackingService()
+# Bounds for ?points= on the history endpoint
+MIN_CHART_POINTS = 10
+MAX_CHART_POINTS = 5000
+
+# Service is built on first use, inside the app context (get_db needs one)
+tracking_service = LocalProxy(get_tracking_service)
 
 @bp.route("/products", methods=["GET"])
 @jwt_required()
@@ -116,12 +124,24 @@ def update_tracking_preferences(product_id):
 
 @bp.route("/history/<product_id>", methods=["GET"])
 @jwt_required()
+@conditional("history_version", daily=True)
 def get_price_history(product_id):
     """Get price history for a product."""
     try:
         days = request.args.get("days", default=None, type=int)
+        points = request.args.get("points", default=None, type=int)
+        method = request.args.get("method", default="lttb")
+        if method not in ("lttb", "minmax"):
+            return jsonify({"status": "error", "message": "method must be 'lttb' or 'minmax'"}), 400
+        if points is not None:
+            points = max(MIN_CHART_POINTS, min(points, MAX_CHART_POINTS))
+        elif wants_ndjson():
+            # Full-resolution export, one point per line
+            return ndjson_response(
+                tracking_service.iter_price_history(product_id, days, batch_size=stream_batch_size())
+            )
         
-        price_history = tracking_service.get_price_history(product_id, days)
+        price_history = tracking_service.get_price_history(product_id, days, points, method)
         
         return jsonify({
             "status": "success",
@@ -135,19 +155,62 @@ def get_price_history(product_id):
             "message": "Failed to retrieve price history"
         }), 500
 
+def _cached(product_id: str, kind: str, days_ahead: int, compute, cacheable):
+    """
+    Serve a forecast-service result from the process-wide forecast cache.
+
+    compute(service, history_version) produces the result; results that
+    cacheable(result) rejects (errors, insufficient data, demo forecasts)
+    are returned without being cached. Entries are EncodedBody values, so a
+    hit reuses both the JSON encoding and any compressed variant produced
+    for an earlier client.
+    """
+    # Lazy import to avoid heavy dependencies at startup
+    from services.forecasting import get_forecasting_service
+    from services.forecast_cache import get_forecast_cache
+
+    forecasting_service = get_forecasting_service(current_app.db)
+    cache = get_forecast_cache(current_app.config)
+    provider = current_app.json  # revalidation runs off the request thread
+    version = forecasting_service.get_history_version(product_id)
+    rejected = []
+
+    def build():
+        result = compute(forecasting_service, version)
+        body = EncodedBody.from_obj(result, provider)
+        if not cacheable(result):
+            rejected.append(body)
+        return body
+
+    return cache.get(
+        (str(product_id), kind, days_ahead),
+        version,
+        build,
+        cacheable=lambda body: not any(body is r for r in rejected)
+    )
+
 @bp.route("/forecast/<product_id>", methods=["GET"])
 @jwt_required()
 def forecast_product_price(product_id):
     """Get price forecast for a product."""
     try:
         days_ahead = request.args.get("days", default=7, type=int)
-        # Lazy import to avoid heavy dependencies at startup
-        from services.forecasting import ForecastingService
-        forecasting_service = ForecastingService()
+        max_age_hours = current_app.config.get("FORECAST_MAX_AGE_HOURS", 24)
+
+        from services.forecasting import is_storable
 
-        forecast = forecasting_service.forecast_price(product_id, days_ahead)
+        # Serve the stored forecast when it matches the current history; refit otherwise
+        forecast, state = _cached(
+            product_id, "forecast", days_ahead,
+            lambda service, version: service.get_or_create_forecast(
+                product_id, days_ahead, max_age_hours, history_version=version
+            ),
+            is_storable
+        )
         
-        return jsonify(forecast), 200
+        response = forecast.to_response()
+        response.headers["X-Cache"] = state
+        return response, 200
     except Exception as e:
         logger.error(f"Error generating price forecast: {str(e)}")
         return jsonify({
@@ -157,16 +220,19 @@ def forecast_product_price(product_id):
 
 @bp.route("/analysis/<product_id>", methods=["GET"])
 @jwt_required()
+@conditional("history_version", daily=True)
 def get_price_analysis(product_id):
     """Get price analysis for a product."""
     try:
-        # Lazy import to avoid heavy dependencies at startup
-        from services.forecasting import ForecastingService
-        forecasting_service = ForecastingService()
-
-        analysis = forecasting_service.get_historical_analysis(product_id)
+        analysis, state = _cached(
+            product_id, "analysis", 0,
+            lambda service, version: service.get_historical_analysis(product_id),
+            lambda result: result.get("status") == "success"
+        )
         
-        return jsonify(analysis), 200
+        response = analysis.to_response()
+        response.headers["X-Cache"] = state
+        return response, 200
     except Exception as e:
         logger.error(f"Error analyzing price history: {str(e)}")
         return jsonify({
@@ -3,8 +3,11 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
+from core.compression import init_compression
 from core.db import init_db
-from core.utils import setup_logging
+from core.json_provider import init_json
+from core.metrics import init_metrics
+from core.utils import setup_logging, parse_int_mapping
 from api import create_api_blueprint
 from jobs.scheduler import init_scheduler
 
@@ -15,6 +18,8 @@ def create_app(config_object=None):
     load_dotenv()
 
     app = Flask(__name__, instance_relative_config=False)
+    # orjson-backed JSON: ObjectId, datetime, Decimal, NumPy and Pydantic out of the box
+    init_json(app)
 
     # Core configuration
     app.config.from_mapping(
@@ -26,10 +31,72 @@ def create_app(config_object=None):
         # Email configuration
         SENDER_EMAIL=os.getenv("SENDER_EMAIL"),
         SENDER_EMAIL_PASSWORD=os.getenv("SENDER_EMAIL_PASSWORD"),
+        # Notification retention (enforced by a TTL index on expires_at)
+        NOTIFICATION_RETENTION_DAYS=int(os.getenv("NOTIFICATION_RETENTION_DAYS", 30)),
+        NOTIFICATION_RETENTION_BY_TYPE=parse_int_mapping(os.getenv("NOTIFICATION_RETENTION_BY_TYPE", "")),
+        NOTIFICATION_ARCHIVE_READ=os.getenv("NOTIFICATION_ARCHIVE_READ", "false").lower() == "true",
+        NOTIFICATION_ARCHIVE_AFTER_DAYS=int(os.getenv("NOTIFICATION_ARCHIVE_AFTER_DAYS", 7)),
+        # Adaptive price refresh scheduling
+        REFRESH_BATCH_SIZE=int(os.getenv("REFRESH_BATCH_SIZE", 500)),
+        REFRESH_BASE_INTERVAL_HOURS=float(os.getenv("REFRESH_BASE_INTERVAL_HOURS", 6)),
+        REFRESH_MIN_INTERVAL_MINUTES=float(os.getenv("REFRESH_MIN_INTERVAL_MINUTES", 30)),
+        REFRESH_MAX_INTERVAL_HOURS=float(os.getenv("REFRESH_MAX_INTERVAL_HOURS", 48)),
+        # Job coordination across workers/hosts
+        SCHEDULER_ENABLED=os.getenv("SCHEDULER_ENABLED", "true").lower() == "true",
+        REFRESH_SHARDS=int(os.getenv("REFRESH_SHARDS", 16)),
+        JOB_LEASE_TTL_SECONDS=int(os.getenv("JOB_LEASE_TTL_SECONDS", 300)),
+        SINGLETON_JOB_LEASE_SECONDS=int(os.getenv("SINGLETON_JOB_LEASE_SECONDS", 3600)),
+        REFRESH_CHUNK_SIZE=int(os.getenv("REFRESH_CHUNK_SIZE", 200)),
+        REFRESH_CHECKPOINT_EVERY=int(os.getenv("REFRESH_CHECKPOINT_EVERY", 100)),
+        REFRESH_RUN_RETENTION_DAYS=float(os.getenv("REFRESH_RUN_RETENTION_DAYS", 30)),
+        # Forecasting
+        FORECAST_DAYS_AHEAD=int(os.getenv("FORECAST_DAYS_AHEAD", 14)),
+        FORECAST_MAX_AGE_HOURS=float(os.getenv("FORECAST_MAX_AGE_HOURS", 24)),
+        FORECAST_WORKERS=int(os.getenv("FORECAST_WORKERS", 0)),  # 0 = one per CPU core
+        FORECAST_FIT_TIMEOUT_SECONDS=float(os.getenv("FORECAST_FIT_TIMEOUT_SECONDS", 30)),
+        FORECAST_INTERVAL_MINUTES=int(os.getenv("FORECAST_INTERVAL_MINUTES", 60)),
+        FORECAST_BATCH_SIZE=int(os.getenv("FORECAST_BATCH_SIZE", 2000)),
+        FORECAST_PROPHET_MAPE_THRESHOLD=float(os.getenv("FORECAST_PROPHET_MAPE_THRESHOLD", 0.05)),
+        FORECAST_CACHE_SIZE=int(os.getenv("FORECAST_CACHE_SIZE", 1024)),
+        FORECAST_CACHE_MAX_AGE_SECONDS=float(os.getenv("FORECAST_CACHE_MAX_AGE_SECONDS", 3600)),
+        PRICE_HISTORY_HOT_DAYS=int(os.getenv("PRICE_HISTORY_HOT_DAYS", 180)),
+        PRICE_HISTORY_COMPACT_BATCH=int(os.getenv("PRICE_HISTORY_COMPACT_BATCH", 1000)),
+        PRICE_EXPORT_BATCH_ROWS=int(os.getenv("PRICE_EXPORT_BATCH_ROWS", 50000)),
+        # Streaming NDJSON listings (Accept: application/x-ndjson)
+        NDJSON_BATCH_SIZE=int(os.getenv("NDJSON_BATCH_SIZE", 500)),
+        NDJSON_FLUSH_BYTES=int(os.getenv("NDJSON_FLUSH_BYTES", 65536)),
+        # Conditional GETs: per-worker map of product versions used to answer 304s
+        HTTP_CACHE_VERSION_MAP_SIZE=int(os.getenv("HTTP_CACHE_VERSION_MAP_SIZE", 10000)),
+        HTTP_CACHE_VERSION_TTL_SECONDS=float(os.getenv("HTTP_CACHE_VERSION_TTL_SECONDS", 5)),
+        # Response compression (brotli when installed, else gzip) above a minimum size
+        COMPRESS_ENABLED=os.getenv("COMPRESS_ENABLED", "true").lower() == "true",
+        COMPRESS_MIN_SIZE=int(os.getenv("COMPRESS_MIN_SIZE", 1024)),
+        COMPRESS_GZIP_LEVEL=int(os.getenv("COMPRESS_GZIP_LEVEL", 6)),
+        COMPRESS_BROTLI_QUALITY=int(os.getenv("COMPRESS_BROTLI_QUALITY", 4)),
+        SEARCH_CACHE_SIZE=int(os.getenv("SEARCH_CACHE_SIZE", 512)),
+        SEARCH_CACHE_TTL_SECONDS=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", 300)),
+        # Prometheus metrics at /metrics (multiprocess when PROMETHEUS_MULTIPROC_DIR is set)
+        METRICS_ENABLED=os.getenv("METRICS_ENABLED", "true").lower() == "true",
+        # Slow-query detector: commands over the threshold are aggregated by shape,
+        # flushed to db.slow_queries and the worst ones explained periodically
+        SLOW_QUERY_ENABLED=os.getenv("SLOW_QUERY_ENABLED", "true").lower() == "true",
+        SLOW_QUERY_THRESHOLD_MS=float(os.getenv("SLOW_QUERY_THRESHOLD_MS", 100)),
+        SLOW_QUERY_FLUSH_SECONDS=float(os.getenv("SLOW_QUERY_FLUSH_SECONDS", 60)),
+        SLOW_QUERY_EXPLAIN_TOP=int(os.getenv("SLOW_QUERY_EXPLAIN_TOP", 5)),
+        SLOW_QUERY_EXPLAIN_MINUTES=float(os.getenv("SLOW_QUERY_EXPLAIN_MINUTES", 60)),
+        SLOW_QUERY_RETENTION_DAYS=int(os.getenv("SLOW_QUERY_RETENTION_DAYS", 14)),
+        # Comma-separated user ids allowed to use /api/admin
+        ADMIN_USER_IDS=[u.strip() for u in os.getenv("ADMIN_USER_IDS", "").split(",") if u.strip()],
     )
 
     # Enable CORS (for frontend communication)
     CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+    # gzip/brotli for large JSON responses, negotiated per request
+    init_compression(app)
+
+    # Per-route latency histograms and the Prometheus /metrics endpoint
+    init_metrics(app)
     
     # Initialize JWT Manager
     jwt = JWTManager(app)
@@ -62,12 +129,14 @@ def create_app(config_object=None):
             "environment": app.config["ENV"]
         }), 200
 
-    # Scheduler Initialization
-    try:
-        init_scheduler(app)
-        logger.info("✅ Background scheduler initialized.")
-    except Exception as e:
-        logger.error(f"❌ Failed to start scheduler: {e}")
+    # Scheduler Initialization (jobs coordinate through leases, so running it
+    # in every worker is safe; set SCHEDULER_ENABLED=false to use jobs/worker.py only)
+    if app.config["SCHEDULER_ENABLED"]:
+        try:
+            init_scheduler(app)
+            logger.info("✅ Background scheduler initialized.")
+        except Exception as e:
+            logger.error(f"❌ Failed to start scheduler: {e}")
 
     logger.info("🎯 PriceHawk backend initialized successfully.")
     return app
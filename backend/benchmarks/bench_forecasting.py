@@ -0,0 +1,39 @@
+# backend/benchmarks/bench_forecasting.py
+import numpy as np
+import pytest
+
+from benchmarks.catalog import generate_products
+from services.batch_forecasting import BatchForecaster
+from services.forecasting import ForecastingService
+
+
+def daily_prices(n: int, days: int = 90, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.01, size=(n, days))
+    return rng.uniform(20, 2000, size=(n, 1)) * np.exp(np.cumsum(steps, axis=1))
+
+
+@pytest.mark.parametrize("n", [100, 1000, 10000])
+def test_fit_predict(benchmark, n):
+    Y = daily_prices(n)
+    fitted = benchmark(BatchForecaster(horizon=14).fit_predict, Y)
+    assert fitted["yhat"].shape == (n, 14)
+
+
+def test_batch_run(benchmark, mongo_db):
+    """Load histories from Mongo, fit and store forecasts for 1000 products."""
+    if type(mongo_db).__module__.startswith("mongomock"):
+        pytest.skip("history windows use $last over $filter, which mongomock can't evaluate; set BENCH_MONGO_URI")
+    products = list(generate_products(1000, seed=50, history_days=120, changes_per_day=1))
+    mongo_db.products.insert_many(products)
+    ids = [p["_id"] for p in products]
+    service = ForecastingService(db=mongo_db)
+    forecaster = BatchForecaster(horizon=14, prophet_mape_threshold=1.0)
+
+
+    def reset():
+        mongo_db.forecasts.delete_many({})
+
+    stats, _ = benchmark.pedantic(forecaster.run, args=(service, ids), kwargs={"batch_size": 500},
+                                  setup=reset, rounds=3)
+    assert stats["stored"] + stats["skipped"] == len(ids)
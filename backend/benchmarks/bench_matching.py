@@ -0,0 +1,25 @@
+# backend/benchmarks/bench_matching.py
+import random
+
+import pytest
+
+from benchmarks.catalog import BRANDS, NOUNS
+from services.matching import cluster_products
+
+
+def search_results(n: int, seed: int = 0):
+    """Results as adapters return them: each title listed by two or three stores."""
+    rng = random.Random(seed)
+    items = []
+    while len(items) < n:
+        title = f"{rng.choice(BRANDS)} {rng.choice(NOUNS)} {rng.randint(1, 99)}"
+        for source in rng.sample(["Amazon", "Flipkart", "Walmart"], rng.randint(2, 3)):
+            items.append({"title": title, "price": round(rng.uniform(10, 900), 2), "source": source})
+    return items[:n]
+
+
+@pytest.mark.parametrize("n", [10, 100, 1000])
+def test_cluster_products(benchmark, n):
+    items = search_results(n)
+    clusters = benchmark(cluster_products, items)
+    assert sum(len(c) for c in clusters) == n
@@ -0,0 +1,20 @@
+# backend/benchmarks/bench_refresh.py
+from benchmarks.catalog import generate_products
+from jobs.tasks import refresh_prices
+
+JOB_COLLECTIONS = ("products", "refresh_runs", "job_leases", "notifications")
+
+
+def test_refresh_prices(benchmark, bench_app, mongo_db, catalog_size):
+    # Shard keys are random, so leave headroom over an even split of the catalog
+    bench_app.config["REFRESH_BATCH_SIZE"] = catalog_size * 2
+    products = list(generate_products(catalog_size, seed=48))
+
+    def reseed():
+        for name in JOB_COLLECTIONS:
+            mongo_db[name].delete_many({})
+        mongo_db.products.insert_many([dict(p) for p in products])
+
+    benchmark.pedantic(refresh_prices, args=(bench_app,), setup=reseed, rounds=3)
+    checked = sum(r["counts"]["checked"] for r in mongo_db.refresh_runs.find())
+    assert checked == catalog_size
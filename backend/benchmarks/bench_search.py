@@ -0,0 +1,24 @@
+# backend/benchmarks/bench_search.py
+import pytest
+
+from adapters.universal_adapter import UniversalAdapter
+
+QUERIES = ["iphone", "samsung galaxy phone", "gaming laptop", "wireless headphones", "unknown gadget"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_universal_search(benchmark, query):
+    adapter = UniversalAdapter()
+    results = benchmark(adapter.search, query, 20)
+    assert results
+
+
+@pytest.mark.parametrize("store", ["amazon", "flipkart"])
+def test_realtime_fetch_product(benchmark, fixture_server, store):
+    pytest.importorskip("bs4")
+    from adapters.realtime_adapter import RealtimeAdapter
+
+    adapter = RealtimeAdapter()
+    url = f"{fixture_server}/www.{store}.com/dp/42"
+    product = benchmark(adapter.fetch_product, url)
+    assert product["price"] == 142.42
@@ -0,0 +1,22 @@
+# backend/benchmarks/bench_tracking.py
+import random
+from datetime import datetime
+
+import pytest
+
+from benchmarks.catalog import generate_products, tracking_doc
+from services.tracking import TrackingService
+
+
+@pytest.mark.parametrize("tracked", [500, 2000])
+def test_get_tracked_products(benchmark, bench_app, mongo_db, tracked):
+    now = datetime.utcnow()
+    products = list(generate_products(tracked, seed=49, now=now, history_days=30))
+    mongo_db.products.insert_many(products)
+    rng = random.Random(49)
+    mongo_db.user_tracking.insert_many([tracking_doc(rng, "heavy-user", p, now) for p in products])
+
+    with bench_app.app_context():
+        service = TrackingService()
+        result = benchmark(service.get_tracked_products, "heavy-user")
+    assert len(result) == tracked
@@ -0,0 +1,288 @@
+# backend/benchmarks/catalog.py
+"""
+Deterministic synthetic catalog for benchmarks and load tests.
+
+Documents match what TrackingService writes (price_history, price_stats,
+version counters, shard_key, next_check_at), so services and jobs run on
+them exactly as on real data. The same seed always yields the same catalog.
+
+Products are marked rollups_built; product_bundle also returns their
+rollups and, for long histories, the archive buckets compact_price_history
+would have written. Everything for product or user ``index`` comes from a
+Random seeded with (seed, index), so slices are generated independently.
+"""
+import math
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+
+from bson.binary import Binary
+from bson.objectid import ObjectId
+
+from core.leases import SHARD_KEY_SPACE
+from core.price_codec import encode
+from core.price_series import PriceSeries
+from services.price_archive import BUCKET_POINTS
+from services.price_rollups import RESOLUTIONS, bucket_start
+from services.price_stats import compute_stats
+
+SOURCES = ("amazon", "flipkart", "walmart", "bestbuy", "target")
+CATEGORIES = ("Electronics", "Home", "Fashion", "Books", "Sports", "Kitchen")
+BRANDS = ("Apple", "Samsung", "Sony", "LG", "Dell", "HP", "Lenovo", "Nike", "Adidas", "Philips")
+NOUNS = ("Phone", "Laptop", "Headphones", "Monitor", "Shoes", "Blender", "Watch", "Camera", "Speaker", "Tablet")
+
+# Timestamp part of generated ObjectIds (2024-01-01 for products, +1s for users)
+_ID_EPOCH = 1704067200
+_USER_ID_EPOCH = _ID_EPOCH + 1
+
+
+def price_walk(rng: random.Random, start: datetime, end: datetime, base: float,
+               changes_per_day: float) -> List[Dict]:
+    """A random walk of price changes between start and end (at least one point)."""
+    points = [{"price": round(base, 2), "date": start}]
+    span_days = max((end - start).total_seconds() / 86400, 1e-9)
+    count = max(0, int(span_days * changes_per_day))
+    price = base
+    for offset in sorted(rng.random() * span_days for _ in range(count)):
+        # Mostly small moves, occasional sales and restores
+        step = rng.gauss(0, 0.02) if rng.random() < 0.9 else rng.choice((-0.2, 0.15))
+        price = max(1.0, round(price * (1 + step), 2))
+        points.append({"price": price, "date": start + timedelta(days=offset)})
+    return points
+
+
+def catalog_id(seed: int, index: int) -> ObjectId:
+    """Stable ObjectId for product ``index`` of a seed's catalog."""
+    return ObjectId(_ID_EPOCH.to_bytes(4, "big") + (seed & 0xFFFFFFFF).to_bytes(4, "big") + index.to_bytes(4, "big"))
+
+
+def catalog_user_id(seed: int, index: int) -> str:
+    """Stable id of user ``index`` of a seed's catalog, as stored in user_tracking and JWT identities."""
+    return str(ObjectId(_USER_ID_EPOCH.to_bytes(4, "big") + (seed & 0xFFFFFFFF).to_bytes(4, "big")
+                        + index.to_bytes(4, "big")))
+
+
+def user_email(index: int) -> str:
+    return f"loadtest{index}@pricehawk.test"
+
+
+def user_doc(seed: int, index: int, password_hash: str, now: datetime) -> Dict:
+    return {
+        "_id": ObjectId(catalog_user_id(seed, index)),
+        "email": user_email(index),
+        "password": password_hash,
+        "name": f"Load Test {index}",
+        "created_at": now,
+    }
+
+
+def _identity(rng: random.Random, index: int) -> Dict:
+    # First draws of a product's Random; product_identity replays them cheaply
+    base = round(rng.uniform(5, 2000), 2)
+    source = SOURCES[index % len(SOURCES)]
+    return {
+        "name": f"{rng.choice(BRANDS)} {rng.choice(NOUNS)} {index}",
+        "url": f"https://www.{source}.example.com/dp/{index}",
+        "source": source,
+        "category": CATEGORIES[index % len(CATEGORIES)],
+        "original_price": base,
+    }
+
+
+def product_identity(seed: int, index: int) -> Dict:
+    """Name, url, source, category and list price of a product, without generating its history."""
+    return _identity(random.Random(f"{seed}:product:{index}"), index)
+
+
+def popular_index(rng: random.Random, products: int) -> int:
+    """A product index with quadratic skew: the top 10% of the catalog gets about a third of the picks."""
+    return int(products * rng.random() ** 2)
+
+
+def product_doc(rng: random.Random, seed: int, index: int, now: datetime, history_days: int = 90,
+                changes_per_day: float = 0.5) -> Dict:
+    """One product with history, running stats and a due next_check_at."""
+    identity = _identity(rng, index)
+    base = identity["original_price"]
+    history = price_walk(rng, now - timedelta(days=history_days), now, base, changes_per_day)
+    current = history[-1]["price"]
+    return {
+        "_id": catalog_id(seed, index),
+        "name": identity["name"],
+        "url": identity["url"],
+        "image_url": "",
+        "description": f"Synthetic product {index}",
+        "current_price": current,
+        "original_price": base,
+        "currency": "USD",
+        "source": identity["source"],
+        "category": identity["category"],
+        "in_stock": rng.random() > 0.05,
+        "created_at": now - timedelta(days=history_days),
+        "last_checked": now - timedelta(hours=rng.uniform(1, 48)),
+        "next_check_at": now - timedelta(minutes=rng.uniform(0, 600)),
+        "shard_key": rng.randrange(SHARD_KEY_SPACE),
+        "version": 1,
+        "history_version": 1,
+        "rollups_built": True,
+        "price_history": history,
+        "price_stats": compute_stats(history, now),
+    }
+
+
+def generate_products(count: int, seed: int = 0, now: Optional[datetime] = None, history_days: int = 90,
+                      changes_per_day: float = 0.5, start: int = 0) -> Iterator[Dict]:
+    """
+    Products start..start+count-1 for a seed.
+
+    Each product has its own Random seeded from (seed, index), so any slice of
+    the catalog can be generated independently (e.g. by parallel workers).
+    """
+    now = now or datetime.utcnow()
+    for index in range(start, start + count):
+        rng = random.Random(f"{seed}:product:{index}")
+        yield product_doc(rng, seed, index, now, history_days, changes_per_day)
+
+
+def tracking_doc(rng: random.Random, user_id: str, product: Dict, now: datetime) -> Dict:
+    """A user_tracking record, with a target below the current price most of the time."""
+    target = round(product["current_price"] * rng.uniform(0.7, 0.98), 2) if rng.random() < 0.8 else None
+    return {
+        "user_id": user_id,
+        "product_id": product["_id"],
+        "target_price": target,
+        "notify_on_price_drop": True,
+        "notify_on_availability": rng.random() < 0.5,
+        "created_at": now - timedelta(days=rng.uniform(0, 90)),
+    }
+
+
+def archive_history(product: Dict, cutoff: datetime) -> List[Dict]:
+    """
+    Move points older than cutoff into archive buckets, as archive_product does.
+
+    The product keeps the last pre-cutoff point and gets history_archived_until.
+    """
+    old = PriceSeries.from_bson(product["price_history"]).between(end=cutoff)[:-1]
+    if not len(old):
+        return []
+    buckets = []
+    for offset in range(0, len(old), BUCKET_POINTS):
+        bucket = old[offset:offset + BUCKET_POINTS]
+        buckets.append({
+            "product_id": product["_id"],
+            "start": bucket[0][0],
+            "end": bucket[-1][0],
+            "count": len(bucket),
+            "data": Binary(encode(bucket)),
+        })
+    product["price_history"] = product["price_history"][len(old):]
+    product["history_archived_until"] = old[-1][0]
+    return buckets
+
+
+def rollup_docs(product_id, points: List[Dict]) -> List[Dict]:
+    """Hour and day rollups of date-ordered points, as rebuild_rollups would store them."""
+    buckets: Dict[tuple, Dict] = {}
+    for point in points:
+        price = float(point["price"])
+        for resolution in RESOLUTIONS:
+            start = bucket_start(point["date"], resolution)
+            doc = buckets.get((resolution, start))
+            if doc is None:
+                buckets[(resolution, start)] = {
+                    "product_id": product_id, "resolution": resolution, "bucket": start,
+                    "open": price, "close": price, "low": price, "high": price, "count": 1,
+                }
+            else:
+                doc["close"] = price
+                doc["low"] = min(doc["low"], price)
+                doc["high"] = max(doc["high"], price)
+                doc["count"] += 1
+    return list(buckets.values())
+
+
+def product_bundle(seed: int, index: int, now: datetime, history_days: int = 90, changes_per_day: float = 0.5,
+                   hot_days: Optional[int] = None, rollups: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Documents for one product, by collection: the product, its rollups and,
+    when hot_days is set, archive buckets for points older than that.
+    """
+    rng = random.Random(f"{seed}:product:{index}")
+    product = product_doc(rng, seed, index, now, history_days, changes_per_day)
+    bundle = {"products": [product]}
+    if rollups:
+        bundle["price_rollups"] = rollup_docs(product["_id"], product["price_history"])
+    else:
+        product["rollups_built"] = False
+    if hot_days is not None:
+        bundle["price_history_archive"] = archive_history(product, now - timedelta(days=hot_days))
+    return bundle
+
+
+def tracked_indexes(rng: random.Random, products: int, mean: float) -> List[int]:
+    """
+    Products one user tracks.
+
+    The count is lognormal (most users track a few products, some track
+    hundreds) and products are picked with popular_index, so trackers per
+    product follow a long tail too.
+    """
+    if mean <= 0 or products <= 0:
+        return []
+    sigma = 1.0
+    count = min(products, int(rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma) + 0.5))
+    picked = set()
+    for _ in range(count * 4):
+        if len(picked) >= count:
+            break
+        picked.add(popular_index(rng, products))
+    return sorted(picked)
+
+
+def notification_docs(rng: random.Random, tracker: Dict, product: Dict, now: datetime, mean: float,
+                      retention_days: Dict[str, int]) -> List[Dict]:
+    """Alerts a tracker received within retention: mostly price drops, some back-in-stock."""
+    docs = []
+    count = int(rng.expovariate(1 / mean) + 0.5) if mean > 0 else 0
+    for _ in range(count):
+        kind = "price_drop" if rng.random() < 0.9 else "back_in_stock"
+        created_at = now - timedelta(days=rng.uniform(0, retention_days.get(kind, 30)))
+        doc = {
+            "user_id": tracker["user_id"],
+            "type": kind,
+            "product_id": str(tracker["product_id"]),
+            "product_name": product["name"],
+            "url": product["url"],
+            # Older alerts are more likely to have been read
+            "read": rng.random() < min(0.95, (now - created_at).days / 7),
+            "created_at": created_at,
+            "expires_at": created_at + timedelta(days=retention_days.get(kind, 30)),
+        }
+        if kind == "price_drop":
+            old = round(product["original_price"] * rng.uniform(0.9, 1.1), 2)
+            new = round(old * rng.uniform(0.8, 0.98), 2)
+            doc.update(old_price=old, new_price=new,
+                       message=f"{product['name']} price dropped from ${old} to ${new}!")
+        else:
+            doc["message"] = f"{product['name']} is back in stock!"
+        docs.append(doc)
+    return docs
+
+
+def user_bundle(seed: int, index: int, products: int, password_hash: str, now: datetime,
+                tracked_mean: float = 20, notifications_mean: float = 1,
+                retention_days: Optional[Dict[str, int]] = None) -> Dict[str, List[Dict]]:
+    """Documents for one user, by collection: the user, its trackers and their notifications."""
+    rng = random.Random(f"{seed}:user:{index}")
+    user_id = catalog_user_id(seed, index)
+    bundle = {"users": [user_doc(seed, index, password_hash, now)], "user_tracking": [], "notifications": []}
+    for product_index in tracked_indexes(rng, products, tracked_mean):
+        product = product_identity(seed, product_index)
+        tracker = tracking_doc(rng, user_id, {"_id": catalog_id(seed, product_index),
+                                              "current_price": product["original_price"]}, now)
+        bundle["user_tracking"].append(tracker)
+        bundle["notifications"].extend(
+            notification_docs(rng, tracker, product, now, notifications_mean, retention_days or {})
+        )
+    return bundle
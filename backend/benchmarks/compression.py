@@ -0,0 +1,96 @@
+# backend/benchmarks/compression.py
+"""
+Measure response compression: bandwidth saved and CPU spent per encoding.
+
+    python -m benchmarks.compression [--points 17520] [--results 50] [--repeat 5]
+
+For a price-history payload and a search payload it reports the JSON size,
+the compressed size and ratio, and the time to compress once for each
+encoding. The last column is the cost of serving a cached response through
+EncodedBody, which compresses on first use and then only hands back bytes.
+"""
+import argparse
+import random
+import time
+
+from flask import Flask
+
+from benchmarks.json_encoding import history_payload
+from core.compression import EncodedBody, available_encodings, compress
+from core.json_provider import init_json
+
+LEVELS = {
+    "gzip": [("gzip-1", {"COMPRESS_GZIP_LEVEL": 1}), ("gzip-6", {"COMPRESS_GZIP_LEVEL": 6}),
+             ("gzip-9", {"COMPRESS_GZIP_LEVEL": 9})],
+    "br": [("br-4", {"COMPRESS_BROTLI_QUALITY": 4}), ("br-11", {"COMPRESS_BROTLI_QUALITY": 11})],
+}
+
+def search_payload(count: int):
+    stores = ["amazon", "flipkart", "walmart", "bestbuy", "target"]
+    return {"results": [
+        {
+            "title": f"Wireless Headphones Model {i % 12}",
+            "price": round(random.uniform(20, 400), 2),
+            "currency": "USD",
+            "url": f"https://{stores[i % len(stores)]}.example.com/dp/{random.randrange(10**9)}",
+            "image": f"https://images.example.com/{random.randrange(10**9)}.jpg",
+            "source": stores[i % len(stores)],
+            "rating": round(random.uniform(3, 5), 1),
+            "is_best_price": i % 3 == 0,
+            "recommendation": "💰 Best Price!" if i % 3 == 0 else f"💸 ${i:.2f} more than best price",
+        }
+        for i in range(count)
+    ], "recommendations": [f"wireless headphones {w}" for w in ("noise cancelling", "sport", "budget")]}
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def run(points: int, results: int, repeat: int):
+    app = Flask(__name__)
+    init_json(app)
+    payloads = {
+        f"price history ({points} points)": history_payload(points),
+        f"search ({results} results)": search_payload(results),
+    }
+    rows = []
+    for name, payload in payloads.items():
+        data = app.json.dumps_bytes(payload)
+        for encoding in available_encodings():
+            for label, config in LEVELS[encoding]:
+                compressed = compress(data, encoding, config)
+                compress_ms = best_of(lambda: compress(data, encoding, config), repeat)
+                body = EncodedBody(data)
+                body.variant(encoding, config)
+                cached_ms = best_of(lambda: body.variant(encoding, config), repeat)
+                rows.append({
+                    "payload": name,
+                    "encoding": label,
+                    "json_bytes": len(data),
+                    "compressed_bytes": len(compressed),
+                    "ratio": len(data) / len(compressed),
+                    "compress_ms": compress_ms,
+                    "cached_ms": cached_ms,
+                })
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--points", type=int, default=17520)
+    parser.add_argument("--results", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'payload':32s} {'encoding':9s} {'json':>10s} {'compressed':>11s} {'ratio':>6s} "
+          f"{'compress':>10s} {'cached':>10s}")
+    for row in run(args.points, args.results, args.repeat):
+        print(f"{row['payload']:32s} {row['encoding']:9s} {row['json_bytes']:10d} "
+              f"{row['compressed_bytes']:11d} {row['ratio']:5.1f}x "
+              f"{row['compress_ms']:7.2f} ms {row['cached_ms'] * 1000:7.2f} us")
+
+if __name__ == "__main__":
+    main()
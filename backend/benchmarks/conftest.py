@@ -0,0 +1,124 @@
+# backend/benchmarks/conftest.py
+"""
+pytest-benchmark suite for the hot paths (bench_*.py in this directory).
+
+    pip install pytest-benchmark mongomock
+    python -m pytest benchmarks --benchmark-autosave          # save a run
+    python -m pytest benchmarks --benchmark-compare \\
+        --benchmark-compare-fail=mean:10%                     # compare with the last one
+
+Runs are saved as JSON under benchmarks/results/ (``--benchmark-json PATH``
+writes a single file instead). Bench modules are only collected when this
+directory is passed to pytest explicitly, so the regular test run stays fast.
+
+Mongo is mongomock by default; set BENCH_MONGO_URI (e.g.
+mongodb://localhost:27017) to run against a real mongod, using a throwaway
+database per benchmark. BENCH_CATALOG_SIZE sets the refresh catalog size.
+"""
+import os
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def _requested(config) -> bool:
+    for arg in config.args:
+        path = Path(arg.split("::")[0]).resolve()
+        if path == BENCH_DIR or BENCH_DIR in path.parents:
+            return True
+    return False
+
+
+def pytest_configure(config):
+    # Keep saved runs next to the suite unless --benchmark-storage was given
+    if getattr(config.option, "benchmark_storage", None) == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BENCH_DIR / 'results'}"
+
+
+def pytest_collect_file(file_path, parent):
+    if file_path.suffix == ".py" and file_path.name.startswith("bench_") and _requested(parent.config):
+        return pytest.Module.from_parent(parent, path=file_path)
+
+
+@pytest.fixture
+def mongo_db():
+    """An empty database: mongomock, or a throwaway one on BENCH_MONGO_URI."""
+    uri = os.getenv("BENCH_MONGO_URI")
+    if uri:
+        from pymongo import MongoClient
+        client = MongoClient(uri)
+        name = f"pricehawk_bench_{uuid.uuid4().hex[:8]}"
+        yield client[name]
+        client.drop_database(name)
+        client.close()
+    else:
+        mongomock = pytest.importorskip("mongomock")
+        yield mongomock.MongoClient().pricehawk_bench
+
+
+@pytest.fixture
+def bench_app(mongo_db):
+    """A bare Flask app bound to mongo_db, with indexes (create_app would connect to MONGO_URI)."""
+    from flask import Flask
+    from core.db import ensure_indexes
+    from core.json_provider import init_json
+
+    app = Flask("pricehawk-bench")
+    init_json(app)
+    app.config.update(
+        REFRESH_SHARDS=16,
+        JOB_LEASE_TTL_SECONDS=600,
+        REFRESH_CHUNK_SIZE=200,
+        REFRESH_CHECKPOINT_EVERY=500,
+        FORECAST_DAYS_AHEAD=14,
+    )
+    app.db = mongo_db
+    ensure_indexes(mongo_db)
+    return app
+
+
+@pytest.fixture
+def catalog_size():
+    return int(os.getenv("BENCH_CATALOG_SIZE", 10000))
+
+
+class _ProductPageHandler(BaseHTTPRequestHandler):
+    """Serves store-like product pages, /www.<store>.com/dp/<n>, with a price in that store's markup."""
+
+    def do_GET(self):
+        last = self.path.rstrip("/").rsplit("/", 1)[-1]
+        index = int(last) if last.isdigit() else 0
+        price = f"{100 + index % 900}.{index % 100:02d}"
+        if "flipkart.com" in self.path:
+            price_html = f'<div class="_30jeq3 _16Jk6d">₹{price}</div>'
+        else:
+            price_html = f'<span class="a-price"><span class="a-offscreen">${price}</span></span>'
+        filler = "".join(f"<li>Feature {i} of product {index}</li>" for i in range(200))
+        body = (
+            f"<html><head><title>Product {index}</title></head><body>"
+            f"<div id='dp'><h1>Product {index}</h1>{price_html}<ul>{filler}</ul></div></body></html>"
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="session")
+def fixture_server():
+    """Base URL of a local HTTP server with synthetic product pages."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _ProductPageHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,107 @@
+# backend/benchmarks/import_time.py
+"""
+Profile worker start-up imports with ``python -X importtime``.
+
+    python -m benchmarks.import_time [--top 25] [--budget-ms 2000] [module ...]
+
+Imports the given modules (by default everything create_app loads) in a
+fresh interpreter, parses the importtime report and prints the slowest
+imports by cumulative time. Exits non-zero when start-up exceeds the budget
+or pulls in any of HEAVY_MODULES, which must only be imported on first use
+(see core.embeddings and the lazy services in api/). tests/test_import_time.py
+enforces the same budget.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from collections import namedtuple
+from typing import Iterable, List
+
+# What create_app imports, without connecting to Mongo (the api.* entries are the
+# blueprints create_api_blueprint registers; tests/test_import_time.py checks them)
+STARTUP_MODULES = (
+    "app", "api.auth", "api.search", "api.tracking", "api.notifications",
+    "api.products", "api.admin", "jobs.tasks",
+)
+
+# Packages that take seconds to import and are only needed by some requests/jobs
+HEAVY_MODULES = ("torch", "sentence_transformers", "sklearn", "scipy", "prophet", "pandas", "pyarrow")
+
+DEFAULT_BUDGET_MS = 2000
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MARKER = "-- startup imports done"
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+ImportRecord = namedtuple("ImportRecord", "module self_us cumulative_us depth")
+
+
+def parse_importtime(report: str) -> List[ImportRecord]:
+    """
+    Parse ``-X importtime`` output into records, in report order.
+
+    Lines before the start-up marker (interpreter start-up) and anything that
+    isn't an importtime line are skipped.
+    """
+    lines = report.splitlines()
+    if _MARKER in lines:
+        lines = lines[lines.index(_MARKER) + 1:]
+    records = []
+    for line in lines:
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+
+def profile(modules: Iterable[str] = STARTUP_MODULES) -> List[ImportRecord]:
+    """Import modules in a fresh interpreter (from the backend directory) and parse the report."""
+    code = f"import sys; print({_MARKER!r}, file=sys.stderr, flush=True); import " + ", ".join(modules)
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR, capture_output=True, text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Import failed:\n{completed.stderr[-2000:]}")
+    return parse_importtime(completed.stderr)
+
+
+def total_ms(records: List[ImportRecord]) -> float:
+    """Wall time spent importing: the sum of top-level cumulative times."""
+    return sum(r.cumulative_us for r in records if r.depth == 0) / 1000
+
+
+def heavy_imports(records: List[ImportRecord]) -> List[str]:
+    """HEAVY_MODULES (top-level packages) that were imported."""
+    imported = {r.module.split(".")[0] for r in records}
+    return [name for name in HEAVY_MODULES if name in imported]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(STARTUP_MODULES))
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    records = profile(args.modules)
+    print(f"{'cumulative':>12s} {'self':>10s}  module")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:args.top]:
+        print(f"{record.cumulative_us / 1000:9.1f} ms {record.self_us / 1000:7.1f} ms  "
+              f"{'  ' * record.depth}{record.module}")
+
+    elapsed = total_ms(records)
+    heavy = heavy_imports(records)
+    print(f"\ntotal: {elapsed:.1f} ms (budget {args.budget_ms:.0f} ms), {len(records)} modules")
+    if heavy:
+        print(f"heavy modules imported at start-up: {', '.join(heavy)}")
+    return 1 if heavy or elapsed > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
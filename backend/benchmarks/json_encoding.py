@@ -0,0 +1,84 @@
+# backend/benchmarks/json_encoding.py
+"""
+Compare response encoding time: stdlib provider vs orjson provider.
+
+    python -m benchmarks.json_encoding [--products 5000] [--points 2000] [--repeat 5]
+
+Payloads mirror what the API returns: a page of tracked-product documents
+(ObjectId, datetime, nested price stats) and a long price-history list.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from flask import Flask
+
+from core.json_provider import OrjsonProvider, StdlibProvider, orjson
+
+def product_payload(count: int):
+    now = datetime.utcnow()
+    return {"products": [
+        {
+            "_id": ObjectId(),
+            "product_id": str(ObjectId()),
+            "name": f"Product {i}",
+            "url": f"https://example.com/p/{i}",
+            "current_price": round(random.uniform(5, 2000), 2),
+            "target_price": round(random.uniform(5, 2000), 2),
+            "currency": "USD",
+            "in_stock": True,
+            "last_checked": now - timedelta(minutes=i),
+            "tracking_since": now - timedelta(days=i % 365),
+            "price_stats": {"avg_price": 99.5, "min_price": 80.0, "best_price_date": now, "count": 42}
+        }
+        for i in range(count)
+    ], "next_cursor": "abc"}
+
+def history_payload(count: int):
+    start = datetime.utcnow() - timedelta(days=365)
+    return {"status": "success", "product_id": str(ObjectId()), "price_history": [
+        {"price": round(100 + random.gauss(0, 5), 2), "date": start + timedelta(minutes=30 * i)}
+        for i in range(count)
+    ]}
+
+def time_encode(provider, payload, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        provider.dumps_bytes(payload)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def run(products: int, points: int, repeat: int):
+    app = Flask(__name__)
+    providers = {"stdlib": StdlibProvider(app)}
+    if orjson:
+        providers["orjson"] = OrjsonProvider(app)
+
+    payloads = {
+        f"my-products ({products} docs)": product_payload(products),
+        f"price history ({points} points)": history_payload(points),
+    }
+    results = {}
+    for name, payload in payloads.items():
+        results[name] = {label: time_encode(p, payload, repeat) for label, p in providers.items()}
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--points", type=int, default=17520)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    for name, timings in run(args.products, args.points, args.repeat).items():
+        line = "  ".join(f"{label}: {ms:8.2f} ms" for label, ms in timings.items())
+        speedup = ""
+        if "orjson" in timings:
+            speedup = f"  ({timings['stdlib'] / timings['orjson']:.1f}x)"
+        print(f"{name:32s} {line}{speedup}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+# backend/benchmarks/load.py
+"""
+Load generator for the PriceHawk API.
+
+    python scripts/seed.py --products 100000 --users 1000 --seed 0
+    python -m benchmarks.load --base-url http://localhost:5000 --users 200 \\
+        --duration 120 --products 100000 --catalog-users 1000 --seed 0 --json load.json
+
+Every virtual user is an asyncio task with its own keep-alive connection
+and JWT, acting as one of the seeded catalog users. It picks an action from
+the traffic mix (--mix search=25,history=20,...), waits an exponential
+think time and repeats until --duration runs out. Product ids are derived
+from --seed and --products exactly as scripts/seed.py creates them, with
+popular products picked more often. History and analysis requests are
+revalidated with If-None-Match, as a browser would.
+
+The report gives throughput, errors and latency percentiles per route.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.catalog import BRANDS, NOUNS, catalog_id, catalog_user_id, popular_index, product_identity
+
+DEFAULT_MIX = {
+    "search": 25,
+    "track": 5,
+    "tracked_products": 10,
+    "history": 20,
+    "forecast": 10,
+    "analysis": 5,
+    "notification_poll": 20,
+    "notification_list": 5,
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+SEARCH_TERMS = [f"{brand} {noun}".lower() for brand in BRANDS for noun in NOUNS]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parse "search=25,history=20" into weights; unknown actions are rejected."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise ValueError(f"Unknown action '{name}' (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[name] = float(weight)
+    if not any(w > 0 for w in mix.values()):
+        raise ValueError("The traffic mix needs at least one positive weight")
+    return mix
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class LoadReport:
+    """Latencies, statuses and bytes per route."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.bytes: Counter = Counter()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+
+    def record(self, route: str, status: int, seconds: float, size: int = 0) -> None:
+        self.latencies.setdefault(route, []).append(seconds)
+        self.statuses.setdefault(route, Counter())[status] += 1
+        self.bytes[route] += size
+
+    def summary(self) -> Dict[str, Dict]:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        rows = {}
+        for route in sorted(self.latencies):
+            values = sorted(self.latencies[route])
+            statuses = self.statuses[route]
+            errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+            row = {
+                "requests": len(values),
+                "errors": errors,
+                "rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+                "mean_ms": round(1000 * sum(values) / len(values), 2),
+                "max_ms": round(1000 * values[-1], 2),
+                "bytes": self.bytes[route],
+                "statuses": {str(status): count for status, count in sorted(statuses.items())},
+            }
+            for q in PERCENTILES:
+                row[f"p{q}_ms"] = round(1000 * percentile(values, q), 2)
+            rows[route] = row
+        return {"elapsed_seconds": round(elapsed, 2), "routes": rows}
+
+    def format_table(self) -> str:
+        summary = self.summary()
+        columns = ["requests", "errors", "rps"] + [f"p{q}_ms" for q in PERCENTILES] + ["max_ms"]
+        width = max([len(r) for r in summary["routes"]] + [5])
+        lines = [f"{'route':<{width}}  " + "  ".join(f"{c:>9}" for c in columns)]
+        for route, row in summary["routes"].items():
+            lines.append(f"{route:<{width}}  " + "  ".join(f"{row[c]:>9}" for c in columns))
+        total = sum(r["requests"] for r in summary["routes"].values())
+        errors = sum(r["errors"] for r in summary["routes"].values())
+        lines.append(f"{total} requests, {errors} errors in {summary['elapsed_seconds']}s "
+                     f"({round(total / summary['elapsed_seconds'], 1) if summary['elapsed_seconds'] else 0} req/s)")
+        return "\n".join(lines)
+
+
+class _NoResponse(ConnectionError):
+    """The connection closed before any response byte arrived."""
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams (Content-Length and chunked bodies)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, headers: Optional[Dict] = None,
+                      body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(self._exchange(method, path, headers, body), self.timeout)
+        except _NoResponse:
+            self.close()
+            if not reused:
+                raise
+        except BaseException:
+            self.close()
+            raise
+        # The server dropped an idle keep-alive connection; retry once on a fresh one
+        try:
+            return await asyncio.wait_for(self._exchange(method, path, headers, body), self.timeout)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _exchange(self, method, path, headers, body):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Accept-Encoding: gzip"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        try:
+            self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+            await self.writer.drain()
+            status_line = await self.reader.readline()
+        except ConnectionError as e:
+            raise _NoResponse(str(e)) from e
+        if not status_line:
+            raise _NoResponse("Connection closed before the response")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            data = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers up to the final blank line
+                    while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            self.close()
+
+        if response_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, response_headers, data
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def mint_tokens(user_ids: List[str], secret: str) -> Dict[str, str]:
+    """Access tokens as the API's JWTManager issues them (JWT_SECRET of the target app)."""
+    from flask import Flask
+    from flask_jwt_extended import JWTManager, create_access_token
+
+    app = Flask("pricehawk-load")
+    app.config.update(JWT_SECRET_KEY=secret, JWT_ACCESS_TOKEN_EXPIRES=False)
+    JWTManager(app)
+    with app.app_context():
+        return {user_id: create_access_token(identity=user_id) for user_id in user_ids}
+
+
+@lru_cache(maxsize=4096)
+def catalog_product(seed: int, index: int) -> Dict:
+    """Fields of a seeded product a client sends to /tracking/track (at its list price)."""
+    identity = product_identity(seed, index)
+    return {"name": identity["name"], "url": identity["url"], "source": identity["source"],
+            "category": identity["category"], "current_price": identity["original_price"]}
+
+
+class VirtualUser:
+    """One simulated client: a catalog user with a connection, a token and an ETag cache."""
+
+    def __init__(self, index: int, options, token: str, report: LoadReport):
+        self.options = options
+        self.rng = random.Random(f"{options.seed}:load:{index}")
+        self.user_index = index % options.catalog_users
+        self.connection = HttpConnection(options.host, options.port, options.timeout)
+        self.auth = {"Authorization": f"Bearer {token}"}
+        self.etags: Dict[str, str] = {}
+        self.report = report
+        self.actions = [name for name, weight in options.mix.items() if weight > 0]
+        self.weights = [options.mix[name] for name in self.actions]
+
+    def pick_product(self) -> int:
+        return popular_index(self.rng, self.options.products)
+
+    async def run(self, deadline: float) -> None:
+        try:
+            while time.perf_counter() < deadline:
+                action = self.rng.choices(self.actions, self.weights)[0]
+                await getattr(self, action)()
+                think = self.rng.expovariate(1 / self.options.think_time) if self.options.think_time > 0 else 0
+                await asyncio.sleep(min(think, max(0.0, deadline - time.perf_counter())))
+        finally:
+            self.connection.close()
+
+    async def send(self, route: str, method: str, path: str, payload=None, revalidate: bool = False):
+        headers = dict(self.auth)
+        body = None
+        if payload is not None:
+            body = json.dumps(payload).encode()
+            headers["Content-Type"] = "application/json"
+        if revalidate and path in self.etags:
+            headers["If-None-Match"] = self.etags[path]
+        started = time.perf_counter()
+        try:
+            status, response_headers, data = await self.connection.request(method, path, headers, body)
+        except Exception:
+            self.report.record(route, 0, time.perf_counter() - started)
+            return
+        self.report.record(route, status, time.perf_counter() - started, len(data))
+        if revalidate and status == 200 and "etag" in response_headers:
+            self.etags[path] = response_headers["etag"]
+
+    async def search(self):
+        query = self.rng.choice(SEARCH_TERMS)
+        await self.send("POST /api/search", "POST", "/api/search", {"query": query, "max_results": 10})
+
+    async def track(self):
+        product = catalog_product(self.options.seed, self.pick_product())
+        await self.send("POST /api/tracking/track", "POST", "/api/tracking/track", dict(product))
+
+    async def tracked_products(self):
+        await self.send("GET /api/tracking/products", "GET", "/api/tracking/products")
+
+    async def history(self):
+        product_id = catalog_id(self.options.seed, self.pick_product())
+        await self.send("GET /api/tracking/history/<id>", "GET",
+                        f"/api/tracking/history/{product_id}?points=200", revalidate=True)
+
+    async def forecast(self):
+        product_id = catalog_id(self.options.seed, self.pick_product())
+        await self.send("GET /api/tracking/forecast/<id>", "GET", f"/api/tracking/forecast/{product_id}?days=14")
+
+    async def analysis(self):
+        product_id = catalog_id(self.options.seed, self.pick_product())
+        await self.send("GET /api/tracking/analysis/<id>", "GET",
+                        f"/api/tracking/analysis/{product_id}", revalidate=True)
+
+    async def notification_poll(self):
+        await self.send("GET /api/notifications/unread_count", "GET", "/api/notifications/unread_count")
+
+    async def notification_list(self):
+        await self.send("GET /api/notifications/", "GET", "/api/notifications/?limit=20")
+
+
+async def run_load(options) -> LoadReport:
+    """Run options.users virtual users, started evenly over options.ramp_up seconds."""
+    report = LoadReport()
+    user_ids = [catalog_user_id(options.seed, i) for i in range(min(options.users, options.catalog_users))]
+    tokens = mint_tokens(user_ids, options.jwt_secret)
+    deadline = time.perf_counter() + options.ramp_up + options.duration
+
+    async def start(index):
+        await asyncio.sleep(options.ramp_up * index / max(1, options.users))
+        user = VirtualUser(index, options, tokens[user_ids[index % len(user_ids)]], report)
+        await user.run(deadline)
+
+    await asyncio.gather(*(start(i) for i in range(options.users)))
+    report.finished = time.perf_counter()
+    return report
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate API load against a running PriceHawk backend")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000", help="Backend base URL (http only)")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load after ramp-up")
+    parser.add_argument("--ramp-up", type=float, default=10, help="Seconds over which users start")
+    parser.add_argument("--think-time", type=float, default=1.0, help="Mean seconds between a user's requests")
+    parser.add_argument("--products", type=int, default=10000, help="Catalog size passed to scripts/seed.py")
+    parser.add_argument("--catalog-users", type=int, default=100, help="Users passed to scripts/seed.py")
+    parser.add_argument("--seed", type=int, default=0, help="Seed passed to scripts/seed.py")
+    parser.add_argument("--mix", type=parse_mix, default=dict(DEFAULT_MIX),
+                        help="Action weights, e.g. search=25,history=20 (omitted actions are not run)")
+    parser.add_argument("--jwt-secret", default=None, help="JWT_SECRET of the backend (default: env or app default)")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="Also write the summary as JSON to this path")
+    return parser
+
+
+def main(argv=None) -> int:
+    options = build_parser().parse_args(argv)
+    url = urlsplit(options.base_url)
+    if url.scheme != "http":
+        print("Only http:// base URLs are supported", file=sys.stderr)
+        return 2
+    options.host, options.port = url.hostname, url.port or 80
+    if options.jwt_secret is None:
+        options.jwt_secret = os.getenv("JWT_SECRET", "jwt_secret")
+
+    report = asyncio.run(run_load(options))
+    print(report.format_table())
+    if options.json_path:
+        with open(options.json_path, "w") as f:
+            json.dump({"options": {k: v for k, v in vars(options).items() if k != "jwt_secret"},
+                       **report.summary()}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# backend/core/compression.py
+"""
+Negotiated response compression.
+
+``init_compression(app)`` installs an after_request hook that compresses
+JSON and text responses of at least COMPRESS_MIN_SIZE bytes with brotli or
+gzip, whichever the client's Accept-Encoding prefers (brotli only when the
+``brotli`` package is installed). Small bodies, streamed responses and
+responses that already carry a Content-Encoding are left alone.
+
+Cached responses skip the per-request work: an EncodedBody holds the JSON
+bytes of a result once, compresses each encoding the first time a client
+asks for it, and keeps those bytes for every later hit. Caches store
+EncodedBody values (see api/tracking.py and the search endpoint) and views
+return ``body.to_response()``.
+"""
+import gzip
+import threading
+from typing import Any, Dict, Optional
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ("application/json", "application/x-ndjson", "text/html", "text/plain", "text/csv")
+
+
+def available_encodings() -> tuple:
+    """Encodings this process can produce, most preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate() -> Optional[str]:
+    """Best encoding for the current request, or None for identity."""
+    return request.accept_encodings.best_match(available_encodings())
+
+
+def compress(data: bytes, encoding: str, config: Optional[Dict] = None) -> bytes:
+    """Compress with the configured level (COMPRESS_GZIP_LEVEL / COMPRESS_BROTLI_QUALITY)."""
+    config = config or {}
+    if encoding == "br":
+        return brotli.compress(data, quality=config.get("COMPRESS_BROTLI_QUALITY", 4))
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=config.get("COMPRESS_GZIP_LEVEL", 6), mtime=0)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def _mark_encoded(response, encoding: str):
+    response.headers["Content-Encoding"] = encoding
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+class EncodedBody:
+    """A JSON body encoded once, with its compressed variants built on demand and kept."""
+
+    __slots__ = ("data", "mimetype", "_variants", "_lock")
+
+    def __init__(self, data: bytes, mimetype: str = "application/json"):
+        self.data = data
+        self.mimetype = mimetype
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_obj(cls, obj: Any, provider=None) -> "EncodedBody":
+        """Encode with the app's JSON provider (pass it in when off the request thread)."""
+        provider = provider or current_app.json
+        return cls(provider.dumps_bytes(obj) + b"\n", provider.mimetype)
+
+    def variant(self, encoding: str, config: Optional[Dict] = None) -> bytes:
+        """Compressed bytes for an encoding, computed the first time only."""
+        data = self._variants.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._variants.get(encoding)
+                if data is None:
+                    data = self._variants[encoding] = compress(self.data, encoding, config)
+        return data
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + sum(len(v) for v in self._variants.values())
+
+    def to_response(self, status: int = 200):
+        """
+        Response in the client's preferred encoding, without compressing again.
+
+        Sent uncompressed when COMPRESS_ENABLED is off or the body is below
+        COMPRESS_MIN_SIZE.
+        """
+        config = current_app.config
+        eligible = (config.get("COMPRESS_ENABLED", True)
+                    and len(self.data) >= config.get("COMPRESS_MIN_SIZE", 1024))
+        encoding = negotiate() if eligible else None
+        if encoding is None:
+            response = current_app.response_class(self.data, status=status, mimetype=self.mimetype)
+            if eligible:
+                response.vary.add("Accept-Encoding")
+            return response
+        response = current_app.response_class(self.variant(encoding, config), status=status, mimetype=self.mimetype)
+        return _mark_encoded(response, encoding)
+
+
+def init_compression(app) -> None:
+    """Compress eligible responses after every request (COMPRESS_ENABLED)."""
+    if not app.config.get("COMPRESS_ENABLED", True):
+        return
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough or response.is_streamed
+                or "Content-Encoding" in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+        data = response.get_data()
+        if len(data) < app.config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate()
+        if encoding is None:
+            return response
+        response.set_data(compress(data, encoding, app.config))
+        return _mark_encoded(response, encoding)
@@ -1,17 +1,164 @@
 # backend/core/db.py
-from pymongo import MongoClient
+import logging
+from pymongo import MongoClient, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
 from flask import current_app, g
 
+logger = logging.getLogger(__name__)
+
 def init_db(app):
     mongo_uri = app.config.get("MONGO_URI")
-    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000)
+    from core.metrics import command_listeners
+    listeners = command_listeners()
+    slow_queries = None
+    if app.config.get("SLOW_QUERY_ENABLED", True):
+        from core.slow_queries import SlowQueryMonitor
+        slow_queries = SlowQueryMonitor(threshold_ms=app.config.get("SLOW_QUERY_THRESHOLD_MS", 100))
+        listeners.append(slow_queries)
+    client = MongoClient(mongo_uri, serverSelectionTimeoutMS=5000, event_listeners=listeners)
     # Simple connectivity test
     client.admin.command('ping')
     db = client.get_default_database()
     app.mongo_client = client
     app.db = db
+    ensure_indexes(db)
+    if slow_queries is not None:
+        slow_queries.start(client, db, app.config)
+    app.slow_queries = slow_queries
 
 def get_db():
     # This returns the DB instance (use inside request handlers)
     from flask import current_app
     return current_app.db
+
+# Server error code for an index name that exists with another key
+INDEX_KEY_SPECS_CONFLICT = 86
+
+def _ensure_index(collection, keys, name, **options):
+    """
+    Create one index, replacing an older index of the same name whose key changed.
+
+    Failures are logged and do not stop the caller from creating the others.
+    """
+    try:
+        collection.create_index(keys, name=name, **options)
+    except OperationFailure as e:
+        if e.code != INDEX_KEY_SPECS_CONFLICT:
+            logger.error(f"Failed to ensure index {collection.name}.{name}: {e}")
+            return
+        try:
+            collection.drop_index(name)
+            collection.create_index(keys, name=name, **options)
+            logger.info(f"Rebuilt index {collection.name}.{name} with its new key")
+        except Exception as e:
+            logger.error(f"Failed to rebuild index {collection.name}.{name}: {e}")
+    except Exception as e:
+        logger.error(f"Failed to ensure index {collection.name}.{name}: {e}")
+
+def ensure_indexes(db):
+    """
+    Create the indexes the services and jobs rely on.
+
+    create_index is a no-op when an identical index already exists, so this
+    is safe to call on every startup. Each index is created on its own, so a
+    conflict on one does not skip the rest.
+    """
+    # Notification retention: each document carries its own expires_at,
+    # so the TTL monitor removes it continuously instead of a nightly sweep.
+    _ensure_index(
+        db.notifications,
+        [("expires_at", ASCENDING)],
+        name="notifications_ttl",
+        expireAfterSeconds=0
+    )
+    # Keyset pagination indexes: every listing sorts on (created_at, _id)
+    _ensure_index(
+        db.notifications,
+        [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="notifications_user_created"
+    )
+    _ensure_index(
+        db.notifications,
+        [("user_id", ASCENDING), ("read", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="notifications_user_unread_created"
+    )
+    _ensure_index(
+        db.notifications,
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="notifications_created"
+    )
+    _ensure_index(
+        db.products,
+        [("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="products_created"
+    )
+    _ensure_index(
+        db.tracked_products,
+        [("is_active", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+        name="tracked_products_active_created"
+    )
+    _ensure_index(
+        db.notifications,
+        [("read", ASCENDING), ("created_at", ASCENDING)],
+        name="notifications_read_created"
+    )
+    # Refresh priority queue and per-product tracker lookups
+    _ensure_index(db.products, [("next_check_at", ASCENDING)], name="products_next_check")
+    _ensure_index(
+        db.products,
+        [("shard_key", ASCENDING), ("next_check_at", ASCENDING), ("_id", ASCENDING)],
+        name="products_shard_next_check"
+    )
+    _ensure_index(
+        db.refresh_runs,
+        [("shard", ASCENDING), ("status", ASCENDING), ("started_at", DESCENDING)],
+        name="refresh_runs_shard_status"
+    )
+    _ensure_index(db.refresh_runs, [("started_at", DESCENDING)], name="refresh_runs_started")
+    _ensure_index(
+        db.refresh_runs,
+        [("expires_at", ASCENDING)],
+        name="refresh_runs_ttl",
+        expireAfterSeconds=0
+    )
+    _ensure_index(db.forecasts, [("product_id", ASCENDING)], name="forecasts_product", unique=True)
+    _ensure_index(
+        db.price_rollups,
+        [("product_id", ASCENDING), ("resolution", ASCENDING), ("bucket", ASCENDING)],
+        name="price_rollups_product_bucket",
+        unique=True
+    )
+    _ensure_index(
+        db.price_history_archive,
+        [("product_id", ASCENDING), ("start", ASCENDING)],
+        name="price_history_archive_product_start",
+        unique=True
+    )
+    _ensure_index(
+        db.price_history_archive,
+        [("product_id", ASCENDING), ("end", ASCENDING)],
+        name="price_history_archive_product_end"
+    )
+    _ensure_index(
+        db.user_tracking,
+        [("product_id", ASCENDING), ("user_id", ASCENDING)],
+        name="user_tracking_product_user"
+    )
+    # Alert matching: range scan over the targets a price drop crossed
+    _ensure_index(
+        db.user_tracking,
+        [("product_id", ASCENDING), ("notify_on_price_drop", ASCENDING), ("target_price", ASCENDING)],
+        name="user_tracking_price_drop"
+    )
+    # Slow-query report: ranked by total time, expired when a shape stops recurring
+    _ensure_index(
+        db.slow_queries,
+        [("total_ms", DESCENDING)],
+        name="slow_queries_total"
+    )
+    _ensure_index(
+        db.slow_queries,
+        [("expires_at", ASCENDING)],
+        name="slow_queries_ttl",
+        expireAfterSeconds=0
+    )
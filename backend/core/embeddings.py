@@ -0,0 +1,45 @@
+# backend/core/embeddings.py
+"""
+Shared sentence-embedding model, loaded on first use.
+
+Importing sentence_transformers pulls in torch and takes seconds, and
+loading the model takes longer still, so nothing imports it at module level:
+get_model() loads it once per process the first time a caller actually needs
+embeddings, and every caller (search recommendations, product matching)
+shares that one instance. When the package or the model is unavailable it
+returns None and callers use their non-semantic fallbacks.
+"""
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+_model = None
+_loaded = False
+_lock = threading.Lock()
+
+
+def get_model():
+    """The process-wide SentenceTransformer, or None if it can't be loaded."""
+    global _model, _loaded
+    if not _loaded:
+        with _lock:
+            if not _loaded:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    _model = SentenceTransformer(MODEL_NAME)
+                    logger.info("✅ Sentence Transformers model loaded successfully")
+                except ImportError:
+                    logger.warning("⚠️ sentence_transformers not installed - using fallback matching")
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not load sentence transformers model: {e}")
+                _loaded = True
+    return _model
+
+
+def cos_sim(a, b):
+    """Pairwise cosine similarity of two embedding tensors."""
+    from sentence_transformers import util
+    return util.pytorch_cos_sim(a, b)
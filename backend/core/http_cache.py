@@ -0,0 +1,165 @@
+# backend/core/http_cache.py
+"""
+Conditional GETs for product read endpoints.
+
+Every product carries two counters:
+
+- ``version``: bumped by every write to the product document (price
+  updates, tracking an existing URL, scheduling, archiving, imports and the
+  stats/rollup/shard backfills), so it changes whenever the document as
+  served by GET /api/products/<id> changes;
+- ``history_version``: bumped only when a price point is appended (or
+  history is imported), which is all the history and analysis endpoints
+  depend on.
+
+Responses get a weak ETag built from the relevant counter plus the request's
+query string and Accept header, and ``Cache-Control: private, no-cache`` so
+clients always revalidate. Revalidation is cheap: each worker keeps a small LRU map of
+product_id -> counters, and a request whose If-None-Match matches the mapped
+counters is answered 304 without touching Mongo. Entries are re-read after
+HTTP_CACHE_VERSION_TTL_SECONDS, which bounds how long a bump made by another
+worker (or by a bulk backfill) can go unnoticed; single-product writes made
+in this worker evict the entry at once.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from functools import wraps
+from typing import Dict, Optional
+
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import current_app, make_response, request
+
+from core.db import get_db
+from core.metrics import record_cache
+
+CACHE_CONTROL = "private, no-cache"
+
+_FIELDS = ("version", "history_version")
+
+
+class VersionMap:
+    """Thread-safe LRU map of product_id -> {version, history_version}."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 5):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, db, product_id) -> Optional[Dict[str, int]]:
+        """
+        Counters for a product, from the map when fresh, else from Mongo.
+
+        Returns:
+            Dict with version and history_version, or None if the product
+            doesn't exist (or the id is malformed)
+        """
+        key = str(product_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                record_cache("http_versions", "hit")
+                return entry[0]
+            self.stats["misses"] += 1
+        record_cache("http_versions", "miss")
+
+        try:
+            oid = ObjectId(key)
+        except (InvalidId, TypeError):
+            return None
+        doc = db.products.find_one({"_id": oid}, {field: 1 for field in _FIELDS})
+        if doc is None:
+            return None
+        versions = {field: doc.get(field, 0) for field in _FIELDS}
+        self.put(key, versions)
+        return versions
+
+    def put(self, product_id, versions: Dict[str, int]) -> None:
+        with self._lock:
+            self._entries[str(product_id)] = (versions, time.monotonic())
+            self._entries.move_to_end(str(product_id))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, product_id) -> None:
+        """Forget a product so the next request re-reads its counters."""
+        with self._lock:
+            self._entries.pop(str(product_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_map: Optional[VersionMap] = None
+_map_lock = threading.Lock()
+
+
+def get_version_map(config: Optional[Dict] = None) -> VersionMap:
+    """Process-wide map, sized from HTTP_CACHE_VERSION_MAP_SIZE / HTTP_CACHE_VERSION_TTL_SECONDS on first use."""
+    global _map
+    if _map is None:
+        with _map_lock:
+            if _map is None:
+                config = config or {}
+                _map = VersionMap(
+                    max_entries=config.get("HTTP_CACHE_VERSION_MAP_SIZE", 10000),
+                    ttl_seconds=config.get("HTTP_CACHE_VERSION_TTL_SECONDS", 5)
+                )
+    return _map
+
+
+def make_etag(product_id, field: str, version: int, variant: bytes = b"") -> str:
+    """Opaque tag for (product, counter, request variant)."""
+    digest = hashlib.blake2b(variant, digest_size=8).hexdigest()
+    return f"{product_id}-{field[0]}{version}-{digest}"
+
+
+def conditional(field: str = "version", daily: bool = False):
+    """
+    Decorate a view taking ``product_id`` with ETag/If-None-Match handling.
+
+    Args:
+        field: Counter the response depends on ("version" or "history_version")
+        daily: Also vary the tag by UTC date, for responses over a window
+            relative to now (e.g. ?days=30) that shift without any write
+
+    Successful (200) responses get the ETag and Cache-Control headers;
+    responses marked ``X-Cache: stale`` are computed from an older version
+    and are sent without an ETag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(product_id, *args, **kwargs):
+            versions = get_version_map(current_app.config).get(get_db(), product_id)
+            if versions is None:
+                return view(product_id, *args, **kwargs)
+
+            # Same URL, different representation (JSON vs NDJSON)
+            variant = request.query_string + b"|" + request.headers.get("Accept", "").encode()
+            if daily:
+                variant += datetime.utcnow().strftime("|%Y-%m-%d").encode()
+            etag = make_etag(product_id, field, versions[field], variant)
+
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(product_id, *args, **kwargs))
+                if response.status_code != 200 or response.headers.get("X-Cache") == "stale":
+                    return response
+            response.set_etag(etag, weak=True)
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,99 @@
+# backend/core/json_provider.py
+"""
+Flask JSON provider built on orjson.
+
+Mongo documents and service results can be returned from views as-is:
+ObjectId, datetime/date, Decimal/Decimal128, NumPy scalars and arrays, sets
+and Pydantic models are all serialized natively. Naive datetimes are treated
+as UTC (everything in the database is stored with utcnow) and rendered as
+ISO 8601 with a +00:00 offset.
+
+orjson is optional: without it the stdlib provider is used with the same
+type handling.
+"""
+import datetime
+import decimal
+from typing import Any
+
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from pydantic import BaseModel
+except ImportError:
+    BaseModel = None
+
+
+def default(obj: Any) -> Any:
+    """Convert types neither encoder understands; raise TypeError otherwise."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, Decimal128):
+        obj = obj.to_decimal()
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if BaseModel is not None and isinstance(obj, BaseModel):
+        return obj.model_dump() if hasattr(obj, "model_dump") else obj.dict()
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, datetime.timedelta):
+        return obj.total_seconds()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """JSONProvider that encodes with orjson and writes bytes straight into the response."""
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson else 0
+    mimetype = "application/json"
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=default, option=self.option)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b"\n", mimetype=self.mimetype)
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """Fallback when orjson isn't installed: same types, stdlib encoder."""
+
+    @staticmethod
+    def default(obj: Any) -> Any:
+        if isinstance(obj, datetime.datetime):
+            if obj.tzinfo is None:
+                obj = obj.replace(tzinfo=datetime.timezone.utc)
+            return obj.isoformat()
+        if isinstance(obj, datetime.date):
+            return obj.isoformat()
+        return default(obj)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        return self.dumps(obj).encode()
+
+
+def init_json(app) -> None:
+    """Install the fastest available JSON provider on the app."""
+    app.json = OrjsonProvider(app) if orjson else StdlibProvider(app)
@@ -0,0 +1,143 @@
+# backend/core/leases.py
+"""
+Mongo-backed job leases.
+
+Every process that calls create_app runs its own scheduler, so each job run
+first claims a lease document in db.job_leases. A claim is a single atomic
+find_one_and_update that only matches when the lease is free, expired or
+already ours; a process that dies simply stops renewing and its lease is
+picked up by the next worker once expires_at passes.
+"""
+import logging
+import os
+import random
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Products carry a random shard_key in [0, SHARD_KEY_SPACE); shards are
+# contiguous ranges of it, so the shard count can change without rewriting data.
+SHARD_KEY_SPACE = 1 << 16
+
+# Identifies this process across hosts and restarts
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def shard_ranges(shard_count: int) -> List[Tuple[int, int]]:
+    """Split the shard key space into shard_count contiguous [lo, hi) ranges."""
+    shard_count = max(1, shard_count)
+    step = SHARD_KEY_SPACE / shard_count
+    return [(int(i * step), int((i + 1) * step)) for i in range(shard_count)]
+
+
+def random_shard_key() -> int:
+    """Shard key assigned to newly inserted products."""
+    return random.randrange(SHARD_KEY_SPACE)
+
+
+class LeaseManager:
+    """Claims, renews and releases named leases in db.job_leases."""
+
+    def __init__(self, db, owner: Optional[str] = None):
+        self.db = db
+        self.owner = owner or WORKER_ID
+
+    def acquire(self, name: str, ttl_seconds: int) -> bool:
+        """
+        Try to claim a lease.
+
+        Args:
+            name: Lease name (one per job or per job shard)
+            ttl_seconds: How long the lease is held without renewal
+
+        Returns:
+            bool: True if this process now holds the lease
+        """
+        now = datetime.utcnow()
+        try:
+            lease = self.db.job_leases.find_one_and_update(
+                {
+                    "_id": name,
+                    "$or": [
+                        {"expires_at": {"$lt": now}},
+                        {"owner": self.owner}
+                    ]
+                },
+                {
+                    "$set": {
+                        "owner": self.owner,
+                        "acquired_at": now,
+                        "expires_at": now + timedelta(seconds=ttl_seconds)
+                    }
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            # Lease exists and is held by someone else; the upsert lost the race
+            return False
+        return bool(lease) and lease.get("owner") == self.owner
+
+    def renew(self, name: str, ttl_seconds: int) -> bool:
+        """Extend a lease we hold. Returns False if it was lost."""
+        result = self.db.job_leases.update_one(
+            {"_id": name, "owner": self.owner},
+            {"$set": {"expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)}}
+        )
+        return result.matched_count > 0
+
+    def release(self, name: str) -> None:
+        """Give a lease back immediately by expiring it."""
+        self.db.job_leases.update_one(
+            {"_id": name, "owner": self.owner},
+            {"$set": {"expires_at": datetime.utcnow()}}
+        )
+
+    def get_leases(self, prefix: str = "") -> List[Dict]:
+        """List leases, optionally limited to names starting with prefix."""
+        query = {"_id": {"$regex": f"^{prefix}"}} if prefix else {}
+        return list(self.db.job_leases.find(query, sort=[("_id", 1)]))
+
+    @contextmanager
+    def hold(self, name: str, ttl_seconds: int, release_on_exit: bool = True):
+        """
+        Context manager yielding True while the lease is held.
+
+        Yields False (and does nothing on exit) when another worker holds it.
+        Periodic singleton jobs pass release_on_exit=False so the lease keeps
+        out workers whose scheduler fires a few seconds later for the same run.
+        """
+        acquired = self.acquire(name, ttl_seconds)
+        try:
+            yield acquired
+        finally:
+            if acquired and release_on_exit:
+                self.release(name)
+
+
+class LeaseKeeper:
+    """Renews a held lease from inside a long loop, at most every ttl/3 seconds."""
+
+    def __init__(self, leases: LeaseManager, name: str, ttl_seconds: int):
+        self.leases = leases
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self._last_renewal = datetime.utcnow()
+
+    def keep_alive(self) -> bool:
+        """Renew if due. Returns False once the lease has been lost."""
+        now = datetime.utcnow()
+        if (now - self._last_renewal).total_seconds() < self.ttl_seconds / 3:
+            return True
+        self._last_renewal = now
+        if not self.leases.renew(self.name, self.ttl_seconds):
+            logger.warning(f"Lost lease {self.name}; stopping work on it")
+            return False
+        return True
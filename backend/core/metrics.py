@@ -0,0 +1,202 @@
+# backend/core/metrics.py
+"""
+Prometheus instrumentation for PriceHawk.
+
+Collected here:
+
+- HTTP request latency per route (url rule, not raw path) and status;
+- MongoDB command latency per command and collection, from a pymongo
+  CommandListener registered in init_db;
+- adapter search/fetch latency per adapter class (BaseAdapter wraps every
+  subclass's search and fetch_product);
+- cache lookups per cache and result (hit/stale/miss), from which hit ratios
+  are ``rate(..{result="hit"}) / rate(..)``;
+- background job durations per job and outcome.
+
+``/metrics`` serves them in the Prometheus text format. Under gunicorn set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) so every worker writes its
+samples to that directory and the endpoint aggregates all of them, whichever
+worker answers the scrape; without it, metrics cover the current process.
+
+prometheus_client is optional: without it every recording call is a no-op
+and /metrics answers 503.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from pymongo import monitoring
+
+from core.slow_queries import query_origin
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+# Request/command/fetch buckets in seconds
+LATENCY_BUCKETS = (.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30)
+JOB_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+
+if prometheus_client is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    # Sample files are opened in this directory as soon as metrics are used;
+    # gunicorn.conf.py creates it, plain `flask run` or worker processes may not
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+if prometheus_client is not None:
+    HTTP_LATENCY = Histogram(
+        "pricehawk_http_request_duration_seconds", "HTTP request latency by route",
+        ["method", "route", "status"], buckets=LATENCY_BUCKETS
+    )
+    MONGO_LATENCY = Histogram(
+        "pricehawk_mongo_command_duration_seconds", "MongoDB command latency",
+        ["command", "collection", "status"], buckets=LATENCY_BUCKETS
+    )
+    ADAPTER_LATENCY = Histogram(
+        "pricehawk_adapter_duration_seconds", "Adapter search/fetch latency",
+        ["adapter", "operation", "status"], buckets=LATENCY_BUCKETS
+    )
+    CACHE_REQUESTS = Counter(
+        "pricehawk_cache_requests", "Cache lookups by result",
+        ["cache", "result"]
+    )
+    JOB_DURATION = Histogram(
+        "pricehawk_job_duration_seconds", "Background job duration",
+        ["job", "status"], buckets=JOB_BUCKETS
+    )
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Count one cache lookup ("hit", "stale" or "miss")."""
+    if prometheus_client is not None:
+        CACHE_REQUESTS.labels(cache, result).inc()
+
+
+@contextmanager
+def time_adapter(adapter: str, operation: str):
+    """Time an adapter call; failures are recorded with status="error"."""
+    if prometheus_client is None:
+        yield
+        return
+    start = time.perf_counter()
+    status = "error"
+    try:
+        yield
+        status = "ok"
+    finally:
+        ADAPTER_LATENCY.labels(adapter, operation, status).observe(time.perf_counter() - start)
+
+
+def instrument_adapter_method(name: str, method: Callable) -> Callable:
+    """Wrap an adapter method so every call is timed under the adapter's class name."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with time_adapter(type(self).__name__, name):
+            return method(self, *args, **kwargs)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def timed_job(name: str):
+    """
+    Decorate a job function to record its duration and outcome.
+
+    Queries it issues are attributed to "job:<name>" in the slow-query report.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with query_origin(f"job:{name}"):
+                if prometheus_client is None:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                status = "error"
+                try:
+                    result = fn(*args, **kwargs)
+                    status = "ok"
+                    return result
+                finally:
+                    JOB_DURATION.labels(name, status).observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """
+    pymongo listener timing every command.
+
+    The collection is only present on the started event, so it is kept per
+    in-flight request id until the command finishes.
+    """
+
+    def __init__(self):
+        self._collections = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        value = event.command.get(event.command_name)
+        collection = value if isinstance(value, str) else ""
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = collection
+
+    def _finish(self, event, status: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_LATENCY.labels(event.command_name, collection, status).observe(event.duration_micros / 1e6)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+def command_listeners() -> list:
+    """Listeners to pass to MongoClient(event_listeners=...)."""
+    return [MongoCommandTimer()] if prometheus_client is not None else []
+
+
+def _registry():
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return prometheus_client.REGISTRY
+
+
+def init_metrics(app) -> None:
+    """Time every request and serve /metrics (METRICS_ENABLED)."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+
+    from flask import Response, g, request
+
+    if prometheus_client is not None:
+        @app.before_request
+        def start_timer():
+            g.request_started = time.perf_counter()
+
+        @app.teardown_request
+        def observe_request(exc=None):
+            started = g.pop("request_started", None)
+            if started is None:
+                return
+            rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            status = g.pop("response_status", 500 if exc is not None else 200)
+            HTTP_LATENCY.labels(request.method, rule, str(status)).observe(time.perf_counter() - started)
+
+        @app.after_request
+        def remember_status(response):
+            g.response_status = response.status_code
+            return response
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        if prometheus_client is None:
+            return Response("prometheus_client is not installed\n", status=503, mimetype="text/plain")
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,171 @@
+# backend/core/pagination.py
+"""
+Keyset (cursor) pagination over (created_at, _id).
+
+Each page is a bounded index range scan that starts right after the last
+document of the previous page, so deep pages cost the same as the first one.
+The position is handed to clients as an opaque, URL-safe continuation token.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo import DESCENDING
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    """Raised when a continuation token cannot be decoded."""
+
+
+def encode_cursor(doc: Dict, sort_field: str = "created_at") -> str:
+    """Build a continuation token pointing just past the given document."""
+    value = doc.get(sort_field)
+    doc_id = doc["_id"]
+    payload = {
+        "v": value.isoformat() if isinstance(value, datetime) else value,
+        "d": isinstance(value, datetime),
+        "i": str(doc_id),
+        "o": isinstance(doc_id, ObjectId),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[object, object]:
+    """Return the (sort value, _id) pair stored in a continuation token."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value = datetime.fromisoformat(payload["v"]) if payload["d"] else payload["v"]
+        doc_id = ObjectId(payload["i"]) if payload["o"] else payload["i"]
+        return value, doc_id
+    except Exception as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+
+def parse_page_size(value, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]."""
+    try:
+        size = int(value) if value is not None else default
+    except (TypeError, ValueError):
+        size = default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def paging_requested(args) -> bool:
+    """
+    Whether the client asked for a page (?limit= or ?cursor=).
+
+    Listings that returned plain lists before pagination keep doing so for
+    clients that don't page.
+    """
+    return args.get("limit") is not None or args.get("cursor") is not None
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str], sort_field: str = "created_at") -> Optional[Dict]:
+    """
+    Turn a comma-separated ?fields= parameter into a Mongo projection.
+
+    Unknown fields are ignored. The sort key and _id are always included
+    because the next cursor is built from them. Returns None (all fields)
+    when nothing valid was requested.
+    """
+    if not value:
+        return None
+    allowed = set(allowed)
+    fields = [f.strip() for f in value.split(",") if f.strip() in allowed]
+    if not fields:
+        return None
+    projection = {f: 1 for f in fields}
+    projection[sort_field] = 1
+    projection["_id"] = 1
+    return projection
+
+
+def _after_cursor(query: Dict, cursor: Optional[str], sort_field: str) -> Dict:
+    """Restrict query to documents after the cursor position."""
+    if not cursor:
+        return query
+    value, doc_id = decode_cursor(cursor)
+    after = {"$or": [
+        {sort_field: {"$lt": value}},
+        {sort_field: value, "_id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [query, after]} if query else after
+
+def paginate(collection, query: Dict, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None,
+             projection: Optional[Dict] = None, sort_field: str = "created_at") -> Tuple[List[Dict], Optional[str]]:
+    """
+    Fetch one page of documents, newest first.
+
+    Args:
+        collection: The pymongo collection to read from
+        query: Base filter; should be covered by an index ending in (sort_field, _id)
+        limit: Page size
+        cursor: Continuation token from the previous page, if any
+        projection: Optional field projection
+        sort_field: Primary sort key (ties broken by _id)
+
+    Returns:
+        Tuple of (documents, next_cursor); next_cursor is None on the last page
+    """
+    query = _after_cursor(query, cursor, sort_field)
+
+    # Fetch one extra document to learn whether another page exists
+    docs = list(collection.find(
+        query,
+        projection,
+        sort=[(sort_field, DESCENDING), ("_id", DESCENDING)],
+        limit=limit + 1
+    ))
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+
+    return docs, next_cursor
+
+def iterate(collection, query: Dict, cursor: Optional[str] = None, projection: Optional[Dict] = None,
+            sort_field: str = "created_at", batch_size: int = 500, limit: int = 0):
+    """
+    Stream every matching document in paginate() order, starting after cursor.
+
+    Uses one server-side cursor fetching batch_size documents per round trip,
+    so memory stays constant however many documents match.
+
+    Args:
+        collection: Mongo collection
+        query: Base filter
+        cursor: Optional token from a previous page
+        projection: Optional field projection
+        sort_field: Primary sort key (ties broken by _id)
+        batch_size: Documents per getMore
+        limit: Optional cap on documents (0 for no limit)
+
+    Returns:
+        Iterator of documents, newest first. The cursor token is decoded
+        before returning, so InvalidCursor is raised here rather than
+        mid-stream.
+    """
+    query = _after_cursor(query, cursor, sort_field)
+
+    results = collection.find(
+        query,
+        projection,
+        sort=[(sort_field, DESCENDING), ("_id", DESCENDING)],
+        limit=limit,
+        batch_size=batch_size
+    )
+    return _drain(results)
+
+def _drain(results):
+    try:
+        yield from results
+    finally:
+        results.close()
@@ -0,0 +1,125 @@
+# backend/core/price_codec.py
+"""
+Compact binary encoding for archived price history.
+
+Layout (all integers are zigzag LEB128 varints after the version byte):
+
+    version | count | scale | t0 | t1 - t0 | delta-of-delta ... | p0 | price deltas ...
+
+Timestamps are milliseconds since the epoch. Points are usually taken at a
+steady cadence, so the delta-of-delta is zero or tiny and most timestamps
+cost a single byte. Prices are stored as integers in units of 1/scale (scale
+is the smallest power of ten that represents every price exactly, up to
+10**6) and delta-encoded the same way Gorilla encodes values against their
+predecessor: unchanged or slightly changed prices cost one or two bytes.
+
+Decoding is vectorized: every varint in the blob is split and reassembled
+with NumPy, then two cumulative sums rebuild the timestamps.
+"""
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from core.price_series import PriceSeries
+
+VERSION = 1
+MAX_SCALE_DIGITS = 6
+
+
+class PriceCodecError(ValueError):
+    """Raised when a blob is not a valid encoded price series."""
+
+
+def _zigzag(value: int) -> int:
+    return (value << 1) ^ (value >> 63)
+
+
+def _write_varints(out: bytearray, values: Iterable[int]) -> None:
+    for value in values:
+        value = _zigzag(int(value))
+        while value > 0x7F:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def _read_varints(data: bytes, offset: int) -> np.ndarray:
+    raw = np.frombuffer(data, dtype=np.uint8, offset=offset)
+    if not len(raw):
+        return np.array([], dtype=np.int64)
+    if raw[-1] & 0x80:
+        raise PriceCodecError("Truncated varint")
+
+    ends = np.flatnonzero((raw & 0x80) == 0)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    lengths = ends - starts + 1
+    if lengths.max() > 9:
+        raise PriceCodecError("Varint too long")
+
+    position = np.arange(len(raw)) - np.repeat(starts, lengths)
+    shifted = (raw & 0x7F).astype(np.uint64) << (7 * position).astype(np.uint64)
+    values = np.bitwise_or.reduceat(shifted, starts)
+    # Undo zigzag
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def choose_scale(prices: np.ndarray) -> int:
+    """Smallest power of ten that makes every price an integer (capped at 10**6)."""
+    for digits in range(MAX_SCALE_DIGITS + 1):
+        scale = 10 ** digits
+        scaled = prices * scale
+        if np.all(np.abs(scaled - np.round(scaled)) < 1e-6):
+            return scale
+    return 10 ** MAX_SCALE_DIGITS
+
+
+def encode(series: PriceSeries) -> bytes:
+    """
+    Encode a PriceSeries.
+
+    Prices are rounded to 1/10**6 at worst; timestamps keep millisecond precision.
+    """
+    stamps = series.dates.astype(np.int64)
+    prices = series.prices
+    scale = choose_scale(prices) if len(prices) else 1
+
+    out = bytearray([VERSION])
+    _write_varints(out, (len(series), scale))
+    if len(series):
+        deltas = np.diff(stamps)
+        _write_varints(out, [stamps[0]])
+        _write_varints(out, np.concatenate([deltas[:1], np.diff(deltas)]).tolist())
+        scaled = np.round(prices * scale).astype(np.int64)
+        _write_varints(out, [scaled[0]])
+        _write_varints(out, np.diff(scaled).tolist())
+    return bytes(out)
+
+
+def decode_arrays(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode a blob straight into (datetime64[ms], float64) arrays.
+    """
+    if not data or data[0] != VERSION:
+        raise PriceCodecError("Unsupported price codec version")
+
+    values = _read_varints(data, 1)
+    if len(values) < 2:
+        raise PriceCodecError("Missing header")
+    count, scale = int(values[0]), int(values[1])
+    if count == 0:
+        return np.array([], dtype="datetime64[ms]"), np.array([], dtype=np.float64)
+    if len(values) != 2 + 2 * count or scale <= 0:
+        raise PriceCodecError("Point count does not match payload")
+
+    stamp_part = values[2:2 + count]
+    stamps = np.empty(count, dtype=np.int64)
+    stamps[0] = stamp_part[0]
+    if count > 1:
+        stamps[1:] = stamp_part[0] + np.cumsum(np.cumsum(stamp_part[1:]))
+    prices = np.cumsum(values[2 + count:]) / scale
+    return stamps.view("datetime64[ms]"), prices
+
+
+def decode(data: bytes) -> PriceSeries:
+    """Decode a blob into a PriceSeries."""
+    return PriceSeries(*decode_arrays(data))
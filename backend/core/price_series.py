@@ -0,0 +1,220 @@
+# backend/core/price_series.py
+"""
+Compact in-memory price series.
+
+A PriceSeries keeps a product's price history in two parallel buffers: an
+int64 array of millisecond timestamps (BSON dates have millisecond
+precision) exposed as NumPy datetime64[ms], and a float64 array of prices.
+Both are filled through array('q') / array('d') while decoding and then
+wrapped by NumPy without copying. A point costs 16 bytes instead of a dict,
+a datetime and a float.
+
+Slices are views, and to_numpy/to_pandas share the same buffers, so the
+forecasting code can work on the arrays directly.
+"""
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1)
+_MS = timedelta(milliseconds=1)
+
+
+def _to_ms(value: datetime) -> int:
+    return (value.replace(tzinfo=None) - _EPOCH) // _MS
+
+
+class PriceSeries:
+    """Immutable, time-sorted (date, price) series backed by NumPy buffers."""
+
+    __slots__ = ("_dates", "_prices")
+
+    def __init__(self, dates: np.ndarray, prices: np.ndarray):
+        self._dates = dates
+        self._prices = prices
+
+    # ---- construction ----
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(np.array([], dtype="datetime64[ms]"), np.array([], dtype=np.float64))
+
+    @classmethod
+    def from_bson(cls, points: Optional[Iterable[Dict]]) -> "PriceSeries":
+        """
+        Build from stored {"price", "date"} points (any order).
+
+        Points missing a price or date are skipped.
+        """
+        stamps = array("q")
+        prices = array("d")
+        for point in points or ():
+            date, price = point.get("date"), point.get("price")
+            if date is None or price is None:
+                continue
+            stamps.append(_to_ms(date))
+            prices.append(price)
+        return cls._from_buffers(stamps, prices)
+
+    @classmethod
+    def from_arrays(cls, dates, prices) -> "PriceSeries":
+        """Build from array-likes of dates and prices (copied only if needed)."""
+        dates = np.asarray(dates, dtype="datetime64[ms]")
+        prices = np.asarray(prices, dtype=np.float64)
+        return cls._sorted(dates, prices)
+
+    @classmethod
+    def concat(cls, *parts: "PriceSeries") -> "PriceSeries":
+        """Join series (re-sorted only if they overlap)."""
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls._sorted(
+            np.concatenate([p._dates for p in parts]),
+            np.concatenate([p._prices for p in parts])
+        )
+
+    @classmethod
+    def coerce(cls, value: Union["PriceSeries", Iterable[Dict], None]) -> "PriceSeries":
+        """Accept either a PriceSeries or stored BSON points."""
+        return value if isinstance(value, PriceSeries) else cls.from_bson(value)
+
+    @classmethod
+    def _from_buffers(cls, stamps: array, prices: array) -> "PriceSeries":
+        if not stamps:
+            return cls.empty()
+        dates = np.frombuffer(stamps, dtype=np.int64).view("datetime64[ms]")
+        return cls._sorted(dates, np.frombuffer(prices, dtype=np.float64))
+
+    @classmethod
+    def _sorted(cls, dates: np.ndarray, prices: np.ndarray) -> "PriceSeries":
+        if len(dates) > 1 and np.any(dates[1:] < dates[:-1]):
+            order = np.argsort(dates, kind="stable")
+            dates, prices = dates[order], prices[order]
+        return cls(dates, prices)
+
+    # ---- access ----
+
+    def __len__(self) -> int:
+        return len(self._prices)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return PriceSeries(self._dates[key], self._prices[key])
+        return self._dates[key].astype(datetime), float(self._prices[key])
+
+    def __iter__(self):
+        for date, price in zip(self._dates.astype(datetime), self._prices):
+            yield date, float(price)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "PriceSeries([])"
+        return f"PriceSeries({len(self)} points, {self._dates[0]} .. {self._dates[-1]})"
+
+    @property
+    def dates(self) -> np.ndarray:
+        return self._dates
+
+    @property
+    def prices(self) -> np.ndarray:
+        return self._prices
+
+    @property
+    def nbytes(self) -> int:
+        return self._dates.nbytes + self._prices.nbytes
+
+    def last(self) -> Optional[Tuple[datetime, float]]:
+        return self[-1] if len(self) else None
+
+    # ---- windows ----
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> "PriceSeries":
+        """View of points with start <= date < end."""
+        lo = 0 if start is None else int(np.searchsorted(self._dates, np.datetime64(_to_ms(start), "ms"), "left"))
+        hi = len(self) if end is None else int(np.searchsorted(self._dates, np.datetime64(_to_ms(end), "ms"), "left"))
+        return self[lo:hi]
+
+    def since(self, start: datetime) -> "PriceSeries":
+        """View of points at or after start."""
+        return self.between(start)
+
+    def price_at(self, when: datetime) -> Optional[float]:
+        """Price in force at ``when`` (the last point at or before it)."""
+        idx = int(np.searchsorted(self._dates, np.datetime64(_to_ms(when), "ms"), "right")) - 1
+        return float(self._prices[idx]) if idx >= 0 else None
+
+    def append(self, price: float, when: datetime) -> "PriceSeries":
+        """New series with one more point (copies; for a handful of appends)."""
+        dates = np.append(self._dates, np.datetime64(_to_ms(when), "ms"))
+        prices = np.append(self._prices, float(price))
+        return PriceSeries._sorted(dates, prices)
+
+    def window_from(self, cutoff: datetime) -> "PriceSeries":
+        """
+        Points at or after cutoff, seeded with the price in force at cutoff.
+
+        Prices are step functions, so the last point before the window
+        determines the price on the window's first day.
+        """
+        inside = self.since(cutoff)
+        carried = self.price_at(cutoff)
+        if carried is None or (len(inside) and inside._dates[0] == np.datetime64(_to_ms(cutoff), "ms")):
+            return inside
+        return PriceSeries(
+            np.concatenate([[np.datetime64(_to_ms(cutoff), "ms")], inside._dates]),
+            np.concatenate([[carried], inside._prices])
+        )
+
+    # ---- resampling ----
+
+    def resample_daily(self, end: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        One price per day: the last price seen that day, carried forward over
+        days without a change, up to ``end``.
+
+        Returns:
+            Tuple of (datetime64[D] dates, float64 prices)
+        """
+        if not len(self):
+            return np.array([], dtype="datetime64[D]"), np.array([], dtype=np.float64)
+
+        days = self._dates.astype("datetime64[D]")
+        first, last = days[0], days[-1]
+        if end is not None:
+            last = max(last, np.datetime64(end, "D"))
+        length = int((last - first).astype(np.int64)) + 1
+
+        offsets = (days - first).astype(np.int64)
+        last_of_day = np.r_[offsets[1:] != offsets[:-1], True]
+        filled = np.zeros(length, dtype=bool)
+        filled[offsets[last_of_day]] = True
+        values = np.empty(length, dtype=np.float64)
+        values[offsets[last_of_day]] = self._prices[last_of_day]
+
+        # Forward fill: index of the latest filled day at or before each day
+        idx = np.where(filled, np.arange(length), 0)
+        np.maximum.accumulate(idx, out=idx)
+        return first + np.arange(length), values[idx]
+
+    # ---- conversion ----
+
+    def to_numpy(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The underlying (datetime64[ms], float64) arrays, not copied."""
+        return self._dates, self._prices
+
+    def to_pandas(self):
+        """A pandas Series over the same price buffer, indexed by date."""
+        import pandas as pd
+        return pd.Series(self._prices, index=pd.DatetimeIndex(self._dates), copy=False)
+
+    def to_bson(self) -> List[Dict]:
+        """Stored {"price", "date"} points."""
+        return [
+            {"price": price, "date": date}
+            for date, price in zip(self._dates.astype(datetime), self._prices.tolist())
+        ]
@@ -125,6 +125,7 @@ class ForecastPoint(BaseModel):
     price: float
     price_lower: Optional[float] = None
     price_upper: Optional[float] = None
+    confidence: Optional[str] = None
     is_prediction: bool = True
 
 class PriceForecast(BaseModel):
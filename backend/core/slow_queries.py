@@ -0,0 +1,297 @@
+# backend/core/slow_queries.py
+"""
+Slow-query detector built on pymongo command monitoring.
+
+SlowQueryMonitor is registered with the MongoClient in init_db. Every
+command that takes at least SLOW_QUERY_THRESHOLD_MS is recorded under its
+normalized shape: the command, collection, the filter/sort/pipeline with
+every literal replaced by "?", and where it came from (the route of the
+current request, or the job set by core.metrics.timed_job). Recording is
+in memory; a background thread per process merges the aggregates into
+db.slow_queries every SLOW_QUERY_FLUSH_SECONDS:
+
+    {_id: shape hash, database, collection, command, shape, origin, count,
+     total_ms, max_ms, first_seen, last_seen, sample, plan, explained_at,
+     expires_at}
+
+After each flush the thread claims the SLOW_QUERY_EXPLAIN_TOP worst shapes
+(by total time) not explained in the last SLOW_QUERY_EXPLAIN_MINUTES, runs
+``explain`` (queryPlanner verbosity, nothing is executed) on their last
+sample and stores the plan: whether it is a COLLSCAN, its stages and the
+indexes it uses. Claims are atomic, so several workers share the work.
+The admin endpoint /api/admin/slow-queries serves the ranked report.
+"""
+import contextvars
+import hashlib
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from bson import json_util
+from pymongo import DESCENDING, monitoring
+
+logger = logging.getLogger(__name__)
+
+# Commands explain accepts
+EXPLAINABLE = ("find", "aggregate", "count", "distinct", "findAndModify", "update", "delete")
+
+# Never recorded: the detector's own traffic and connection chatter
+IGNORED_COMMANDS = {"explain", "hello", "isMaster", "ismaster", "ping", "saslStart", "saslContinue",
+                    "endSessions", "killCursors", "buildInfo"}
+
+# Session/transaction fields stripped from samples before they are stored or explained
+_SESSION_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+MONITOR_ORIGIN = "slow-query-monitor"
+
+_origin: contextvars.ContextVar = contextvars.ContextVar("query_origin", default=None)
+
+
+@contextmanager
+def query_origin(name: str):
+    """Attribute queries issued inside the block to ``name`` (e.g. "job:refresh_prices")."""
+    token = _origin.set(name)
+    try:
+        yield
+    finally:
+        _origin.reset(token)
+
+
+def current_origin() -> str:
+    """The job set by query_origin, else the current request's route, else "background"."""
+    origin = _origin.get()
+    if origin:
+        return origin
+    from flask import has_request_context, request
+    if has_request_context():
+        rule = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        return f"{request.method} {rule}"
+    return "background"
+
+
+def normalize_shape(value: Any) -> Any:
+    """Replace literals with "?", keeping field names, operators and structure."""
+    if isinstance(value, dict):
+        return {key: normalize_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, dict) for item in value):
+            return [normalize_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def command_collection(command_name: str, command: Dict) -> str:
+    value = command.get(command_name)
+    return value if isinstance(value, str) else command.get("collection", "")
+
+
+def command_shape(command_name: str, command: Dict) -> Dict:
+    """The parts of a command that decide its plan, normalized."""
+    if command_name == "find":
+        return {"filter": normalize_shape(command.get("filter", {})), "sort": command.get("sort")}
+    if command_name == "aggregate":
+        return {"pipeline": normalize_shape(command.get("pipeline", []))}
+    if command_name in ("count", "distinct"):
+        return {"query": normalize_shape(command.get("query", {})), "key": command.get("key")}
+    if command_name == "findAndModify":
+        return {"query": normalize_shape(command.get("query", {})), "sort": command.get("sort")}
+    if command_name == "update":
+        updates = command.get("updates") or [{}]
+        return {"q": normalize_shape(updates[0].get("q", {})), "multi": updates[0].get("multi", False)}
+    if command_name == "delete":
+        deletes = command.get("deletes") or [{}]
+        return {"q": normalize_shape(deletes[0].get("q", {}))}
+    return {}
+
+
+def sanitize_command(command: Dict) -> Dict:
+    """Command without $-prefixed envelope fields and session state, limited to one statement."""
+    sample = {k: v for k, v in command.items() if not k.startswith("$") and k not in _SESSION_FIELDS}
+    for key in ("updates", "deletes", "documents"):
+        if isinstance(sample.get(key), list):
+            sample[key] = sample[key][:1]
+    return sample
+
+
+def summarize_plan(explain: Dict) -> Dict:
+    """Stages and index names of every winning plan in an explain result."""
+    stages: List[str] = []
+    indexes: List[str] = []
+
+    def walk(node, in_plan):
+        if isinstance(node, dict):
+            if in_plan:
+                if isinstance(node.get("stage"), str):
+                    stages.append(node["stage"])
+                if isinstance(node.get("indexName"), str) and node["indexName"] not in indexes:
+                    indexes.append(node["indexName"])
+            for key, value in node.items():
+                walk(value, in_plan or key == "winningPlan")
+        elif isinstance(node, list):
+            for item in node:
+                walk(item, in_plan)
+
+    walk(explain, False)
+    return {"collscan": "COLLSCAN" in stages, "stages": stages, "indexes": indexes}
+
+
+class SlowQueryMonitor(monitoring.CommandListener):
+    """Records commands slower than the threshold, grouped by shape and origin."""
+
+    def __init__(self, threshold_ms: float = 100, max_shapes: int = 1000):
+        self.threshold_ms = threshold_ms
+        self.max_shapes = max_shapes
+        self._inflight: Dict[tuple, Dict] = {}
+        self._pending: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- CommandListener ----
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            self._inflight[(event.connection_id, event.request_id)] = event.command
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            command = self._inflight.pop((event.connection_id, event.request_id), None)
+        duration_ms = event.duration_micros / 1000
+        if command is None or duration_ms < self.threshold_ms:
+            return
+        origin = current_origin()
+        if origin == MONITOR_ORIGIN:
+            return
+        self.record(event.database_name, event.command_name, command, duration_ms, origin)
+
+    # ---- aggregation ----
+
+    def record(self, database: str, command_name: str, command: Dict, duration_ms: float,
+               origin: str, now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        collection = command_collection(command_name, command)
+        shape = json.dumps(command_shape(command_name, command), sort_keys=True, default=str)
+        key = hashlib.sha1(f"{database}|{collection}|{command_name}|{shape}|{origin}".encode()).hexdigest()
+        with self._lock:
+            entry = self._pending.get(key)
+            if entry is None:
+                if len(self._pending) >= self.max_shapes:
+                    return
+                entry = self._pending[key] = {
+                    "database": database, "collection": collection, "command": command_name,
+                    "shape": shape, "origin": origin, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "first_seen": now
+                }
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["last_seen"] = now
+            if command_name in EXPLAINABLE:
+                entry["sample"] = sanitize_command(command)
+
+    def flush(self, db, retention_days: int = 14) -> int:
+        """Merge pending aggregates into db.slow_queries; returns the number of shapes written."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        with query_origin(MONITOR_ORIGIN):
+            for key, entry in pending.items():
+                db.slow_queries.update_one(
+                    {"_id": key},
+                    {
+                        "$inc": {"count": entry["count"], "total_ms": entry["total_ms"]},
+                        "$max": {"max_ms": entry["max_ms"], "last_seen": entry["last_seen"]},
+                        "$min": {"first_seen": entry["first_seen"]},
+                        "$set": {
+                            "database": entry["database"], "collection": entry["collection"],
+                            "command": entry["command"], "shape": entry["shape"], "origin": entry["origin"],
+                            # Extended JSON: filters contain $-keys Mongo won't store as field names
+                            "sample": json_util.dumps(entry.get("sample")),
+                            "expires_at": entry["last_seen"] + timedelta(days=retention_days)
+                        }
+                    },
+                    upsert=True
+                )
+        return len(pending)
+
+    def explain_top(self, client, db, top: int = 5, every_minutes: float = 60) -> int:
+        """Explain the worst shapes not explained recently; returns how many were explained."""
+        now = datetime.utcnow()
+        cutoff = now - timedelta(minutes=every_minutes)
+        explained = 0
+        with query_origin(MONITOR_ORIGIN):
+            for _ in range(top):
+                doc = db.slow_queries.find_one_and_update(
+                    {"command": {"$in": list(EXPLAINABLE)}, "explained_at": {"$not": {"$gte": cutoff}}},
+                    {"$set": {"explained_at": now}},
+                    sort=[("total_ms", DESCENDING)]
+                )
+                if doc is None:
+                    break
+                try:
+                    sample = json_util.loads(doc.get("sample") or "null")
+                    if not sample:
+                        continue
+                    result = client[doc["database"]].command("explain", sample, verbosity="queryPlanner")
+                    plan = summarize_plan(result)
+                except Exception as e:
+                    plan = {"error": str(e)}
+                db.slow_queries.update_one({"_id": doc["_id"]}, {"$set": {"plan": plan}})
+                explained += 1
+        return explained
+
+    # ---- background thread ----
+
+    def start(self, client, db, config: Dict) -> None:
+        """Flush and explain periodically in a daemon thread."""
+        if self._thread is not None:
+            return
+        interval = config.get("SLOW_QUERY_FLUSH_SECONDS", 60)
+
+        def loop():
+            while not self._stop.wait(interval):
+                try:
+                    self.flush(db, config.get("SLOW_QUERY_RETENTION_DAYS", 14))
+                    self.explain_top(
+                        client, db,
+                        top=config.get("SLOW_QUERY_EXPLAIN_TOP", 5),
+                        every_minutes=config.get("SLOW_QUERY_EXPLAIN_MINUTES", 60)
+                    )
+                except Exception as e:
+                    logger.error(f"Slow-query flush failed: {str(e)}")
+
+        self._thread = threading.Thread(target=loop, name="slow-query-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def slow_query_report(db, limit: int = 50, sort: str = "total_ms", collscan_only: bool = False) -> List[Dict]:
+    """Recorded shapes ranked by total_ms, count, max_ms or avg_ms (samples omitted)."""
+    query = {"plan.collscan": True} if collscan_only else {}
+    projection = {"sample": 0, "expires_at": 0}
+    if sort == "avg_ms":
+        pipeline = [
+            {"$match": query},
+            {"$project": projection},
+            {"$addFields": {"avg_ms": {"$divide": ["$total_ms", "$count"]}}},
+            {"$sort": {"avg_ms": -1}},
+            {"$limit": limit}
+        ]
+        rows = list(db.slow_queries.aggregate(pipeline))
+    else:
+        rows = list(db.slow_queries.find(query, projection, sort=[(sort, DESCENDING)], limit=limit))
+        for row in rows:
+            row["avg_ms"] = row["total_ms"] / row["count"] if row.get("count") else 0.0
+    return rows
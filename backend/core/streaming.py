@@ -0,0 +1,58 @@
+# backend/core/streaming.py
+"""
+Streaming NDJSON responses.
+
+Listing endpoints switch to streaming when the client sends
+``Accept: application/x-ndjson``: rows come straight off a Mongo cursor, are
+encoded one per line with the app's JSON provider, and are flushed to the
+client in chunks of about NDJSON_FLUSH_BYTES. Peak memory is one cursor
+batch plus one chunk, whatever the result size.
+"""
+from typing import Callable, Iterable, Optional
+
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def wants_ndjson() -> bool:
+    """True when the client prefers NDJSON over JSON (``*/*`` keeps JSON)."""
+    return request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def stream_batch_size() -> int:
+    """Cursor batch size for streamed listings (NDJSON_BATCH_SIZE)."""
+    return current_app.config.get("NDJSON_BATCH_SIZE", 500)
+
+
+def ndjson_response(rows: Iterable, transform: Optional[Callable] = None,
+                    flush_bytes: Optional[int] = None) -> Response:
+    """
+    Stream rows as newline-delimited JSON.
+
+    Args:
+        rows: Iterable of documents (typically a Mongo cursor generator)
+        transform: Optional per-row function applied before encoding
+        flush_bytes: Chunk size to accumulate before yielding (NDJSON_FLUSH_BYTES)
+
+    Returns:
+        Response: A streaming response with mimetype application/x-ndjson
+    """
+    provider = current_app.json
+    encode = getattr(provider, "dumps_bytes", None) or (lambda obj: provider.dumps(obj).encode())
+    flush_bytes = flush_bytes or current_app.config.get("NDJSON_FLUSH_BYTES", 64 * 1024)
+
+    def generate():
+        buffer = bytearray()
+        for row in rows:
+            if transform is not None:
+                row = transform(row)
+            buffer += encode(row)
+            buffer += b"\n"
+            if len(buffer) >= flush_bytes:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
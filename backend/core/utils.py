@@ -1,5 +1,6 @@
 # backend/core/utils.py
 import logging
+from typing import Dict
 
 def setup_logging(app=None):
     fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -7,3 +8,19 @@ def setup_logging(app=None):
     if app:
         app.logger = logging.getLogger("pricehawk")
     return logging.getLogger("pricehawk")
+
+def parse_int_mapping(value: str) -> Dict[str, int]:
+    """
+    Parse a "key=int,key=int" environment string into a dict.
+    Malformed entries are skipped.
+    """
+    mapping = {}
+    for item in (value or "").split(","):
+        key, sep, raw = item.partition("=")
+        if not sep or not key.strip():
+            continue
+        try:
+            mapping[key.strip()] = int(raw)
+        except ValueError:
+            continue
+    return mapping
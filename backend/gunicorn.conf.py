@@ -0,0 +1,28 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn settings (picked up automatically from the working directory).
+
+Prometheus multiprocess mode: every worker writes its samples to
+PROMETHEUS_MULTIPROC_DIR and /metrics aggregates them. The directory is set
+here, before any worker imports the app, emptied when the master starts so
+stale files from a previous run don't leak into the totals, and dead
+workers' live gauges are dropped as they exit.
+"""
+import os
+import shutil
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/pricehawk-metrics")
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
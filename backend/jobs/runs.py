@@ -0,0 +1,209 @@
+# backend/jobs/runs.py
+"""
+Refresh run records.
+
+Each pass over a refresh shard is stored in db.refresh_runs with its
+checkpoint (the (next_check_at, _id) of the last product handled), counts,
+per-stage timings and errors. If a worker dies mid-run, the next worker to
+lease the shard finds the unfinished run and resumes after its checkpoint.
+
+A run is only written once it has progress to record, so ticks that find
+nothing due leave no trace. Finished runs get an expires_at and are removed
+by the TTL index on it after REFRESH_RUN_RETENTION_DAYS.
+"""
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+logger = logging.getLogger(__name__)
+
+# Errors kept per run; later ones are only counted
+MAX_RUN_ERRORS = 50
+
+STAGES = ("fetch", "update", "schedule", "notify")
+
+
+class RefreshRun:
+    """A single refresh pass over one shard, persisted as it progresses."""
+
+    def __init__(self, db, doc: Dict, checkpoint_every: int = 100, retention_days: float = 30,
+                 persisted: bool = True):
+        self.db = db
+        self.doc = doc
+        self.checkpoint_every = checkpoint_every
+        self.retention_days = retention_days
+        self.persisted = persisted
+        self._since_checkpoint = 0
+
+    @property
+    def id(self):
+        return self.doc["_id"]
+
+    @property
+    def as_of(self) -> datetime:
+        return self.doc["as_of"]
+
+    @property
+    def checkpoint(self) -> Optional[Dict]:
+        return self.doc.get("checkpoint")
+
+    @contextmanager
+    def timed(self, stage: str):
+        """Accumulate wall time spent in a stage, in milliseconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            stages = self.doc["stages_ms"]
+            stages[stage] = stages.get(stage, 0) + elapsed
+
+    def record_error(self, product_id, message: str) -> None:
+        """Remember a per-product error (capped at MAX_RUN_ERRORS)."""
+        self.doc["error_count"] += 1
+        if len(self.doc["errors"]) < MAX_RUN_ERRORS:
+            self.doc["errors"].append({
+                "product_id": str(product_id) if product_id is not None else None,
+                "message": message,
+                "at": datetime.utcnow()
+            })
+
+    def advance(self, product: Dict, outcome: str) -> None:
+        """Count a handled product and checkpoint every checkpoint_every products."""
+        counts = self.doc["counts"]
+        counts["checked"] += 1
+        if outcome in counts:
+            counts[outcome] += 1
+        self.doc["checkpoint"] = {"next_check_at": product.get("next_check_at"), "_id": product["_id"]}
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.save()
+
+    def save(self, **fields) -> None:
+        """Persist progress (and any extra fields) to db.refresh_runs."""
+        self.doc.update(fields)
+        self.doc["updated_at"] = datetime.utcnow()
+        self.db.refresh_runs.update_one(
+            {"_id": self.id},
+            {"$set": {k: v for k, v in self.doc.items() if k != "_id"}},
+            upsert=True
+        )
+        self.persisted = True
+        self._since_checkpoint = 0
+
+    @property
+    def empty(self) -> bool:
+        """True when the run has not been written and handled nothing."""
+        return not self.persisted and self.doc["counts"]["checked"] == 0 and self.doc["error_count"] == 0
+
+    def finish(self, status: str = "completed") -> None:
+        """Mark the run finished and store rounded stage timings; empty runs are dropped."""
+        if self.empty:
+            return
+        now = datetime.utcnow()
+        self.doc["stages_ms"] = {k: round(v, 1) for k, v in self.doc["stages_ms"].items()}
+        self.save(status=status, finished_at=now, expires_at=now + timedelta(days=self.retention_days))
+
+    def candidate_query(self, shard_range) -> Dict:
+        """Products in this run's shard that were due at as_of, after the checkpoint."""
+        query = {
+            "shard_key": {"$gte": shard_range[0], "$lt": shard_range[1]},
+            "next_check_at": {"$lte": self.as_of}
+        }
+        checkpoint = self.checkpoint
+        if checkpoint and checkpoint.get("next_check_at") is not None:
+            query = {"$and": [query, {"$or": [
+                {"next_check_at": {"$gt": checkpoint["next_check_at"]}},
+                {"next_check_at": checkpoint["next_check_at"], "_id": {"$gt": checkpoint["_id"]}}
+            ]}]}
+        return query
+
+    def stream_candidates(self, shard_range, limit: int, chunk_size: int = 200):
+        """
+        Iterate due products with a server-side cursor, chunk_size at a time.
+
+        Memory stays bounded by chunk_size regardless of catalog size.
+        """
+        cursor = self.db.products.find(
+            self.candidate_query(shard_range),
+            sort=[("next_check_at", ASCENDING), ("_id", ASCENDING)],
+            limit=limit,
+            batch_size=chunk_size
+        )
+        try:
+            for product in cursor:
+                yield product
+        finally:
+            cursor.close()
+
+
+class RefreshRunStore:
+    """Creates, resumes and lists refresh runs."""
+
+    def __init__(self, db, owner: str, checkpoint_every: int = 100, retention_days: float = 30):
+        self.db = db
+        self.owner = owner
+        self.checkpoint_every = checkpoint_every
+        self.retention_days = retention_days
+
+    def start(self, shard: int, shard_count: int) -> RefreshRun:
+        """
+        Resume the shard's unfinished run, or start a new one.
+
+        Must only be called while holding the shard's lease: any run still
+        marked "running" for the shard then belongs to a dead worker. Runs
+        left over from a different shard count cannot be resumed and are
+        marked abandoned.
+        """
+        now = datetime.utcnow()
+        self.db.refresh_runs.update_many(
+            {"status": "running", "shard_count": {"$ne": shard_count}},
+            {"$set": {
+                "status": "abandoned",
+                "finished_at": now,
+                "expires_at": now + timedelta(days=self.retention_days)
+            }}
+        )
+        orphan = self.db.refresh_runs.find_one(
+            {"shard": shard, "shard_count": shard_count, "status": "running"},
+            sort=[("started_at", DESCENDING)]
+        )
+        if orphan:
+            logger.info(f"Resuming refresh run {orphan['_id']} for shard {shard} from checkpoint")
+            orphan.update({
+                "owner": self.owner,
+                "resumed_at": now,
+                "resume_count": orphan.get("resume_count", 0) + 1
+            })
+            run = RefreshRun(self.db, orphan, self.checkpoint_every, self.retention_days)
+            run.save()
+            return run
+
+        # Not inserted yet: the first checkpoint or finish() writes it
+        doc = {
+            "_id": ObjectId(),
+            "shard": shard,
+            "shard_count": shard_count,
+            "owner": self.owner,
+            "status": "running",
+            "as_of": now,
+            "started_at": now,
+            "updated_at": now,
+            "checkpoint": None,
+            "counts": {"checked": 0, "changed": 0, "unchanged": 0, "failed": 0},
+            "stages_ms": {stage: 0.0 for stage in STAGES},
+            "errors": [],
+            "error_count": 0,
+            "resume_count": 0
+        }
+        return RefreshRun(self.db, doc, self.checkpoint_every, self.retention_days, persisted=False)
+
+    def recent(self, limit: int = 50, shard: Optional[int] = None) -> List[Dict]:
+        """Most recent runs, newest first."""
+        query = {"shard": shard} if shard is not None else {}
+        return list(self.db.refresh_runs.find(query, sort=[("started_at", DESCENDING)], limit=limit))
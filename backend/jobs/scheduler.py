@@ -2,7 +2,7 @@
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from .tasks import refresh_prices, clean_old_notifications, generate_price_forecasts
+from .tasks import refresh_prices, verify_notification_retention, generate_price_forecasts, compact_price_history
 
 logger = logging.getLogger(__name__)
 _scheduler = None
@@ -12,9 +12,10 @@ def init_scheduler(app):
     Initialize and start the background scheduler for periodic tasks.
     
     Tasks:
-    - refresh_prices: Check and update product prices (every 2 hours)
-    - clean_old_notifications: Remove old notifications (daily at midnight)
-    - generate_price_forecasts: Generate price forecasts (daily at 1 AM)
+    - refresh_prices: Check and update products that are due (every 15 minutes)
+    - verify_notification_retention: Report on TTL-based notification expiry (daily at midnight)
+    - generate_price_forecasts: Generate price forecasts (hourly, FORECAST_INTERVAL_MINUTES)
+    - compact_price_history: Archive old price points as encoded buckets (daily at 2 AM)
     """
     global _scheduler
     
@@ -31,34 +32,47 @@ def init_scheduler(app):
         }
     )
     
-    # Price refresh job - every 2 hours
+    # Price refresh job - drains the next_check_at queue every 15 minutes
     _scheduler.add_job(
         lambda: refresh_prices(app),
         'interval',
-        hours=2,
+        minutes=15,
         id='refresh_prices',
         replace_existing=True,
         next_run_time=None  # Start on next interval
     )
     
-    # Notification cleanup job - daily at midnight
+    # Notification retention check - daily at midnight
     _scheduler.add_job(
-        lambda: clean_old_notifications(app),
+        lambda: verify_notification_retention(app),
         CronTrigger(hour=0, minute=0),
-        id='clean_old_notifications',
+        id='verify_notification_retention',
         replace_existing=True
     )
     
-    # Forecast generation job - daily at 1 AM
+    # Forecast generation job - hourly by default (batch model is cheap)
     _scheduler.add_job(
         lambda: generate_price_forecasts(app),
-        CronTrigger(hour=1, minute=0),
+        'interval',
+        minutes=app.config.get("FORECAST_INTERVAL_MINUTES", 60),
         id='generate_price_forecasts',
         replace_existing=True
     )
     
+    # Price history compaction - daily at 2 AM
+    _scheduler.add_job(
+        lambda: compact_price_history(app),
+        CronTrigger(hour=2, minute=0),
+        id='compact_price_history',
+        replace_existing=True
+    )
+    
     # Start the scheduler
     _scheduler.start()
     logger.info("Background scheduler started")
     
     return _scheduler
+
+def get_scheduler():
+    """Return the running scheduler, if init_scheduler has been called."""
+    return _scheduler
@@ -1,24 +1,147 @@
 # backend/jobs/tasks.py
 import logging
+import math
+import random
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 from core.db import get_db
+from core.leases import LeaseKeeper, LeaseManager, shard_ranges
+from core.metrics import timed_job
+from core.price_series import PriceSeries
+from jobs.runs import RefreshRunStore
 from services.tracking import TrackingService
 from services.notifications import NotificationService
+from services.scheduling import RefreshScheduler
+from services.price_stats import backfill_price_stats
+from services.price_rollups import backfill_rollups
 # from adapters.base import get_adapter_for_url  # Not implemented yet
 from adapters.dev_mock import DevMockAdapter
 
 logger = logging.getLogger(__name__)
 
+def _refresh_product(db, product, tracking_service, notification_service, refresh_scheduler, run):
+    """
+    Fetch, update, notify and reschedule a single product.
+    
+    Stage timings and errors are recorded on the given RefreshRun.
+    
+    Returns:
+        str: "changed", "unchanged" or "failed"
+    """
+    product_id = product["_id"]
+    product_url = product["url"]
+    current_price = product["current_price"]
+    
+    # Get the appropriate adapter for this URL
+    # For now, use mock adapter for all URLs
+    adapter = DevMockAdapter()
+    
+    if not adapter:
+        logger.warning(f"No adapter found for URL: {product_url}")
+        run.record_error(product_id, "No adapter for URL")
+        return "failed"
+    
+    # Fetch current product data
+    try:
+        with run.timed("fetch"):
+            product_data = adapter.fetch_product(product_url)
+        
+        if not product_data or "price" not in product_data:
+            logger.warning(f"Failed to fetch price for product {product_id}")
+            run.record_error(product_id, "Fetch returned no price")
+            refresh_scheduler.backoff(product_id)
+            return "failed"
+        
+        new_price = product_data["price"]
+        in_stock = product_data.get("in_stock", True)
+        
+    except Exception as e:
+        logger.error(f"Error fetching product data: {str(e)}")
+        run.record_error(product_id, f"Fetch failed: {e}")
+        # If we can't fetch the product, retry after the base interval
+        refresh_scheduler.backoff(product_id)
+        return "failed"
+    
+    # Update price and check for notifications
+    with run.timed("update"):
+        update_result = tracking_service.update_price(product_id, new_price, in_stock)
+    
+    # Schedule the next check from the updated state
+    with run.timed("schedule"):
+        history = PriceSeries.from_bson(product.get("price_history"))
+        if update_result.get("price_changed"):
+            history = history.append(new_price, datetime.utcnow())
+        refresh_scheduler.reschedule(
+            {"_id": product_id, "current_price": new_price, "price_history": history}
+        )
+    
+    # Process notifications
+    with run.timed("notify"):
+        if update_result["status"] == "success" and update_result.get("notifications"):
+            for notification_data in update_result["notifications"]:
+                # Add product name and image URL to notification
+                notification_data["product_name"] = product["name"]
+                notification_data["image_url"] = product.get("image_url")
+                notification_data["url"] = product["url"]
+            
+                # Create notification
+                notification_service.create_notification(notification_data)
+            
+                # Get user email for email notification
+                user = db.users.find_one({"_id": notification_data["user_id"]})
+            
+                if user and user.get("email") and user.get("notification_preferences", {}).get("email_notifications", True):
+                    # Send email notification
+                    from api.notifications import send_email
+                
+                    subject = f"PriceHawk Alert: {notification_data['type'].replace('_', ' ').title()}"
+                
+                    if notification_data["type"] == "price_drop":
+                        body = f"""
+                        Good news! The price of {product['name']} has dropped.
+                    
+                        Old price: ${notification_data['old_price']}
+                        New price: ${notification_data['new_price']}
+                    
+                        View the product: {product['url']}
+                    
+                        - PriceHawk Team
+                        """
+                    elif notification_data["type"] == "back_in_stock":
+                        body = f"""
+                        Good news! {product['name']} is back in stock.
+                    
+                        Current price: ${new_price}
+                    
+                        View the product: {product['url']}
+                    
+                        - PriceHawk Team
+                        """
+                    else:
+                        body = notification_data["message"]
+                
+                    send_email(user["email"], subject, body)
+    
+    return "changed" if update_result.get("price_changed") else "unchanged"
+
+@timed_job("refresh_prices")
 def refresh_prices(app):
     """
-    Periodic task: Refresh prices for all tracked products.
+    Periodic task: Refresh prices for products whose next check is due.
     
+    Products are split into REFRESH_SHARDS ranges of shard_key. Every
+    process walks the shards in random order and only works on the ones it
+    can claim a lease for, so any number of gunicorn workers or hosts share
+    the catalog instead of each refreshing all of it. Within a shard,
+    products are streamed from the next_check_at queue, most overdue first,
+    and progress is checkpointed in a refresh run so a crashed pass resumes
+    where it stopped.
     For each product:
     1. Fetch current price using appropriate adapter
     2. Update price history
     3. Generate notifications if price drops or product is back in stock
+    4. Schedule the next check from its volatility, trackers and target gap
     """
     with app.app_context():
         logger.info("Starting price refresh job")
@@ -26,166 +149,253 @@ def refresh_prices(app):
         db = get_db()
         tracking_service = TrackingService()
         notification_service = NotificationService()
+        refresh_scheduler = RefreshScheduler()
+        leases = LeaseManager(db)
+        lease_ttl = app.config.get("JOB_LEASE_TTL_SECONDS", 300)
         
-        # Get all products that need to be checked
-        # We'll check products that haven't been checked in the last 6 hours
-        cutoff_time = datetime.utcnow() - timedelta(hours=6)
+        with leases.hold("refresh_prices:prepare_queue", lease_ttl) as acquired:
+            if acquired:
+                assigned = refresh_scheduler.assign_shard_keys()
+                scheduled = refresh_scheduler.backfill_next_check_at()
+                stats = backfill_price_stats(db)
+                rollups = backfill_rollups(db)
+                if assigned or scheduled or stats or rollups:
+                    logger.info(
+                        f"Prepared refresh queue: shard keys={assigned} next_check_at={scheduled} "
+                        f"price_stats={stats} rollups={rollups}"
+                    )
         
-        products_to_check = list(db.products.find({
-            "$or": [
-                {"last_checked": {"$lt": cutoff_time}},
-                {"last_checked": {"$exists": False}}
-            ]
-        }))
+        shard_count = app.config.get("REFRESH_SHARDS", 16)
+        shards = shard_ranges(shard_count)
+        shard_budget = max(1, math.ceil(app.config.get("REFRESH_BATCH_SIZE", 500) / len(shards)))
+        chunk_size = app.config.get("REFRESH_CHUNK_SIZE", 200)
+        runs = RefreshRunStore(
+            db,
+            leases.owner,
+            app.config.get("REFRESH_CHECKPOINT_EVERY", 100),
+            app.config.get("REFRESH_RUN_RETENTION_DAYS", 30)
+        )
+        order = list(range(len(shards)))
+        random.shuffle(order)
         
-        logger.info(f"Found {len(products_to_check)} products to check")
+        claimed = 0
+        counts = {"checked": 0, "changed": 0, "unchanged": 0, "failed": 0}
         
-        for product in products_to_check:
+        for index in order:
+            lease_name = f"refresh_prices:shard:{index}"
+            if not leases.acquire(lease_name, lease_ttl):
+                continue
+            
+            claimed += 1
+            keeper = LeaseKeeper(leases, lease_name, lease_ttl)
             try:
-                product_id = product["_id"]
-                product_url = product["url"]
-                current_price = product["current_price"]
-                
-                # Get the appropriate adapter for this URL
-                # For now, use mock adapter for all URLs
-                adapter = DevMockAdapter()
-                
-                if not adapter:
-                    logger.warning(f"No adapter found for URL: {product_url}")
-                    continue
-                
-                # Fetch current product data
-                try:
-                    product_data = adapter.fetch_product(product_url)
-                    
-                    if not product_data or "price" not in product_data:
-                        logger.warning(f"Failed to fetch price for product {product_id}")
-                        continue
-                    
-                    new_price = product_data["price"]
-                    in_stock = product_data.get("in_stock", True)
-                    
-                except Exception as e:
-                    logger.error(f"Error fetching product data: {str(e)}")
-                    # If we can't fetch the product, just update the last_checked timestamp
-                    db.products.update_one(
-                        {"_id": product_id},
-                        {"$set": {"last_checked": datetime.utcnow()}}
-                    )
-                    continue
-                
-                # Update price and check for notifications
-                update_result = tracking_service.update_price(product_id, new_price, in_stock)
-                
-                # Process notifications
-                if update_result["status"] == "success" and update_result.get("notifications"):
-                    for notification_data in update_result["notifications"]:
-                        # Add product name and image URL to notification
-                        notification_data["product_name"] = product["name"]
-                        notification_data["image_url"] = product.get("image_url")
-                        notification_data["url"] = product["url"]
-                        
-                        # Create notification
-                        notification_service.create_notification(notification_data)
-                        
-                        # Get user email for email notification
-                        user = db.users.find_one({"_id": notification_data["user_id"]})
-                        
-                        if user and user.get("email") and user.get("notification_preferences", {}).get("email_notifications", True):
-                            # Send email notification
-                            from api.notifications import send_email
-                            
-                            subject = f"PriceHawk Alert: {notification_data['type'].replace('_', ' ').title()}"
-                            
-                            if notification_data["type"] == "price_drop":
-                                body = f"""
-                                Good news! The price of {product['name']} has dropped.
-                                
-                                Old price: ${notification_data['old_price']}
-                                New price: ${notification_data['new_price']}
-                                
-                                View the product: {product['url']}
-                                
-                                - PriceHawk Team
-                                """
-                            elif notification_data["type"] == "back_in_stock":
-                                body = f"""
-                                Good news! {product['name']} is back in stock.
-                                
-                                Current price: ${new_price}
-                                
-                                View the product: {product['url']}
-                                
-                                - PriceHawk Team
-                                """
-                            else:
-                                body = notification_data["message"]
-                            
-                            send_email(user["email"], subject, body)
-                
+                run = runs.start(index, shard_count)
             except Exception as e:
-                logger.exception(f"Error refreshing price for product {product.get('_id')}: {str(e)}")
+                leases.release(lease_name)
+                logger.exception(f"Could not start refresh run for shard {index}: {str(e)}")
+                continue
+            status = "completed"
+            try:
+                remaining = max(0, shard_budget - run.doc["counts"]["checked"])
+                for product in run.stream_candidates(shards[index], remaining, chunk_size):
+                    if not keeper.keep_alive():
+                        # Another worker owns the shard now and will resume this run
+                        status = "running"
+                        break
+                    try:
+                        outcome = _refresh_product(
+                            db, product, tracking_service, notification_service, refresh_scheduler, run
+                        )
+                    except Exception as e:
+                        outcome = "failed"
+                        run.record_error(product.get("_id"), str(e))
+                        logger.exception(f"Error refreshing price for product {product.get('_id')}: {str(e)}")
+                    run.advance(product, outcome)
+            except Exception as e:
+                status = "failed"
+                run.record_error(None, f"Run aborted: {e}")
+                logger.exception(f"Refresh run {run.id} for shard {index} aborted: {str(e)}")
+            finally:
+                if status == "running":
+                    run.save()
+                else:
+                    run.finish(status)
+                    leases.release(lease_name)
+            
+            for key in counts:
+                counts[key] += run.doc["counts"][key]
         
-        logger.info("Price refresh job completed")
+        logger.info(
+            f"Price refresh job completed: shards={claimed}/{len(shards)} checked={counts['checked']} "
+            f"changed={counts['changed']} unchanged={counts['unchanged']} failed={counts['failed']}"
+        )
 
-def clean_old_notifications(app):
+@timed_job("verify_notification_retention")
+def verify_notification_retention(app):
     """
-    Periodic task: Remove notifications older than 30 days.
+    Periodic task: Verify and report on notification retention.
+    
+    Expiry itself is handled continuously by the TTL index on expires_at.
+    This job only backfills expires_at on legacy documents, optionally
+    archives read notifications, and logs a retention report.
     """
     with app.app_context():
-        logger.info("Starting notification cleanup job")
-        
         db = get_db()
-        cutoff_date = datetime.utcnow() - timedelta(days=30)
         
-        result = db.notifications.delete_many({
-            "created_at": {"$lt": cutoff_date}
-        })
-        
-        logger.info(f"Deleted {result.deleted_count} old notifications")
+        # Every worker's scheduler fires at midnight; only one runs the check
+        with LeaseManager(db).hold(
+            "verify_notification_retention",
+            app.config.get("SINGLETON_JOB_LEASE_SECONDS", 3600),
+            release_on_exit=False
+        ) as acquired:
+            if not acquired:
+                logger.info("Notification retention check already running elsewhere, skipping")
+                return None
+            return _verify_notification_retention(app, db)
+
+def _verify_notification_retention(app, db):
+    """Run the retention check; the caller holds the job lease."""
+    logger.info("Starting notification retention check")
+    
+    notification_service = NotificationService()
+    
+    report = notification_service.get_retention_report()
+    if not report["ttl_index"]:
+        logger.warning("Notification TTL index missing, recreating it")
+        from core.db import ensure_indexes
+        ensure_indexes(db)
+    
+    backfilled = notification_service.backfill_expiry()
+    
+    archived = 0
+    if app.config.get("NOTIFICATION_ARCHIVE_READ"):
+        archived = notification_service.archive_read_notifications(
+            app.config.get("NOTIFICATION_ARCHIVE_AFTER_DAYS", 7)
+        )
+    
+    if report["overdue"]:
+        logger.warning(f"{report['overdue']} notifications are past expiry; TTL monitor may be lagging")
+    
+    logger.info(
+        f"Notification retention: total={report['total']} backfilled={backfilled} "
+        f"archived={archived} overdue={report['overdue']}"
+    )
+    
+    report.update({"backfilled": backfilled, "archived_now": archived})
+    return report
 
+@timed_job("generate_price_forecasts")
 def generate_price_forecasts(app):
     """
     Periodic task: Generate price forecasts for products with sufficient history.
+    
+    Every product is first forecast by the vectorized Holt-Winters batch
+    model; only products it fits poorly are refit with Prophet in a process
+    pool. Runs in a single worker at a time, guarded by a job lease that is
+    renewed while the job makes progress.
     """
     with app.app_context():
+        db = get_db()
+        # Products with at least 10 price points, streamed by id only
+        products = db.products.find(
+            {"price_history.10": {"$exists": True}},
+            {"_id": 1},
+            batch_size=500
+        )
+        return _forecast_products(app, db, (product["_id"] for product in products))
+
+def retrain_forecasts_from_parquet(app, path: str):
+    """
+    One-off: Forecast every product in an exported Parquet snapshot.
+    
+    Takes the same lease as generate_price_forecasts, so it never runs
+    alongside it. The forecasts are stamped with a history_version no live
+    product has, so they are refit from Mongo when served instead of being
+    mistaken for forecasts of the current history.
+    """
+    with app.app_context():
+        from services.price_export import ParquetHistorySource
+        source = ParquetHistorySource(path)
+        return _forecast_products(app, get_db(), source.product_ids(), source=source)
+
+def _forecast_products(app, db, product_ids, source=None):
+    """
+    Batch-forecast product_ids, then refit the poorly fitting ones with Prophet.
+    
+    Returns the run stats, or None when another worker holds the forecast lease.
+    """
+    leases = LeaseManager(db)
+    # Held for half an interval so workers firing a little late skip this run
+    lease_ttl = int(app.config.get("FORECAST_INTERVAL_MINUTES", 60) * 30)
+    
+    with leases.hold("generate_price_forecasts", lease_ttl, release_on_exit=False) as acquired:
+        if not acquired:
+            logger.info("Forecast generation already running elsewhere, skipping")
+            return None
+        
         logger.info("Starting forecast generation job")
         
         from services.forecasting import ForecastingService
-        forecasting_service = ForecastingService()
+        from services.batch_forecasting import BatchForecaster, PreloadedHistory
+        from services.forecast_runner import ParallelForecastRunner
+        keeper = LeaseKeeper(leases, "generate_price_forecasts", lease_ttl)
         
-        db = get_db()
+        forecasting_service = ForecastingService()
+        days_ahead = app.config.get("FORECAST_DAYS_AHEAD", 14)
         
-        # Find products with at least 10 price points
-        products = list(db.products.find({
-            "price_history.10": {"$exists": True}  # At least 10 price points
-        }))
+        # Cheap vectorized model for everything first
+        batch = BatchForecaster(days_ahead, app.config.get("FORECAST_PROPHET_MAPE_THRESHOLD", 0.05))
+        stats, to_prophet = batch.run(
+            forecasting_service,
+            product_ids,
+            batch_size=app.config.get("FORECAST_BATCH_SIZE", 2000),
+            keep_alive=keeper.keep_alive,
+            source=source
+        )
         
-        logger.info(f"Generating forecasts for {len(products)} products")
-        
-        for product in products:
-            try:
-                product_id = product["_id"]
-                
-                # Generate forecast
-                forecast = forecasting_service.forecast_price(product_id)
-                
-                if forecast["status"] == "success":
-                    # Store forecast data
-                    db.forecasts.update_one(
-                        {"product_id": product_id},
-                        {
-                            "$set": {
-                                "product_id": product_id,
-                                "forecast": forecast["forecast"],
-                                "trend": forecast["trend"],
-                                "best_buy": forecast["best_buy"],
-                                "generated_at": datetime.utcnow()
-                            }
-                        },
-                        upsert=True
-                    )
-            except Exception as e:
-                logger.exception(f"Error generating forecast for product {product.get('_id')}: {str(e)}")
+        # Prophet only where the cheap model fits poorly
+        if to_prophet and forecasting_service.prophet_available:
+            runner = ParallelForecastRunner(
+                forecasting_service,
+                workers=app.config.get("FORECAST_WORKERS") or None,
+                fit_timeout=app.config.get("FORECAST_FIT_TIMEOUT_SECONDS", 30)
+            )
+            stats["prophet"] = runner.run_series(to_prophet, days_ahead, keep_alive=keeper.keep_alive)
+        elif to_prophet:
+            # No Prophet installed: keep the batch model's forecast anyway,
+            # reusing the arrays the first pass loaded
+            preloaded = PreloadedHistory(to_prophet)
+            stats["prophet"] = BatchForecaster(days_ahead, float("inf")).run(
+                forecasting_service, preloaded.product_ids(), source=preloaded
+            )[0]
         
         logger.info("Forecast generation job completed")
+        return stats
+
+@timed_job("compact_price_history")
+def compact_price_history(app):
+    """
+    Periodic task: Move price points older than PRICE_HISTORY_HOT_DAYS into
+    encoded archive buckets.
+    
+    Singleton job: the lease is kept after completion so other workers'
+    schedulers skip this run.
+    """
+    with app.app_context():
+        db = get_db()
+        leases = LeaseManager(db)
+        lease_ttl = app.config.get("SINGLETON_JOB_LEASE_SECONDS", 3600)
+        
+        with leases.hold("compact_price_history", lease_ttl, release_on_exit=False) as acquired:
+            if not acquired:
+                logger.info("Price history compaction already running elsewhere, skipping")
+                return None
+            
+            from services.price_archive import compact_price_history as compact
+            stats = compact(
+                db,
+                hot_days=app.config.get("PRICE_HISTORY_HOT_DAYS", 180),
+                limit=app.config.get("PRICE_HISTORY_COMPACT_BATCH", 1000)
+            )
+            logger.info(f"Price history compaction: {stats['products']} products, {stats['points']} points archived")
+            return stats
@@ -0,0 +1,41 @@
+# backend/jobs/worker.py
+"""
+Standalone background job worker.
+
+Run one or more of these (on any host) with SCHEDULER_ENABLED=false on the
+gunicorn workers, so web processes only serve requests:
+
+    python -m jobs.worker
+
+Workers share refresh shards and singleton jobs through leases in
+db.job_leases, so adding workers adds throughput instead of duplicate runs.
+"""
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+def main():
+    os.environ["SCHEDULER_ENABLED"] = "true"
+
+    from app import create_app
+    from jobs.scheduler import get_scheduler
+
+    app = create_app()
+    scheduler = get_scheduler()
+    if not scheduler:
+        logger.error("Scheduler failed to start; exiting")
+        return 1
+
+    logger.info("Job worker running")
+    try:
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        scheduler.shutdown()
+        logger.info("Job worker stopped")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
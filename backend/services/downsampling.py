@@ -0,0 +1,132 @@
+"""
+Downsampling for price-history charts.
+
+Both algorithms keep the first and last points and return at most ``n``
+indices into the input, in order:
+
+- lttb: Largest-Triangle-Three-Buckets keeps the point in each bucket that
+  forms the largest triangle with its neighbours, which preserves the visual
+  shape of the series.
+- minmax: keeps the lowest and highest point of each bucket, so no price
+  extreme is ever dropped.
+"""
+from typing import Dict, List
+
+import numpy as np
+
+from core.price_series import PriceSeries
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the points chosen by LTTB.
+
+    Args:
+        x: Monotonic x values (e.g. epoch seconds)
+        y: Values
+        n: Target number of points (>= 3 to have any effect)
+
+    Returns:
+        np.ndarray: Sorted indices into x/y
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # Interior points split into n - 2 buckets; first and last are always kept
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    chosen = np.empty(n, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, size - 1
+
+    a = 0
+    for i in range(n - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        if i + 2 < n - 1:
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x, avg_y = x[next_start:next_end].mean(), y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        chosen[i + 1] = a
+
+    return chosen
+
+
+def minmax(y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Indices of the min and max of each bucket.
+
+    Args:
+        y: Values
+        n: Target number of points; uses (n - 2) // 2 buckets plus the endpoints
+
+    Returns:
+        np.ndarray: Sorted, de-duplicated indices into y
+    """
+    size = len(y)
+    if n >= size or n < 4:
+        return np.arange(size)
+
+    y = np.asarray(y, dtype=np.float64)
+    edges = np.linspace(0, size, max(1, (n - 2) // 2) + 1).astype(np.int64)
+    picks = [0, size - 1]
+    for start, end in zip(edges[:-1], edges[1:]):
+        if end <= start:
+            continue
+        bucket = y[start:end]
+        picks.append(start + int(np.argmin(bucket)))
+        picks.append(start + int(np.argmax(bucket)))
+    return np.unique(picks)
+
+
+def downsample_points(points: List[Dict], n: int, method: str = "lttb") -> List[Dict]:
+    """
+    Downsample {"price", "date"} points (sorted by date) to at most n points.
+
+    Args:
+        points: Price points sorted by date
+        n: Target number of points
+        method: "lttb" or "minmax"
+
+    Returns:
+        List[Dict]: The selected points, still sorted by date
+    """
+    if not n or len(points) <= n:
+        return points
+
+    y = np.fromiter((p["price"] for p in points), dtype=np.float64, count=len(points))
+    if method == "minmax" and n >= 4:
+        indices = minmax(y, n)
+    else:
+        x = np.fromiter((p["date"].timestamp() for p in points), dtype=np.float64, count=len(points))
+        indices = lttb(x, y, n)
+    return [points[i] for i in indices]
+
+
+def downsample_series(series: PriceSeries, n: int, method: str = "lttb") -> PriceSeries:
+    """
+    Downsample a PriceSeries to at most n points, working on its arrays directly.
+
+    Args:
+        series: The price series
+        n: Target number of points
+        method: "lttb" or "minmax"
+
+    Returns:
+        PriceSeries: The selected points (the input itself if already small enough)
+    """
+    if not n or len(series) <= n:
+        return series
+
+    dates, prices = series.to_numpy()
+    if method == "minmax" and n >= 4:
+        indices = minmax(prices, n)
+    else:
+        indices = lttb(dates.astype(np.int64) / 1000.0, prices, n)
+    return PriceSeries(dates[indices], prices[indices])
@@ -0,0 +1,138 @@
+"""
+In-process forecast cache for PriceHawk.
+
+Entries are keyed by (product_id, kind, days_ahead) and remember the
+product's history_version they were computed from. TrackingService.update_price
+bumps history_version whenever a price point is appended, so a lookup with
+(product_id, days_ahead, history_version) is a hit exactly when nothing has
+changed since the result was computed.
+
+A lookup whose version (or age) no longer matches is served the stale value
+immediately while a background thread recomputes it (stale-while-revalidate),
+so dashboards never wait on a refit once a product has been seen. Eviction is
+least-recently-used.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from core.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+
+class ForecastCache:
+    """Thread-safe LRU cache with version invalidation and background revalidation."""
+
+    def __init__(self, max_entries: int = 1024, max_age_seconds: float = 3600, revalidate_workers: int = 2,
+                 name: str = "forecast"):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=revalidate_workers, thread_name_prefix="forecast-cache")
+        self.stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0}
+
+    def get(self, key: Hashable, version: Any, compute: Callable[[], Any],
+            cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str]:
+        """
+        Return the cached value for key, computing it if needed.
+
+        Args:
+            key: Cache key, e.g. (product_id, "forecast", days_ahead)
+            version: The product's current history_version
+            compute: Zero-argument callable producing a fresh value
+            cacheable: Optional predicate; computed values it rejects are
+                returned but not stored
+
+        Returns:
+            Tuple of (value, state) where state is "hit", "stale" or "miss"
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                cached_version, value, stored_at = entry
+                if cached_version == version and now - stored_at < self.max_age_seconds:
+                    self.stats["hits"] += 1
+                    record_cache(self.name, "hit")
+                    return value, "hit"
+                self.stats["stale"] += 1
+                record_cache(self.name, "stale")
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    self._executor.submit(self._revalidate, key, version, compute, cacheable)
+                return value, "stale"
+            self.stats["misses"] += 1
+        record_cache(self.name, "miss")
+
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.put(key, version, value)
+        return value, "miss"
+
+    def put(self, key: Hashable, version: Any, value: Any) -> None:
+        """Store a value, evicting the least recently used entries over max_entries."""
+        with self._lock:
+            self._entries[key] = (version, value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def invalidate(self, product_id) -> None:
+        """Drop every entry for a product."""
+        product_id = str(product_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == product_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def hit_ratio(self) -> float:
+        total = self.stats["hits"] + self.stats["stale"] + self.stats["misses"]
+        return (self.stats["hits"] + self.stats["stale"]) / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _revalidate(self, key, version, compute, cacheable=None):
+        try:
+            value = compute()
+            if cacheable is None or cacheable(value):
+                self.put(key, version, value)
+            else:
+                # Let the next request compute (and see) the failure itself
+                with self._lock:
+                    self._entries.pop(key, None)
+        except Exception as e:
+            logger.error(f"Forecast cache revalidation failed for {key}: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+_cache: Optional[ForecastCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_forecast_cache(config: Optional[Dict] = None) -> ForecastCache:
+    """Process-wide cache, sized from FORECAST_CACHE_SIZE / FORECAST_CACHE_MAX_AGE_SECONDS on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = config or {}
+                _cache = ForecastCache(
+                    max_entries=config.get("FORECAST_CACHE_SIZE", 1024),
+                    max_age_seconds=config.get("FORECAST_CACHE_MAX_AGE_SECONDS", 3600)
+                )
+    return _cache
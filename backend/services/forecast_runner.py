@@ -0,0 +1,182 @@
+"""
+Parallel forecast runner for PriceHawk.
+Fits per-product forecasts across a process pool for the nightly job.
+
+The parent process streams products from Mongo, loads each daily series as
+two compact NumPy arrays and ships those to the workers; each worker keeps
+one ForecastingService (and one Prophet import) for its lifetime. Results
+come back as plain dicts and are written to db.forecasts in bulk.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+
+from pymongo import UpdateOne
+
+from services.forecasting import HISTORY_DAYS, MIN_HISTORY_DAYS, ForecastingService, is_storable, series_from_arrays
+
+logger = logging.getLogger(__name__)
+
+# Per-process service, created by _init_worker
+_worker_service = None
+
+
+class FitTimeout(Exception):
+    """Raised inside a worker when a single fit exceeds its time budget."""
+
+
+def _on_alarm(signum, frame):
+    raise FitTimeout()
+
+
+def _init_worker():
+    """Pool initializer: import Prophet once per worker process."""
+    global _worker_service
+    _worker_service = ForecastingService()
+    if hasattr(signal, "SIGALRM"):
+        signal.signal(signal.SIGALRM, _on_alarm)
+
+
+def _fit_one(product_id: str, dates, prices, days_ahead: int, timeout: float) -> Dict:
+    """
+    Fit one product in a worker process.
+
+    The per-fit timeout is enforced with SIGALRM where available. A Prophet
+    fit that times out falls back to the simple trend model inside
+    ForecastingService, so a slow product still gets a forecast.
+    """
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _worker_service.forecast_from_series(product_id, series_from_arrays(dates, prices), days_ahead)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+
+
+class ParallelForecastRunner:
+    """Distributes forecast fits across a ProcessPoolExecutor."""
+
+    def __init__(self, forecasting_service: ForecastingService, workers: Optional[int] = None,
+                 fit_timeout: float = 30, write_batch_size: int = 200):
+        self.service = forecasting_service
+        self.workers = workers or os.cpu_count() or 1
+        self.fit_timeout = fit_timeout
+        self.write_batch_size = write_batch_size
+        # Cap queued tasks so memory stays bounded however many products there are
+        self.max_in_flight = self.workers * 4
+
+    def run(self, product_ids: Iterable, days_ahead: int, keep_alive=None) -> Dict:
+        """
+        Forecast every product and store the results.
+
+        Args:
+            product_ids: Iterable of product ids (typically a Mongo cursor)
+            days_ahead: Forecast horizon
+            keep_alive: Optional callable; returning False stops submitting work
+
+        Returns:
+            Dict: stored/skipped/failed counts, elapsed seconds and fits/sec
+        """
+        return self.run_series(self._load(product_ids), days_ahead, keep_alive)
+
+    def _load(self, product_ids: Iterable):
+        for product_id in product_ids:
+            try:
+                # Version first: a price appended during the load makes the forecast stale, not current
+                history_version = self.service.get_history_version(product_id)
+                dates, prices = self.service.load_daily_arrays(product_id, days=HISTORY_DAYS)
+            except Exception as e:
+                logger.error(f"Failed to load history for product {product_id}: {str(e)}")
+                yield product_id, None, None, None
+                continue
+            yield product_id, dates, prices, history_version
+
+    def run_series(self, items: Iterable, days_ahead: int, keep_alive=None) -> Dict:
+        """
+        Forecast already loaded series and store the results.
+
+        Args:
+            items: Iterable of (product_id, dates, prices, history_version); None arrays
+                count as failed loads
+            days_ahead: Forecast horizon
+            keep_alive: Optional callable; returning False stops submitting work
+
+        Returns:
+            Dict: stored/skipped/failed counts, elapsed seconds and fits/sec
+        """
+        counts = {"stored": 0, "skipped": 0, "failed": 0}
+        pending_writes = []
+        in_flight = {}
+        started = time.perf_counter()
+
+        # spawn: the parent holds scheduler threads and a MongoClient, neither fork-safe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=context,
+                                 initializer=_init_worker) as pool:
+            for product_id, dates, prices, history_version in items:
+                if keep_alive and not keep_alive():
+                    break
+                if prices is None:
+                    counts["failed"] += 1
+                    continue
+
+                if len(prices) < MIN_HISTORY_DAYS:
+                    counts["skipped"] += 1
+                    continue
+
+                future = pool.submit(_fit_one, str(product_id), dates, prices, days_ahead, self.fit_timeout)
+                in_flight[future] = (product_id, history_version)
+
+                if len(in_flight) >= self.max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    self._collect(done, in_flight, counts, pending_writes, days_ahead)
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                self._collect(done, in_flight, counts, pending_writes, days_ahead)
+
+        self._flush(pending_writes)
+
+        elapsed = time.perf_counter() - started
+        fits = counts["stored"] + counts["skipped"]
+        counts.update({
+            "elapsed_seconds": round(elapsed, 2),
+            "fits_per_second": round(fits / elapsed, 2) if elapsed > 0 else 0.0,
+            "workers": self.workers
+        })
+        logger.info(
+            f"Forecast runner: stored={counts['stored']} skipped={counts['skipped']} failed={counts['failed']} "
+            f"in {counts['elapsed_seconds']}s ({counts['fits_per_second']} fits/sec, {self.workers} workers)"
+        )
+        return counts
+
+    def _collect(self, done, in_flight, counts, pending_writes, days_ahead):
+        for future in done:
+            product_id, history_version = in_flight.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                counts["failed"] += 1
+                logger.error(f"Forecast fit failed for product {product_id}: {str(e)}")
+                continue
+
+            if is_storable(result):
+                doc = self.service.build_forecast_doc(result, days_ahead, history_version)
+                pending_writes.append(UpdateOne({"product_id": doc["product_id"]}, {"$set": doc}, upsert=True))
+                counts["stored"] += 1
+            else:
+                counts["skipped"] += 1
+
+        if len(pending_writes) >= self.write_batch_size:
+            self._flush(pending_writes)
+
+    def _flush(self, pending_writes):
+        if pending_writes:
+            self.service.db.forecasts.bulk_write(pending_writes, ordered=False)
+            pending_writes.clear()
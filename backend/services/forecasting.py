@@ -2,12 +2,87 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import logging
+import threading
+from itertools import chain
+
+from bson.objectid import ObjectId
+
+from core.db import get_db
+from core.price_series import PriceSeries
+from core.schemas import ForecastPoint, PriceForecast
+from services.price_stats import summarize
 
 logger = logging.getLogger(__name__)
 
+# Days of stored history used to fit a forecast
+HISTORY_DAYS = 90
+
+# Minimum length of the daily series before a forecast is attempted
+MIN_HISTORY_DAYS = 10
+
+def _as_object_id(product_id):
+    """Products are keyed by ObjectId; accept either form."""
+    if isinstance(product_id, ObjectId):
+        return product_id
+    try:
+        return ObjectId(product_id)
+    except Exception:
+        return product_id
+
+def is_storable(result: Dict) -> bool:
+    """Whether a forecast result is worth storing or caching (a real fit, not an error or demo)."""
+    return result.get("status") == "success" and result.get("model") != "demo"
+
+def resample_daily_arrays(points: List[Dict], end: Optional[datetime] = None):
+    """
+    Resample irregular price points to one value per day.
+    
+    Prices are step functions (a point is only stored when the price
+    changes), so each day takes the last price seen that day and days
+    without a change carry the previous price forward up to ``end``.
+    
+    Args:
+        points: {"price", "date"} dicts in any order, or a PriceSeries
+        end: Last day of the series (defaults to the last point's day)
+        
+    Returns:
+        Tuple of (datetime64[D] dates, float64 prices) NumPy arrays
+    """
+    return PriceSeries.coerce(points).resample_daily(end)
+
+def series_from_arrays(dates, prices) -> List[Dict]:
+    """Turn aligned date/price arrays into {"date": "YYYY-MM-DD", "price"} dicts."""
+    return [
+        {"date": str(day), "price": round(float(price), 2)}
+        for day, price in zip(np.asarray(dates, dtype="datetime64[D]"), prices)
+    ]
+
+def resample_daily(points: List[Dict], end: Optional[datetime] = None) -> List[Dict]:
+    """
+    Resample irregular price points to a gap-filled daily series.
+    
+    Returns:
+        List[Dict]: {"date": "YYYY-MM-DD", "price": float} per day
+    """
+    return series_from_arrays(*resample_daily_arrays(points, end))
+
+_shared_service = None
+_shared_lock = threading.Lock()
+
+def get_forecasting_service(db=None) -> "ForecastingService":
+    """Process-wide ForecastingService, so Prophet is imported once per process"""
+    global _shared_service
+    if _shared_service is None:
+        with _shared_lock:
+            if _shared_service is None:
+                _shared_service = ForecastingService(db)
+    return _shared_service
+
 class ForecastingService:
-    def __init__(self):
+    def __init__(self, db=None):
+        self._db = db
         self.prophet_available = False
         try:
             from prophet import Prophet
@@ -16,11 +91,33 @@ class ForecastingService:
         except ImportError:
             logger.warning("Prophet not available, using simple forecasting")
 
+    @property
+    def db(self):
+        # Resolved lazily so forecast worker processes never need an app context
+        if self._db is None:
+            self._db = get_db()
+        return self._db
+
     def forecast_price(self, product_id: str, days_ahead: int = 7):
         """Generate price forecast using Prophet or simple trend analysis"""
+        product_id = str(product_id)
+        try:
+            historical_data = self.load_daily_series(product_id, days=HISTORY_DAYS)
+        except Exception as e:
+            logger.error(f"Failed to load price history: {str(e)}")
+            return self._demo_forecast(product_id, days_ahead)
+        
+        return self.forecast_from_series(product_id, historical_data, days_ahead)
+
+    def forecast_from_series(self, product_id: str, historical_data: List[Dict], days_ahead: int = 7):
+        """Forecast from an already loaded daily series (no database access)"""
         try:
-            # Get historical price data (mock for now)
-            historical_data = self._get_mock_historical_data(product_id, days=30)
+            if len(historical_data) < MIN_HISTORY_DAYS:
+                return {
+                    "status": "insufficient_data",
+                    "product_id": str(product_id),
+                    "message": f"At least {MIN_HISTORY_DAYS} days of price history are needed for a forecast"
+                }
             
             if self.prophet_available and len(historical_data) >= 10:
                 return self._prophet_forecast(historical_data, days_ahead, product_id)
@@ -131,6 +228,7 @@ class ForecastingService:
                 trend_weight = 0
             
             current_price = prices[-1]
+            last_date = datetime.strptime(dates[-1], '%Y-%m-%d')
             predictions = []
             
             for i in range(1, days_ahead + 1):
@@ -141,7 +239,7 @@ class ForecastingService:
                 predicted_price = current_price + (trend_weight * i * seasonal_factor) + noise
                 predicted_price = max(0, predicted_price)  # Ensure positive price
                 
-                future_date = datetime.strptime(dates[-1], '%Y-%m-%d') + timedelta(days=i)
+                future_date = last_date + timedelta(days=i)
                 
                 predictions.append({
                     "date": future_date.strftime('%Y-%m-%d'),
@@ -182,33 +280,204 @@ class ForecastingService:
         else:
             return f"📊 Stable pricing - Price change expected: {price_change_pct:+.1f}%"
 
-    def _get_mock_historical_data(self, product_id: str, days: int = 30):
-        """Generate mock historical price data"""
-        base_price = 500 + abs(hash(product_id)) % 1000  # Deterministic base price
-        data = []
+    def load_daily_series(self, product_id, days: int = HISTORY_DAYS, now: Optional[datetime] = None) -> List[Dict]:
+        """
+        Load a product's stored price history as a gap-filled daily series.
         
-        for i in range(days):
-            date = (datetime.now() - timedelta(days=days-i)).strftime('%Y-%m-%d')
+        Args:
+            product_id: Product ID (string or ObjectId)
+            days: Length of the window, ending today
+            now: Reference time (defaults to utcnow)
             
-            # Add trends and seasonality
-            trend = -0.5 * i  # Slight downward trend
-            seasonal = 20 * np.sin(2 * np.pi * i / 7)  # Weekly pattern
-            noise = np.random.normal(0, 10)  # Random noise
-            
-            price = base_price + trend + seasonal + noise
-            price = max(50, price)  # Minimum price
-            
-            data.append({
-                "date": date,
-                "price": round(price, 2)
-            })
+        Returns:
+            List[Dict]: One {"date": "YYYY-MM-DD", "price": float} per day
+        """
+        return series_from_arrays(*self.load_daily_arrays(product_id, days, now))
+    
+    def load_daily_arrays(self, product_id, days: int = HISTORY_DAYS, now: Optional[datetime] = None):
+        """
+        Load a product's stored price history as daily (dates, prices) arrays.
+        
+        Only points inside the window (plus the last point before it, to seed
+        the first day) are read from Mongo.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=days)
+        
+        docs = list(self.db.products.aggregate([
+            {"$match": {"_id": _as_object_id(product_id)}},
+            self._window_projection(cutoff)
+        ]))
+        if not docs:
+            return resample_daily_arrays([])
+        return self._arrays_from_window(docs[0], cutoff, now)
+    
+    def load_daily_arrays_many(self, product_ids: List, days: int = HISTORY_DAYS,
+                               now: Optional[datetime] = None) -> Dict[str, tuple]:
+        """
+        Load daily (dates, prices) arrays for many products in one aggregation.
+        
+        Returns:
+            Dict[str, tuple]: Arrays keyed by product id string
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=days)
+        
+        docs = self.db.products.aggregate([
+            {"$match": {"_id": {"$in": [_as_object_id(p) for p in product_ids]}}},
+            self._window_projection(cutoff, include_id=True)
+        ])
+        return {str(doc["_id"]): self._arrays_from_window(doc, cutoff, now) for doc in docs}
+    
+    def _window_projection(self, cutoff: datetime, include_id: bool = False) -> Dict:
+        """$project stage keeping only price points inside the window (plus the one before it)."""
+        return {"$project": {
+            "_id": 1 if include_id else 0,
+            "points": {"$filter": {
+                "input": {"$ifNull": ["$price_history", []]},
+                "cond": {"$gte": ["$$this.date", cutoff]}
+            }},
+            "before": {"$last": {"$filter": {
+                "input": {"$ifNull": ["$price_history", []]},
+                "cond": {"$lt": ["$$this.date", cutoff]}
+            }}}
+        }}
+    
+    def _arrays_from_window(self, doc: Dict, cutoff: datetime, now: datetime):
+        seed = [{"price": doc["before"]["price"], "date": cutoff}] if doc.get("before") else []
+        return PriceSeries.from_bson(chain(seed, doc.get("points") or [])).resample_daily(end=now)
+    
+    def to_price_forecast(self, result: Dict) -> PriceForecast:
+        """Convert a forecast_price result into the stored PriceForecast schema."""
+        forecast = [
+            ForecastPoint(
+                date=p["date"],
+                price=p["predicted_price"],
+                price_lower=p.get("lower_bound"),
+                price_upper=p.get("upper_bound"),
+                confidence=p.get("confidence")
+            )
+            for p in result.get("predictions", [])
+        ]
+        best = min(forecast, key=lambda p: p.price) if forecast else None
+        return PriceForecast(
+            product_id=str(result["product_id"]),
+            forecast=forecast,
+            trend=result.get("trend", "unknown"),
+            best_buy={"date": best.date, "price": best.price} if best else {}
+        )
+    
+    def build_forecast_doc(self, result: Dict, days_ahead: int, history_version: Optional[int] = None) -> Dict:
+        """
+        Build the db.forecasts document for a successful forecast.
+
+        history_version is the product's version read before its history was
+        loaded; get_stored_forecast only serves the document while it matches.
+        """
+        forecast = self.to_price_forecast(result)
+        doc = forecast.model_dump() if hasattr(forecast, "model_dump") else forecast.dict()
+        doc.update({
+            "model": result.get("model"),
+            "current_price": result.get("current_price"),
+            "recommendation": result.get("recommendation"),
+            "days_ahead": days_ahead,
+            "generated_at": datetime.utcnow()
+        })
+        if history_version is not None:
+            doc["history_version"] = history_version
+        return doc
+    
+    def save_forecast(self, result: Dict, days_ahead: int, history_version: Optional[int] = None) -> Dict:
+        """
+        Store a successful forecast in db.forecasts (one document per product).
         
-        return data
+        Returns:
+            Dict: The stored document
+        """
+        doc = self.build_forecast_doc(result, days_ahead, history_version)
+        self.db.forecasts.update_one({"product_id": doc["product_id"]}, {"$set": doc}, upsert=True)
+        return doc
+    
+    def get_stored_forecast(self, product_id, days_ahead: int, max_age_hours: float,
+                            history_version: Optional[int] = None) -> Optional[Dict]:
+        """
+        Return the stored forecast in forecast_price's response shape, if it
+        is younger than max_age_hours, covers days_ahead and (when given) was
+        fitted on history_version of the product's history.
+        """
+        doc = self.db.forecasts.find_one({"product_id": str(product_id)}, {"_id": 0})
+        if not doc or doc.get("days_ahead", 0) < days_ahead:
+            return None
+        if history_version is not None and doc.get("history_version") != history_version:
+            return None
+        if doc["generated_at"] < datetime.utcnow() - timedelta(hours=max_age_hours):
+            return None
+        
+        return {
+            "status": "success",
+            "model": doc.get("model"),
+            "product_id": doc["product_id"],
+            "current_price": doc.get("current_price"),
+            "predictions": [
+                {
+                    "date": p["date"],
+                    "predicted_price": p["price"],
+                    "lower_bound": p.get("price_lower"),
+                    "upper_bound": p.get("price_upper"),
+                    "confidence": p.get("confidence")
+                }
+                for p in doc["forecast"][:days_ahead]
+            ],
+            "trend": doc["trend"],
+            "best_buy": doc.get("best_buy"),
+            "recommendation": doc.get("recommendation"),
+            "generated_at": doc["generated_at"].isoformat()
+        }
+    
+    def get_or_create_forecast(self, product_id, days_ahead: int = 7, max_age_hours: float = 24,
+                               history_version: Optional[int] = None) -> Dict:
+        """Serve a fresh stored forecast for the current history, otherwise fit one and store it."""
+        if history_version is None:
+            history_version = self.get_history_version(product_id)
+        stored = self.get_stored_forecast(product_id, days_ahead, max_age_hours, history_version)
+        if stored:
+            return stored
+        
+        result = self.forecast_price(product_id, days_ahead)
+        if is_storable(result):
+            self.save_forecast(result, days_ahead, history_version)
+        return result
+
+    def get_history_version(self, product_id) -> int:
+        """Current history_version of a product (0 if never bumped or unknown)"""
+        doc = self.db.products.find_one({"_id": _as_object_id(product_id)}, {"history_version": 1})
+        return (doc or {}).get("history_version", 0)
+
+    def get_history_versions(self, product_ids: List) -> Dict[str, int]:
+        """history_version of many products in one query, keyed by id string"""
+        docs = self.db.products.find(
+            {"_id": {"$in": [_as_object_id(p) for p in product_ids]}},
+            {"history_version": 1}
+        )
+        return {str(doc["_id"]): doc.get("history_version", 0) for doc in docs}
 
     def get_historical_analysis(self, product_id: str):
         """Get historical price analysis"""
+        product_id = str(product_id)
         try:
-            historical_data = self._get_mock_historical_data(product_id, days=90)
+            # Precomputed running stats (maintained by update_price) when present
+            product = self.db.products.find_one(
+                {"_id": _as_object_id(product_id)},
+                {"price_stats": 1, "current_price": 1}
+            )
+            summary = summarize(product.get("price_stats"), product.get("current_price")) if product else None
+            if summary:
+                analysis = {"product_id": product_id, "period_days": summary["window_days"], **summary}
+                return {"status": "success", "analysis": analysis}
+            
+            historical_data = self.load_daily_series(product_id, days=90)
+            if not historical_data:
+                return {"status": "insufficient_data", "message": "No price history for this product"}
             prices = [item['price'] for item in historical_data]
             
             analysis = {
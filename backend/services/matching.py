@@ -2,40 +2,31 @@
 import logging
 from typing import List, Dict, Tuple
 
-logger = logging.getLogger(__name__)
+from core.embeddings import cos_sim, get_model
 
-try:
-    from sentence_transformers import SentenceTransformer, util
-    try:
-        MODEL = SentenceTransformer('all-MiniLM-L6-v2')
-        logger.info("✅ Sentence Transformers model loaded successfully")
-    except Exception as e:
-        logger.warning(f"⚠️ Could not load sentence transformers model: {e}")
-        MODEL = None
-except ImportError:
-    logger.warning("⚠️ sentence_transformers not installed - using fallback clustering")
-    MODEL = None
-    util = None
+logger = logging.getLogger(__name__)
 
 def embed_texts(texts: List[str]):
     """
     Convert texts to embeddings using sentence transformers.
     Falls back to simple lowercase for fallback.
     """
-    if not MODEL:
+    model = get_model()
+    if not model:
         return [t.lower() for t in texts]
-    return MODEL.encode(texts, convert_to_tensor=True)
+    return model.encode(texts, convert_to_tensor=True)
 
 def get_similarity_score(text1: str, text2: str) -> float:
     """
     Calculate similarity score between two texts (0-1).
     """
-    if not MODEL:
+    model = get_model()
+    if not model:
         return 1.0 if text1.lower() == text2.lower() else 0.0
     
     try:
-        embeddings = MODEL.encode([text1, text2], convert_to_tensor=True)
-        similarity = util.pytorch_cos_sim(embeddings[0], embeddings[1])
+        embeddings = model.encode([text1, text2], convert_to_tensor=True)
+        similarity = cos_sim(embeddings[0], embeddings[1])
         return float(similarity)
     except Exception as e:
         logger.error(f"Error calculating similarity: {e}")
@@ -60,14 +51,15 @@ def cluster_products(items: List[Dict], score_threshold: float = 0.75) -> List[L
     
     titles = [i.get("title", "") for i in items]
     
-    if MODEL:
+    model = get_model()
+    if model:
         try:
-            embeddings = MODEL.encode(titles, convert_to_tensor=True)
+            embeddings = model.encode(titles, convert_to_tensor=True)
             import numpy as np
             
             clusters = []
             used = set()
-            sims = util.pytorch_cos_sim(embeddings, embeddings).cpu().numpy()
+            sims = cos_sim(embeddings, embeddings).cpu().numpy()
             
             for i in range(len(titles)):
                 if i in used:
@@ -3,13 +3,48 @@ Notification service for PriceHawk.
 Handles creating, retrieving, and managing user notifications.
 """
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from flask import current_app
 from core.db import get_db
+from core.pagination import paginate
 
 logger = logging.getLogger(__name__)
 
+# Default retention per notification type, in days. Overridden by the
+# NOTIFICATION_RETENTION_BY_TYPE config; unknown types fall back to
+# NOTIFICATION_RETENTION_DAYS.
+DEFAULT_RETENTION_DAYS = {
+    "price_drop": 30,
+    "back_in_stock": 14,
+    "test": 1,
+}
+
+# Fields kept when a read notification is moved to the cold archive
+ARCHIVE_FIELDS = ("user_id", "type", "product_id", "old_price", "new_price", "created_at")
+
+def get_retention_days(notification_type: str) -> int:
+    """Return how many days a notification of the given type is kept."""
+    overrides = current_app.config.get("NOTIFICATION_RETENTION_BY_TYPE") or {}
+    if notification_type in overrides:
+        return overrides[notification_type]
+    if notification_type in DEFAULT_RETENTION_DAYS:
+        return DEFAULT_RETENTION_DAYS[notification_type]
+    return current_app.config.get("NOTIFICATION_RETENTION_DAYS", 30)
+
+def notification_expires_at(notification_type: str, created_at: Optional[datetime] = None) -> datetime:
+    """Compute the expires_at value the TTL index uses to drop a notification."""
+    created_at = created_at or datetime.utcnow()
+    return created_at + timedelta(days=get_retention_days(notification_type))
+
+def get_notification_service() -> "NotificationService":
+    """NotificationService for the current app, built on first use inside an app context."""
+    service = current_app.extensions.get("notification_service")
+    if service is None:
+        service = current_app.extensions["notification_service"] = NotificationService()
+    return service
+
 class NotificationService:
     """Service for managing user notifications."""
     
@@ -34,13 +69,15 @@ class NotificationService:
             logger.error(f"Missing required fields for notification: {missing}")
             return {"status": "error", "message": f"Missing required fields: {missing}"}
         
+        created_at = datetime.utcnow()
         notification = {
             "user_id": notification_data["user_id"],
             "type": notification_data["type"],
             "message": notification_data["message"],
             "product_id": notification_data.get("product_id"),
             "read": False,
-            "created_at": datetime.utcnow(),
+            "created_at": created_at,
+            "expires_at": notification_expires_at(notification_data["type"], created_at),
             # Optional fields
             "old_price": notification_data.get("old_price"),
             "new_price": notification_data.get("new_price"),
@@ -75,16 +112,31 @@ class NotificationService:
         Returns:
             List[Dict]: List of notifications
         """
+        return self.get_notifications_page(user_id, limit, unread_only)["notifications"]
+    
+    def get_notifications_page(self, user_id: str, limit: int = 50, unread_only: bool = False,
+                               cursor: Optional[str] = None, projection: Optional[Dict] = None) -> Dict:
+        """
+        Get one page of notifications for a user, newest first.
+        
+        Args:
+            user_id: The ID of the user
+            limit: Page size
+            unread_only: Whether to return only unread notifications
+            cursor: Continuation token returned with the previous page
+            projection: Optional Mongo projection to limit returned fields
+            
+        Returns:
+            Dict: The notifications and the next_cursor (None on the last page)
+        """
         query = {"user_id": user_id}
         
         if unread_only:
             query["read"] = False
         
-        notifications = list(self.db.notifications.find(
-            query,
-            sort=[("created_at", -1)],
-            limit=limit
-        ))
+        notifications, next_cursor = paginate(
+            self.db.notifications, query, limit=limit, cursor=cursor, projection=projection
+        )
         
         # Convert ObjectId to string for JSON serialization
         for notification in notifications:
@@ -92,7 +144,7 @@ class NotificationService:
             if "product_id" in notification and notification["product_id"]:
                 notification["product_id"] = str(notification["product_id"])
         
-        return notifications
+        return {"notifications": notifications, "next_cursor": next_cursor}
     
     def mark_as_read(self, notification_id: str, user_id: str) -> Dict:
         """
@@ -201,4 +253,111 @@ class NotificationService:
             "read": False
         })
         
-        return count
\ No newline at end of file
+        return count
+    
+    def backfill_expiry(self, batch_size: int = 1000) -> int:
+        """
+        Set expires_at on notifications created before TTL retention existed,
+        so the TTL index can pick them up.
+        
+        Args:
+            batch_size: Number of documents updated per round trip
+            
+        Returns:
+            int: Number of notifications updated
+        """
+        from pymongo import UpdateOne
+        
+        updated = 0
+        while True:
+            legacy = list(self.db.notifications.find(
+                {"expires_at": {"$exists": False}},
+                {"type": 1, "created_at": 1},
+                limit=batch_size
+            ))
+            if not legacy:
+                break
+            
+            now = datetime.utcnow()
+            ops = [
+                UpdateOne(
+                    {"_id": n["_id"]},
+                    {"$set": {"expires_at": notification_expires_at(n.get("type"), n.get("created_at") or now)}}
+                )
+                for n in legacy
+            ]
+            updated += self.db.notifications.bulk_write(ops, ordered=False).modified_count
+            
+            if len(legacy) < batch_size:
+                break
+        
+        return updated
+    
+    def archive_read_notifications(self, older_than_days: int, batch_size: int = 1000) -> int:
+        """
+        Move read notifications into the compact notifications_archive collection.
+        
+        Only the fields in ARCHIVE_FIELDS are kept; messages, URLs and images
+        are dropped since they can be rebuilt from the product.
+        
+        Args:
+            older_than_days: Only archive notifications created before this many days ago
+            batch_size: Number of documents moved per round trip
+            
+        Returns:
+            int: Number of notifications archived
+        """
+        from pymongo.errors import BulkWriteError
+        
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        projection = {field: 1 for field in ARCHIVE_FIELDS}
+        archived = 0
+        
+        while True:
+            batch = list(self.db.notifications.find(
+                # Notifications written by the legacy /api routes used is_read
+                {"$or": [{"read": True}, {"is_read": True}], "created_at": {"$lt": cutoff}},
+                projection,
+                sort=[("read", 1), ("created_at", 1)],
+                limit=batch_size
+            ))
+            if not batch:
+                break
+            
+            # Keep the original _id so a retried batch cannot duplicate rows
+            try:
+                self.db.notifications_archive.insert_many(
+                    [{k: v for k, v in n.items() if v is not None} for n in batch],
+                    ordered=False
+                )
+            except BulkWriteError as e:
+                # Duplicate keys from a previously interrupted batch are expected
+                if any(err.get("code") != 11000 for err in e.details.get("writeErrors", [])):
+                    raise
+            self.db.notifications.delete_many({"_id": {"$in": [n["_id"] for n in batch]}})
+            archived += len(batch)
+            
+            if len(batch) < batch_size:
+                break
+        
+        return archived
+    
+    def get_retention_report(self) -> Dict:
+        """
+        Summarize notification retention state.
+        
+        Returns:
+            Dict: TTL index presence, total/legacy counts and documents the
+            TTL monitor has not yet removed
+        """
+        now = datetime.utcnow()
+        ttl_index = self.db.notifications.index_information().get("notifications_ttl", {})
+        
+        return {
+            "ttl_index": "expireAfterSeconds" in ttl_index,
+            "total": self.db.notifications.estimated_document_count(),
+            "missing_expiry": self.db.notifications.count_documents({"expires_at": {"$exists": False}}),
+            # The TTL monitor runs every 60s; anything well past due means it is lagging
+            "overdue": self.db.notifications.count_documents({"expires_at": {"$lt": now - timedelta(minutes=10)}}),
+            "archived": self.db.notifications_archive.estimated_document_count()
+        }
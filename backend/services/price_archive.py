@@ -0,0 +1,123 @@
+"""
+Archived price history for PriceHawk.
+
+Products keep recent points in price_history, where refreshes, forecasts and
+charts read them. Points older than PRICE_HISTORY_HOT_DAYS are moved into
+db.price_history_archive as encoded buckets (see core.price_codec) of up to
+BUCKET_POINTS points each:
+
+    {product_id, start, end, count, data: Binary}
+
+The last point before the hot window stays in price_history so the price in
+force at the window start is always known without the archive. Products
+record how far they have been archived in history_archived_until.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from bson.binary import Binary
+from pymongo import ASCENDING
+
+from core.http_cache import get_version_map
+from core.price_codec import decode, encode
+from core.price_series import PriceSeries
+
+logger = logging.getLogger(__name__)
+
+# Points per archive bucket
+BUCKET_POINTS = 4096
+
+
+def load_archived(db, product_id, since: Optional[datetime] = None) -> PriceSeries:
+    """
+    Archived points for a product, optionally only from ``since`` on.
+
+    Returns:
+        PriceSeries: Decoded points, sorted by date
+    """
+    query = {"product_id": product_id}
+    if since is not None:
+        query["end"] = {"$gte": since}
+    parts = [
+        decode(bytes(doc["data"]))
+        for doc in db.price_history_archive.find(query, {"data": 1}, sort=[("start", ASCENDING)])
+    ]
+    series = PriceSeries.concat(*parts)
+    return series.since(since) if since is not None else series
+
+
+def archive_product(db, product: dict, cutoff: datetime) -> int:
+    """
+    Move a product's points older than cutoff into the archive.
+
+    Safe to re-run after a crash: buckets are upserted on (product_id, start),
+    so archiving the same points twice rewrites the same buckets.
+
+    Returns:
+        int: Number of points archived
+    """
+    series = PriceSeries.from_bson(product.get("price_history"))
+    old = series.between(end=cutoff)
+    # Keep the last pre-window point in the document as the window seed
+    old = old[:-1]
+    if not len(old):
+        return 0
+
+    for offset in range(0, len(old), BUCKET_POINTS):
+        bucket = old[offset:offset + BUCKET_POINTS]
+        start, end = bucket[0][0], bucket[-1][0]
+        db.price_history_archive.replace_one(
+            {"product_id": product["_id"], "start": start},
+            {
+                "product_id": product["_id"],
+                "start": start,
+                "end": end,
+                "count": len(bucket),
+                "data": Binary(encode(bucket))
+            },
+            upsert=True
+        )
+
+    archived_until = old[-1][0]
+    db.products.update_one(
+        {"_id": product["_id"]},
+        {
+            "$pull": {"price_history": {"date": {"$lte": archived_until}}},
+            "$set": {"history_archived_until": archived_until},
+            # The stored document changes; the merged history does not
+            "$inc": {"version": 1}
+        }
+    )
+    get_version_map().invalidate(product["_id"])
+    return len(old)
+
+
+def compact_price_history(db, hot_days: int = 180, limit: int = 1000) -> dict:
+    """
+    Archive old points for up to ``limit`` products.
+
+    Only products whose running stats and rollups are built are compacted,
+    since those are computed from price_history.
+
+    Returns:
+        dict: products and points archived
+    """
+    cutoff = datetime.utcnow() - timedelta(days=hot_days)
+    query = {
+        # At least two points before the cutoff: one to archive, one to keep as seed
+        "price_history.1.date": {"$lt": cutoff},
+        "price_stats": {"$exists": True},
+        "rollups_built": True
+    }
+    stats = {"products": 0, "points": 0}
+    for product in db.products.find(query, {"price_history": 1}, limit=limit, batch_size=100):
+        try:
+            archived = archive_product(db, product, cutoff)
+        except Exception as e:
+            logger.error(f"Failed to archive history for product {product['_id']}: {str(e)}")
+            continue
+        if archived:
+            stats["products"] += 1
+            stats["points"] += archived
+    return stats
@@ -0,0 +1,420 @@
+"""
+Columnar price history export/import for PriceHawk.
+
+Exports stream products from Mongo (hot price_history plus archived
+buckets) into Arrow record batches of at most ``batch_rows`` rows and write
+them as Parquet, either:
+
+- partitioned on disk as ``<out_dir>/month=YYYY-MM/part-NNNNN.parquet`` for
+  analysts and offline retraining, or
+- as a single Parquet stream for the admin export endpoint.
+
+Memory stays bounded by batch_rows (plus one open writer per month on disk).
+The importer reads the same layout back in record batches for backfills, and
+ParquetHistorySource lets a one-off retraining run forecast from the files
+instead of Mongo.
+
+pyarrow is optional; the functions here raise RuntimeError when it is missing.
+"""
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+from glob import glob
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+from bson.binary import Binary
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+
+from core.http_cache import get_version_map
+from core.price_codec import encode
+from core.price_series import PriceSeries
+from services.price_archive import BUCKET_POINTS, load_archived
+from services.price_rollups import rollup_ops
+from services.price_stats import compute_stats
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pq = None
+    PYARROW_AVAILABLE = False
+
+DEFAULT_BATCH_ROWS = 50_000
+
+
+def _require_pyarrow():
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow is required for Parquet export/import (pip install pyarrow)")
+
+
+def history_schema():
+    _require_pyarrow()
+    return pa.schema([
+        ("product_id", pa.string()),
+        ("date", pa.timestamp("ms")),
+        ("price", pa.float64()),
+        ("source", pa.string()),
+        ("category", pa.string()),
+    ])
+
+
+def _product_query(product_ids: Optional[List[str]] = None, source: Optional[str] = None,
+                   category: Optional[str] = None) -> Dict:
+    query = {}
+    if product_ids:
+        query["_id"] = {"$in": [ObjectId(p) if ObjectId.is_valid(p) else p for p in product_ids]}
+    if source:
+        query["source"] = source
+    if category:
+        query["category"] = category
+    return query
+
+
+def iter_record_batches(db, product_ids: Optional[List[str]] = None, since: Optional[datetime] = None,
+                        until: Optional[datetime] = None, source: Optional[str] = None,
+                        category: Optional[str] = None, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator:
+    """
+    Stream price points as Arrow record batches of at most batch_rows rows.
+
+    Args:
+        db: Database handle
+        product_ids: Optional products to export (default: all)
+        since: Optional inclusive lower bound on point dates
+        until: Optional exclusive upper bound on point dates
+        source: Optional product source filter
+        category: Optional product category filter
+        batch_rows: Rows per record batch
+
+    Yields:
+        pyarrow.RecordBatch
+    """
+    schema = history_schema()
+    columns = {name: [] for name in ("product_id", "date", "price", "source", "category")}
+    rows = 0
+
+    def flush():
+        nonlocal rows
+        batch = pa.record_batch([
+            pa.array(columns["product_id"], pa.string()),
+            pa.array(np.concatenate(columns["date"]), pa.timestamp("ms")),
+            pa.array(np.concatenate(columns["price"]), pa.float64()),
+            pa.array(columns["source"], pa.string()),
+            pa.array(columns["category"], pa.string()),
+        ], schema=schema)
+        for values in columns.values():
+            values.clear()
+        rows = 0
+        return batch
+
+    cursor = db.products.find(
+        _product_query(product_ids, source, category),
+        {"price_history": 1, "source": 1, "category": 1, "history_archived_until": 1},
+        batch_size=200
+    )
+    for product in cursor:
+        series = PriceSeries.from_bson(product.get("price_history"))
+        archived_until = product.get("history_archived_until")
+        if archived_until and (since is None or since <= archived_until):
+            series = PriceSeries.concat(load_archived(db, product["_id"], since), series)
+        series = series.between(since, until)
+
+        offset = 0
+        while offset < len(series):
+            take = min(len(series) - offset, batch_rows - rows)
+            part = series[offset:offset + take]
+            columns["product_id"].extend([str(product["_id"])] * take)
+            columns["date"].append(part.dates)
+            columns["price"].append(part.prices)
+            columns["source"].extend([product.get("source")] * take)
+            columns["category"].extend([product.get("category")] * take)
+            rows += take
+            offset += take
+            if rows >= batch_rows:
+                yield flush()
+    if rows:
+        yield flush()
+
+
+def export_to_directory(db, out_dir: str, batch_rows: int = DEFAULT_BATCH_ROWS, **filters) -> Dict:
+    """
+    Export price history into month-partitioned Parquet files.
+
+    Each record batch is split by month and appended to that month's open
+    writer; every writer is closed at the end.
+
+    Returns:
+        Dict: rows, products and files written
+    """
+    _require_pyarrow()
+    import pyarrow.compute as pc
+
+    schema = history_schema()
+    writers = {}
+    stats = {"rows": 0, "files": 0, "products": set()}
+    try:
+        for batch in iter_record_batches(db, batch_rows=batch_rows, **filters):
+            months = pc.strftime(batch.column("date"), format="%Y-%m")
+            for month in pc.unique(months).to_pylist():
+                part = batch.filter(pc.equal(months, month))
+                if month not in writers:
+                    directory = os.path.join(out_dir, f"month={month}")
+                    os.makedirs(directory, exist_ok=True)
+                    path = os.path.join(directory, f"part-{len(glob(os.path.join(directory, '*.parquet'))):05d}.parquet")
+                    writers[month] = pq.ParquetWriter(path, schema, compression="zstd")
+                    stats["files"] += 1
+                writers[month].write_batch(part)
+            stats["rows"] += batch.num_rows
+            stats["products"].update(pc.unique(batch.column("product_id")).to_pylist())
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    stats["products"] = len(stats["products"])
+    return stats
+
+
+class _ChunkSink:
+    """Write-only file object collecting Parquet bytes for streaming."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def stream_parquet(db, batch_rows: int = DEFAULT_BATCH_ROWS, **filters) -> Iterator[bytes]:
+    """
+    Yield one Parquet file's bytes a row group at a time.
+
+    Suitable as a Flask streaming response body.
+    """
+    _require_pyarrow()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), history_schema(), compression="zstd")
+    try:
+        for batch in iter_record_batches(db, batch_rows=batch_rows, **filters):
+            writer.write_batch(batch)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+def _parquet_files(path: str) -> List[str]:
+    if os.path.isdir(path):
+        return sorted(glob(os.path.join(path, "**", "*.parquet"), recursive=True))
+    return [path]
+
+
+def iter_file_batches(path: str, batch_rows: int = DEFAULT_BATCH_ROWS,
+                      columns: Optional[List[str]] = None) -> Iterator:
+    """Record batches from a Parquet file or a partitioned export directory."""
+    _require_pyarrow()
+    for file_path in _parquet_files(path):
+        parquet_file = pq.ParquetFile(file_path)
+        yield from parquet_file.iter_batches(batch_size=batch_rows, columns=columns)
+
+
+def import_from_parquet(db, path: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> Dict:
+    """
+    Backfill price history from exported Parquet files.
+
+    Only points older than everything already stored for a product are
+    imported, so re-running an import (or importing an export of the same
+    database) adds nothing. Imported points go straight into the encoded
+    archive and the product's rollups, and price_stats is rebuilt from the
+    full history; rows for unknown products are skipped.
+
+    Returns:
+        Dict: imported/skipped row counts and products touched
+    """
+    stats = {"imported": 0, "skipped": 0}
+    touched = set()
+    earliest_cache: Dict[str, Optional[datetime]] = {}
+    pending: Dict[str, List] = defaultdict(list)
+    pending_rows = 0
+
+    def earliest_known(product_id: str):
+        if product_id not in earliest_cache:
+            oid = ObjectId(product_id) if ObjectId.is_valid(product_id) else product_id
+            product = db.products.find_one({"_id": oid}, {"price_history": {"$slice": 1}})
+            if not product:
+                earliest_cache[product_id] = None
+            else:
+                candidates = [p["date"] for p in product.get("price_history", [])[:1]]
+                archived = db.price_history_archive.find_one({"product_id": oid}, {"start": 1}, sort=[("start", 1)])
+                if archived:
+                    candidates.append(archived["start"])
+                earliest_cache[product_id] = min(candidates) if candidates else datetime.max
+        return earliest_cache[product_id]
+
+    def flush():
+        for product_id, parts in pending.items():
+            series = PriceSeries.concat(*parts)
+            oid = ObjectId(product_id) if ObjectId.is_valid(product_id) else product_id
+            for offset in range(0, len(series), BUCKET_POINTS):
+                bucket = series[offset:offset + BUCKET_POINTS]
+                start, end = bucket[0][0], bucket[-1][0]
+                db.price_history_archive.replace_one(
+                    {"product_id": oid, "start": start},
+                    {"product_id": oid, "start": start, "end": end, "count": len(bucket),
+                     "data": Binary(encode(bucket))},
+                    upsert=True
+                )
+            ops: List[UpdateOne] = []
+            for date, price in series:
+                ops.extend(rollup_ops(oid, price, date))
+            if ops:
+                db.price_rollups.bulk_write(ops, ordered=True)
+            finish_import(db, oid, series[-1][0])
+            touched.add(product_id)
+        pending.clear()
+
+    for batch in iter_file_batches(path, batch_rows, columns=["product_id", "date", "price"]):
+        ids = batch.column("product_id").to_numpy(zero_copy_only=False)
+        dates = batch.column("date").to_numpy().astype("datetime64[ms]")
+        prices = batch.column("price").to_numpy()
+        for product_id in np.unique(ids):
+            earliest = earliest_known(product_id)
+            if earliest is None:
+                stats["skipped"] += int((ids == product_id).sum())
+                continue
+            mask = (ids == product_id) & (dates < np.datetime64(earliest, "ms"))
+            stats["skipped"] += int((ids == product_id).sum() - mask.sum())
+            if mask.any():
+                pending[product_id].append(PriceSeries.from_arrays(dates[mask], prices[mask]))
+                pending_rows += int(mask.sum())
+                stats["imported"] += int(mask.sum())
+        if pending_rows >= batch_rows:
+            flush()
+            pending_rows = 0
+    flush()
+    stats["products"] = len(touched)
+    return stats
+
+
+def finish_import(db, product_id, archived_until: datetime) -> None:
+    """
+    Record imported points on the product: its archive horizon and price_stats
+    recomputed from archive plus stored points, with the version bump in the
+    same update.
+    """
+    product = db.products.find_one({"_id": product_id}, {"price_history": 1})
+    history = PriceSeries.concat(
+        load_archived(db, product_id),
+        PriceSeries.from_bson((product or {}).get("price_history"))
+    )
+    db.products.update_one(
+        {"_id": product_id},
+        {
+            "$max": {"history_archived_until": archived_until},
+            "$set": {"price_stats": compute_stats(history)},
+            "$inc": {"version": 1, "history_version": 1}
+        }
+    )
+    get_version_map().invalidate(product_id)
+
+
+# history_version stamped on forecasts fitted from a snapshot; live versions
+# start at 0, so such forecasts are never served as current
+SNAPSHOT_HISTORY_VERSION = -1
+
+
+class ParquetHistorySource:
+    """
+    Price history read from exported Parquet files, for offline retraining.
+
+    Implements the loader interface the batch forecaster uses
+    (load_daily_arrays_many, get_history_versions), so training can run
+    without touching Mongo.
+    """
+
+    def __init__(self, path: str):
+        _require_pyarrow()
+        self.path = path
+
+    def _read(self, product_ids: Optional[Iterable[str]], since: Optional[datetime]):
+        import pyarrow.dataset as ds
+
+        dataset = ds.dataset(self.path, format="parquet", partitioning="hive")
+        condition = None
+        if product_ids is not None:
+            condition = ds.field("product_id").isin([str(p) for p in product_ids])
+        if since is not None:
+            window = ds.field("date") >= pa.scalar(since, pa.timestamp("ms"))
+            condition = window if condition is None else condition & window
+        return dataset.to_table(columns=["product_id", "date", "price"], filter=condition)
+
+    def product_ids(self) -> List[str]:
+        """Distinct product ids in the export."""
+        import pyarrow.compute as pc
+        ids = set()
+        for batch in iter_file_batches(self.path, columns=["product_id"]):
+            ids.update(pc.unique(batch.column("product_id")).to_pylist())
+        return sorted(ids)
+
+    def get_history_versions(self, product_ids: List) -> Dict[str, int]:
+        """
+        SNAPSHOT_HISTORY_VERSION for every product: the export may be
+        arbitrarily old, so it never matches the live history_version.
+        """
+        return {str(p): SNAPSHOT_HISTORY_VERSION for p in product_ids}
+
+    def load_daily_arrays_many(self, product_ids: List, days: int = 90,
+                               now: Optional[datetime] = None) -> Dict[str, tuple]:
+        """
+        Daily (dates, prices) arrays per product, like ForecastingService's loader.
+
+        The price in force at the window start is seeded from the last point
+        before it, as with the Mongo loader.
+        """
+        now = now or datetime.utcnow()
+        cutoff = now - timedelta(days=days)
+        table = self._read(product_ids, None).sort_by([("product_id", "ascending"), ("date", "ascending")])
+
+        ids = table.column("product_id").to_numpy(zero_copy_only=False)
+        dates = table.column("date").to_numpy().astype("datetime64[ms]")
+        prices = table.column("price").to_numpy()
+        if not len(ids):
+            return {}
+
+        result = {}
+        boundaries = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(ids)]):
+            series = PriceSeries(dates[start:end], prices[start:end]).window_from(cutoff)
+            if len(series):
+                result[str(ids[start])] = series.resample_daily(end=now)
+        return result
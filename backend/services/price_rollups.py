@@ -0,0 +1,121 @@
+"""
+Hourly and daily price rollups for PriceHawk.
+
+db.price_rollups holds one document per (product_id, resolution, bucket)
+with the open/close/low/high price seen in that bucket. update_price
+upserts the hour and day buckets alongside each new price point, so a chart
+over a long range reads at most one document per bucket instead of every
+stored point.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+RESOLUTIONS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+}
+
+
+def bucket_start(at: datetime, resolution: str) -> datetime:
+    """Start of the bucket containing ``at``."""
+    if resolution == "day":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    return at.replace(minute=0, second=0, microsecond=0)
+
+
+def rollup_ops(product_id, price: float, at: datetime) -> List[UpdateOne]:
+    """Upserts folding one price point into its hour and day buckets."""
+    price = float(price)
+    return [
+        UpdateOne(
+            {"product_id": product_id, "resolution": resolution, "bucket": bucket_start(at, resolution)},
+            {
+                "$setOnInsert": {"open": price},
+                "$set": {"close": price},
+                "$min": {"low": price},
+                "$max": {"high": price},
+                "$inc": {"count": 1}
+            },
+            upsert=True
+        )
+        for resolution in RESOLUTIONS
+    ]
+
+
+def record_price(db, product_id, price: float, at: datetime) -> None:
+    """Fold a new price point into the product's rollups."""
+    db.price_rollups.bulk_write(rollup_ops(product_id, price, at), ordered=True)
+
+
+def rebuild_rollups(db, product_id, price_history: Iterable[Dict]) -> int:
+    """
+    Recompute a product's rollups from its full history.
+
+    Returns:
+        int: Number of price points folded in
+    """
+    db.price_rollups.delete_many({"product_id": product_id})
+    ops = []
+    points = sorted(
+        (p for p in price_history if p.get("date") is not None and p.get("price") is not None),
+        key=lambda p: p["date"]
+    )
+    for point in points:
+        ops.extend(rollup_ops(product_id, point["price"], point["date"]))
+    if ops:
+        db.price_rollups.bulk_write(ops, ordered=True)
+    return len(points)
+
+
+def backfill_rollups(db, limit: int = 500) -> int:
+    """
+    Build rollups for products that predate them (up to ``limit`` per call).
+
+    Returns:
+        int: Number of products backfilled
+    """
+    done = 0
+    for product in db.products.find({"rollups_built": {"$ne": True}}, {"price_history": 1}, limit=limit):
+        rebuild_rollups(db, product["_id"], product.get("price_history", []))
+        db.products.update_one({"_id": product["_id"]}, {"$set": {"rollups_built": True}, "$inc": {"version": 1}})
+        done += 1
+    return done
+
+
+def pick_resolution(span: timedelta, points: int) -> Optional[str]:
+    """
+    Coarsest useful rollup for a chart of ``points`` over ``span``.
+
+    Returns None when even hourly buckets would be too coarse, i.e. the raw
+    points should be used.
+    """
+    per_point = span / max(points, 1)
+    if per_point >= RESOLUTIONS["day"]:
+        return "day"
+    if per_point >= RESOLUTIONS["hour"]:
+        return "hour"
+    return None
+
+
+def load_rollup_points(db, product_id, resolution: str, since: Optional[datetime] = None) -> List[Dict]:
+    """
+    Read rollups as {"price", "date"} points, two per bucket (low and high).
+
+    Within a bucket the extremes are ordered the way the price moved: a
+    bucket that closed below its open emits the high first.
+    """
+    query = {"product_id": product_id, "resolution": resolution}
+    if since is not None:
+        query["bucket"] = {"$gte": bucket_start(since, resolution)}
+
+    step = RESOLUTIONS[resolution] / 2
+    points = []
+    for doc in db.price_rollups.find(query, sort=[("bucket", ASCENDING)]):
+        falling = doc["close"] < doc["open"]
+        first, second = (doc["high"], doc["low"]) if falling else (doc["low"], doc["high"])
+        points.append({"price": first, "date": doc["bucket"]})
+        if second != first:
+            points.append({"price": second, "date": doc["bucket"] + step})
+    return points
@@ -0,0 +1,249 @@
+"""
+Running price statistics for PriceHawk.
+
+Each product carries a ``price_stats`` sub-document that update_price keeps
+current in O(1) per new price point, so analysis and dashboard endpoints never
+have to scan price_history:
+
+- count, sum, mean and m2 (Welford's running variance; sum_sq is kept too)
+- all-time min/max with the date each was first seen
+- min/max over the last WINDOW_DAYS with dates
+- last_change_at and previous_price
+
+Rolling-window extremes only need the history again when the current
+extreme ages out of the window, which happens at most once per extreme.
+The price in force when the window opened keeps its real date; it is
+recorded as the carried point and stays valid until the point that replaced
+it ages out too, so a product whose price never changes is not rescanned.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+from pymongo import UpdateOne
+
+from core.price_series import PriceSeries
+
+# Stored {"price", "date"} points or a PriceSeries over them
+History = Union[PriceSeries, Iterable[Dict]]
+
+# Rolling window for recent min/max
+WINDOW_DAYS = 90
+
+
+def empty_stats() -> Dict:
+    return {
+        "count": 0,
+        "sum": 0.0,
+        "sum_sq": 0.0,
+        "mean": 0.0,
+        "m2": 0.0,
+        "min_price": None,
+        "min_date": None,
+        "max_price": None,
+        "max_date": None,
+        "window_days": WINDOW_DAYS,
+        "window_min_price": None,
+        "window_min_date": None,
+        "window_max_price": None,
+        "window_max_date": None,
+        "window_carried_date": None,
+        "window_carried_until": None,
+        "current_price": None,
+        "previous_price": None,
+        "last_change_at": None
+    }
+
+
+def add_price(stats: Optional[Dict], price: float, at: datetime) -> Dict:
+    """
+    Fold one new price point into stats (O(1)).
+
+    Points must arrive in time order. Window extremes are not expired here;
+    see expire_window.
+
+    Args:
+        stats: Existing stats (None to start fresh)
+        price: The new price
+        at: When the price was observed
+
+    Returns:
+        Dict: The updated stats (a new dict)
+    """
+    stats = dict(stats) if stats else empty_stats()
+    price = float(price)
+
+    count = stats["count"] + 1
+    delta = price - stats["mean"]
+    mean = stats["mean"] + delta / count
+    stats.update({
+        "count": count,
+        "sum": stats["sum"] + price,
+        "sum_sq": stats["sum_sq"] + price * price,
+        "mean": mean,
+        "m2": stats["m2"] + delta * (price - mean)
+    })
+
+    if stats["min_price"] is None or price < stats["min_price"]:
+        stats["min_price"], stats["min_date"] = price, at
+    if stats["max_price"] is None or price > stats["max_price"]:
+        stats["max_price"], stats["max_date"] = price, at
+    # Ties move the window extreme forward so it stays in the window longer
+    if stats["window_min_price"] is None or price <= stats["window_min_price"]:
+        stats["window_min_price"], stats["window_min_date"] = price, at
+    if stats["window_max_price"] is None or price >= stats["window_max_price"]:
+        stats["window_max_price"], stats["window_max_date"] = price, at
+
+    # A carried point that was still the current price is replaced by this one
+    if stats.get("window_carried_date") is not None and stats.get("window_carried_until") is None:
+        stats["window_carried_until"] = at
+
+    stats["previous_price"] = stats.get("current_price")
+    stats["current_price"] = price
+    stats["last_change_at"] = at
+    return stats
+
+
+def window_expired(stats: Dict, now: datetime) -> bool:
+    """
+    True when a rolling-window extreme is older than the window.
+
+    The carried point is exempt while it is still the price in force at the
+    window start, i.e. until the point after it is older than the window too.
+    """
+    cutoff = now - timedelta(days=stats.get("window_days", WINDOW_DAYS))
+    carried = stats.get("window_carried_date")
+    until = stats.get("window_carried_until")
+    carried_in_force = carried is not None and (until is None or until >= cutoff)
+    for field in ("window_min_date", "window_max_date"):
+        date = stats.get(field)
+        if date is None or date >= cutoff:
+            continue
+        if carried_in_force and date == carried:
+            continue
+        return True
+    return False
+
+
+def expire_window(stats: Dict, price_history: History, now: datetime) -> Dict:
+    """
+    Recompute the rolling-window extremes from history if one aged out.
+
+    The price in force at the start of the window (the last point before it)
+    counts as part of the window, matching a step-function view of prices.
+    """
+    if not window_expired(stats, now):
+        return stats
+
+    cutoff = now - timedelta(days=stats.get("window_days", WINDOW_DAYS))
+    series = PriceSeries.coerce(price_history)
+    inside = series.since(cutoff)
+    carried = series.between(None, cutoff).last()
+
+    stats = dict(stats)
+    stats.update({
+        "window_min_price": None, "window_min_date": None,
+        "window_max_price": None, "window_max_date": None,
+        "window_carried_date": None, "window_carried_until": None
+    })
+    if len(inside):
+        # Ties go to the latest point, which stays in the window longest
+        last = len(inside) - 1
+        reversed_prices = inside.prices[::-1]
+        stats["window_min_date"], stats["window_min_price"] = inside[last - int(np.argmin(reversed_prices))]
+        stats["window_max_date"], stats["window_max_price"] = inside[last - int(np.argmax(reversed_prices))]
+    if carried is not None:
+        # Ties keep the in-window point: it stays valid for longer
+        carried_date, price = carried
+        if stats["window_min_price"] is None or price < stats["window_min_price"]:
+            stats["window_min_price"], stats["window_min_date"] = price, carried_date
+        if stats["window_max_price"] is None or price > stats["window_max_price"]:
+            stats["window_max_price"], stats["window_max_date"] = price, carried_date
+        stats["window_carried_date"] = carried_date
+        stats["window_carried_until"] = inside[0][0] if len(inside) else None
+    return stats
+
+
+def compute_stats(price_history: History, now: Optional[datetime] = None) -> Dict:
+    """Build stats from a full price history (backfill and new products)."""
+    now = now or datetime.utcnow()
+    series = PriceSeries.coerce(price_history)
+    stats = empty_stats()
+    for date, price in series:
+        stats = add_price(stats, price, date)
+    return expire_window(stats, series, now)
+
+
+def backfill_price_stats(db, batch_size: int = 500) -> int:
+    """
+    Compute price_stats for products that predate them.
+
+    Returns:
+        int: Number of products updated
+    """
+    now = datetime.utcnow()
+    updated = 0
+    ops = []
+    cursor = db.products.find(
+        {"price_stats": {"$exists": False}},
+        {"price_history": 1},
+        batch_size=batch_size
+    )
+    for product in cursor:
+        ops.append(UpdateOne(
+            {"_id": product["_id"]},
+            {"$set": {"price_stats": compute_stats(product.get("price_history", []), now)}, "$inc": {"version": 1}}
+        ))
+        if len(ops) >= batch_size:
+            updated += db.products.bulk_write(ops, ordered=False).modified_count
+            ops = []
+    if ops:
+        updated += db.products.bulk_write(ops, ordered=False).modified_count
+    return updated
+
+
+def variance(stats: Dict) -> float:
+    """Population variance from the Welford accumulator."""
+    return stats["m2"] / stats["count"] if stats.get("count") else 0.0
+
+
+def summarize(stats: Optional[Dict], current_price: Optional[float] = None) -> Optional[Dict]:
+    """
+    Render stored stats for API responses.
+
+    Returns:
+        Optional[Dict]: JSON-friendly summary, or None if there are no stats
+    """
+    if not stats or not stats.get("count"):
+        return None
+
+    current = current_price if current_price is not None else stats.get("current_price")
+    mean = stats["mean"]
+    if current is None or math.isclose(current, mean, rel_tol=0.005):
+        trend = "stable"
+    else:
+        trend = "decreasing" if current < mean else "increasing"
+
+    def _iso(value):
+        return value.isoformat() if isinstance(value, datetime) else value
+
+    return {
+        "count": stats["count"],
+        "current_price": current,
+        "avg_price": round(mean, 2),
+        "price_volatility": round(math.sqrt(variance(stats)), 2),
+        "all_time_low": stats["min_price"],
+        "all_time_low_date": _iso(stats["min_date"]),
+        "all_time_high": stats["max_price"],
+        "all_time_high_date": _iso(stats["max_date"]),
+        "window_days": stats.get("window_days", WINDOW_DAYS),
+        "min_price": stats["window_min_price"],
+        "best_price_date": _iso(stats["window_min_date"]),
+        "max_price": stats["window_max_price"],
+        "max_price_date": _iso(stats["window_max_date"]),
+        "price_trend": trend,
+        "savings_opportunity": round(current - stats["window_min_price"], 2) if current is not None else None,
+        "previous_price": stats.get("previous_price"),
+        "last_change_at": _iso(stats.get("last_change_at"))
+    }
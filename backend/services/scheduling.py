@@ -0,0 +1,167 @@
+"""
+Adaptive refresh scheduling for PriceHawk.
+Decides when each product should next be fetched, based on how often its
+price moves, how many users track it and how close it is to a target price.
+"""
+import logging
+import math
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app
+
+from core.db import get_db
+from core.http_cache import get_version_map
+from core.price_series import PriceSeries
+from core.leases import SHARD_KEY_SPACE
+
+logger = logging.getLogger(__name__)
+
+# Window used to measure price-change frequency
+VOLATILITY_WINDOW_DAYS = 14
+
+# Gap to target (as a fraction of the current price) under which checks speed up
+TARGET_PROXIMITY_BAND = 0.10
+
+
+def compute_check_interval(price_history: Iterable[Dict], current_price: Optional[float],
+                           target_prices: Iterable[Optional[float]], now: Optional[datetime] = None,
+                           base_hours: float = 6, min_minutes: float = 30, max_hours: float = 48) -> timedelta:
+    """
+    Compute how long to wait before the next price check.
+
+    The base interval is divided by three factors:
+    - volatility: price changes per day over the last VOLATILITY_WINDOW_DAYS
+    - popularity: number of trackers (log-scaled); untracked products slow down
+    - proximity: how close the price is to the nearest target below it
+
+    Args:
+        price_history: Price points ({"price", "date"}) or a PriceSeries
+        current_price: The latest known price
+        target_prices: target_price of each tracker (None for "any drop")
+        now: Reference time (defaults to utcnow)
+        base_hours: Interval for an average product
+        min_minutes: Lower clamp
+        max_hours: Upper clamp
+
+    Returns:
+        timedelta: The interval until the next check
+    """
+    now = now or datetime.utcnow()
+    window_start = now - timedelta(days=VOLATILITY_WINDOW_DAYS)
+
+    # price_history only grows when the price changes, so recent points == recent changes
+    changes = len(PriceSeries.coerce(price_history).since(window_start))
+    changes_per_day = changes / VOLATILITY_WINDOW_DAYS
+    volatility_factor = 1 + 4 * changes_per_day
+
+    targets = list(target_prices)
+    if targets:
+        popularity_factor = 1 + math.log2(1 + len(targets)) / 2
+    else:
+        popularity_factor = 0.5
+
+    proximity_factor = 1.0
+    if current_price:
+        gaps = [
+            (current_price - t) / current_price
+            for t in targets
+            if t is not None and t < current_price
+        ]
+        if gaps:
+            gap = min(gaps)
+            if gap < TARGET_PROXIMITY_BAND:
+                # Up to 4x faster as the price closes in on the target
+                proximity_factor = 1 + 3 * (TARGET_PROXIMITY_BAND - gap) / TARGET_PROXIMITY_BAND
+
+    hours = base_hours / (volatility_factor * popularity_factor * proximity_factor)
+    hours = max(min_minutes / 60, min(hours, max_hours))
+    return timedelta(hours=hours)
+
+
+class RefreshScheduler:
+    """Maintains next_check_at on products."""
+
+    def __init__(self):
+        self.db = get_db()
+        config = current_app.config
+        self.base_hours = config.get("REFRESH_BASE_INTERVAL_HOURS", 6)
+        self.min_minutes = config.get("REFRESH_MIN_INTERVAL_MINUTES", 30)
+        self.max_hours = config.get("REFRESH_MAX_INTERVAL_HOURS", 48)
+
+    def get_target_prices(self, product_id) -> List[Optional[float]]:
+        """Return the target price of every user tracking the product."""
+        return [
+            t.get("target_price")
+            for t in self.db.user_tracking.find({"product_id": product_id}, {"target_price": 1})
+        ]
+
+    def reschedule(self, product: Dict, now: Optional[datetime] = None) -> datetime:
+        """
+        Compute and store next_check_at for a product.
+
+        Args:
+            product: The product document, reflecting its latest price/history
+            now: Reference time (defaults to utcnow)
+
+        Returns:
+            datetime: The stored next_check_at
+        """
+        now = now or datetime.utcnow()
+        interval = compute_check_interval(
+            product.get("price_history", []),
+            product.get("current_price"),
+            self.get_target_prices(product["_id"]),
+            now=now,
+            base_hours=self.base_hours,
+            min_minutes=self.min_minutes,
+            max_hours=self.max_hours
+        )
+        next_check_at = now + interval
+        self.db.products.update_one(
+            {"_id": product["_id"]},
+            {"$set": {"next_check_at": next_check_at}, "$inc": {"version": 1}}
+        )
+        get_version_map().invalidate(product["_id"])
+        return next_check_at
+
+    def backoff(self, product_id, now: Optional[datetime] = None) -> datetime:
+        """Push a product that failed to fetch back by the base interval."""
+        now = now or datetime.utcnow()
+        next_check_at = now + timedelta(hours=self.base_hours)
+        self.db.products.update_one(
+            {"_id": product_id},
+            {"$set": {"last_checked": now, "next_check_at": next_check_at}, "$inc": {"version": 1}}
+        )
+        get_version_map().invalidate(product_id)
+        return next_check_at
+
+    def assign_shard_keys(self) -> int:
+        """
+        Give products inserted before sharding a random shard_key.
+
+        Returns:
+            int: Number of products updated
+        """
+        result = self.db.products.update_many(
+            {"shard_key": {"$exists": False}},
+            [{"$set": {
+                "shard_key": {"$floor": {"$multiply": [{"$rand": {}}, SHARD_KEY_SPACE]}},
+                "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}
+            }}]
+        )
+        return result.modified_count
+
+    def backfill_next_check_at(self) -> int:
+        """
+        Make products that were never scheduled due now, so refresh runs can
+        stream the queue with a single range on next_check_at.
+
+        Returns:
+            int: Number of products updated
+        """
+        result = self.db.products.update_many(
+            {"next_check_at": {"$exists": False}},
+            {"$set": {"next_check_at": datetime.utcnow()}, "$inc": {"version": 1}}
+        )
+        return result.modified_count
@@ -0,0 +1,37 @@
+"""
+Search response cache for PriceHawk.
+
+Live searches fan out to several stores and take seconds, while the same
+queries repeat constantly. Responses are cached per worker for
+SEARCH_CACHE_TTL_SECONDS as EncodedBody values (JSON encoded once, each
+compressed variant built once), using the same LRU/stale-while-revalidate
+cache as forecasts: after the TTL the old results are served while a
+background thread re-runs the search.
+"""
+import threading
+from typing import Dict, Optional
+
+from services.forecast_cache import ForecastCache
+
+_cache: Optional[ForecastCache] = None
+_cache_lock = threading.Lock()
+
+
+def search_key(query: str, max_results) -> tuple:
+    """Cache key: queries differing only in case or spacing share an entry."""
+    return (" ".join(query.lower().split()), "search", str(max_results))
+
+
+def get_search_cache(config: Optional[Dict] = None) -> ForecastCache:
+    """Process-wide cache, sized from SEARCH_CACHE_SIZE / SEARCH_CACHE_TTL_SECONDS on first use."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = config or {}
+                _cache = ForecastCache(
+                    max_entries=config.get("SEARCH_CACHE_SIZE", 512),
+                    max_age_seconds=config.get("SEARCH_CACHE_TTL_SECONDS", 300),
+                    name="search"
+                )
+    return _cache
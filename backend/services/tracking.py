@@ -7,10 +7,57 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Union
 
 from core.db import get_db
+from core.http_cache import get_version_map
+from core.leases import random_shard_key
+from core.price_codec import decode
+from core.price_series import PriceSeries
+from services.downsampling import downsample_points, downsample_series
+from services.price_archive import load_archived
+from services.price_rollups import pick_resolution, load_rollup_points, rebuild_rollups, record_price
+from services.price_stats import add_price, compute_stats, expire_window, summarize, window_expired
 from bson.objectid import ObjectId
 
 logger = logging.getLogger(__name__)
 
+def crossed_targets_query(product_id, old_price: Optional[float], new_price: float) -> Dict:
+    """
+    Filter for trackers to alert when a product's price drops.
+    
+    A tracker with a target is alerted only when this drop crosses it
+    (new_price <= target_price < old_price), so later drops below a target
+    that was already reached don't alert again. Trackers without a target
+    want every drop. Both branches are range/equality scans on the
+    user_tracking_price_drop index, so the cost is O(log n + k) in the number
+    of trackers n and alerts k.
+    
+    Args:
+        product_id: The product whose price dropped
+        old_price: Price before the drop (None if unknown)
+        new_price: Price after the drop
+        
+    Returns:
+        Dict: Mongo filter on user_tracking
+    """
+    crossed = {"$gte": new_price}
+    if old_price is not None:
+        crossed["$lt"] = old_price
+    return {
+        "product_id": product_id,
+        "notify_on_price_drop": True,
+        "$or": [
+            {"target_price": crossed},
+            {"target_price": None}
+        ]
+    }
+
+def get_tracking_service() -> "TrackingService":
+    """TrackingService for the current app, built on first use inside an app context"""
+    from flask import current_app
+    service = current_app.extensions.get("tracking_service")
+    if service is None:
+        service = current_app.extensions["tracking_service"] = TrackingService()
+    return service
+
 class TrackingService:
     """Service for tracking products and managing price history."""
     
@@ -37,12 +84,16 @@ class TrackingService:
             # Update product with latest information
             self.db.products.update_one(
                 {"_id": product_id},
-                {"$set": {
-                    "last_checked": datetime.utcnow(),
-                    "current_price": product_data["current_price"],
-                    "in_stock": product_data.get("in_stock", True)
-                }}
+                {
+                    "$set": {
+                        "last_checked": datetime.utcnow(),
+                        "current_price": product_data["current_price"],
+                        "in_stock": product_data.get("in_stock", True)
+                    },
+                    "$inc": {"version": 1}
+                }
             )
+            get_version_map().invalidate(product_id)
         else:
             # Create new product
             product_to_insert = {
@@ -58,6 +109,9 @@ class TrackingService:
                 "in_stock": product_data.get("in_stock", True),
                 "created_at": datetime.utcnow(),
                 "last_checked": datetime.utcnow(),
+                "shard_key": random_shard_key(),
+                "version": 1,
+                "history_version": 1,
                 "price_history": [
                     # Generate realistic price history for better forecasting
                     {"price": product_data["current_price"] * 1.15, "date": datetime.utcnow() - timedelta(days=30)},
@@ -69,8 +123,11 @@ class TrackingService:
                     {"price": product_data["current_price"], "date": datetime.utcnow()}
                 ]
             }
+            product_to_insert["price_stats"] = compute_stats(product_to_insert["price_history"])
+            product_to_insert["rollups_built"] = True
             
             product_id = self.db.products.insert_one(product_to_insert).inserted_id
+            rebuild_rollups(self.db, product_id, product_to_insert["price_history"])
         
         # Check if user is already tracking this product
         existing_tracking = self.db.user_tracking.find_one({
@@ -170,7 +227,8 @@ class TrackingService:
                     "target_price": record.get("target_price"),
                     "notify_on_price_drop": record.get("notify_on_price_drop", True),
                     "notify_on_availability": record.get("notify_on_availability", True),
-                    "tracking_since": record.get("created_at")
+                    "tracking_since": record.get("created_at"),
+                    "price_stats": summarize(product.get("price_stats"), product["current_price"])
                 }
                 
                 tracked_products.append(product_with_tracking)
@@ -189,8 +247,8 @@ class TrackingService:
         Returns:
             Dict: Status of the operation and notification info
         """
-        # Get current product data
-        product = self.db.products.find_one({"_id": product_id})
+        # History is only decoded when stats need a rescan, so it is not fetched here
+        product = self.db.products.find_one({"_id": product_id}, {"price_history": 0})
         
         if not product:
             logger.error(f"Product {product_id} not found for price update")
@@ -198,13 +256,23 @@ class TrackingService:
         
         current_price = product.get("current_price")
         price_changed = current_price != new_price
+        now = datetime.utcnow()
+        
+        # Running stats: O(1) per new point; history is only rescanned when a
+        # rolling-window extreme ages out (or for products that predate stats)
+        stats = product.get("price_stats")
+        if stats is None:
+            stats = compute_stats(self._load_hot_series(product_id), now)
         
         # Create price history entry if price changed
         if price_changed:
             price_point = {
                 "price": new_price,
-                "date": datetime.utcnow()
+                "date": now
             }
+            stats = add_price(stats, new_price, now)
+            if window_expired(stats, now):
+                stats = expire_window(stats, self._load_hot_series(product_id).append(new_price, now), now)
             
             self.db.products.update_one(
                 {"_id": product_id},
@@ -212,50 +280,59 @@ class TrackingService:
                     "$set": {
                         "current_price": new_price,
                         "in_stock": in_stock,
-                        "last_checked": datetime.utcnow()
+                        "last_checked": now,
+                        "price_stats": stats
                     },
                     "$push": {
                         "price_history": price_point
+                    },
+                    # Invalidates cached forecasts/analyses and ETags for this product
+                    "$inc": {
+                        "version": 1,
+                        "history_version": 1
                     }
                 }
             )
             
+            record_price(self.db, product_id, new_price, now)
+            
             logger.info(f"Updated price for product {product_id}: {current_price} -> {new_price}")
         else:
             # Just update the last_checked timestamp
+            updates = {
+                "in_stock": in_stock,
+                "last_checked": now
+            }
+            if "price_stats" not in product or window_expired(stats, now):
+                updates["price_stats"] = expire_window(stats, self._load_hot_series(product_id), now)
             self.db.products.update_one(
                 {"_id": product_id},
-                {
-                    "$set": {
-                        "in_stock": in_stock,
-                        "last_checked": datetime.utcnow()
-                    }
-                }
+                {"$set": updates, "$inc": {"version": 1}}
             )
+        get_version_map().invalidate(product_id)
         
         # Check if we need to notify any users
         notifications = []
         
         if price_changed and new_price < current_price:
-            # Price dropped, find users to notify
-            users_to_notify = self.db.user_tracking.find({
-                "product_id": product_id,
-                "notify_on_price_drop": True,
-                "$or": [
-                    {"target_price": {"$gte": new_price}},
-                    {"target_price": None}
-                ]
-            })
+            # Price dropped: only trackers whose target was crossed by this drop
+            users_to_notify = self.db.user_tracking.find(
+                crossed_targets_query(product_id, current_price, new_price),
+                {"user_id": 1, "target_price": 1}
+            )
             
             for user in users_to_notify:
-                notifications.append({
+                notification = {
                     "user_id": user["user_id"],
                     "product_id": product_id,
                     "type": "price_drop",
                     "message": f"Price dropped from {current_price} to {new_price}",
                     "old_price": current_price,
                     "new_price": new_price
-                })
+                }
+                if user.get("target_price") is not None:
+                    notification["target_price"] = user["target_price"]
+                notifications.append(notification)
         
         # Check for availability notifications
         if in_stock and not product.get("in_stock", True):
@@ -278,13 +355,16 @@ class TrackingService:
             "notifications": notifications
         }
     
-    def get_price_history(self, product_id: str, days: Optional[int] = None) -> List[Dict]:
+    def get_price_history(self, product_id: str, days: Optional[int] = None,
+                          points: Optional[int] = None, method: str = "lttb") -> List[Dict]:
         """
         Get price history for a product.
         
         Args:
             product_id: The ID of the product
             days: Optional number of days to limit history (None for all)
+            points: Optional maximum number of points to return (downsampled)
+            method: Downsampling method, "lttb" or "minmax"
             
         Returns:
             List[Dict]: List of price points
@@ -293,23 +373,105 @@ class TrackingService:
             obj_id = ObjectId(product_id)
         except Exception:
             return []
-            
-        product = self.db.products.find_one({"_id": obj_id})
         
-        if not product or "price_history" not in product:
+        now = datetime.utcnow()
+        cutoff_date = now - timedelta(days=days) if days else None
+        
+        # Long ranges are served from rollups: one or two points per bucket
+        if points:
+            summary = self.db.products.find_one(
+                {"_id": obj_id},
+                {"price_stats.count": 1, "created_at": 1, "rollups_built": 1}
+            )
+            if not summary:
+                return []
+            count = (summary.get("price_stats") or {}).get("count", 0)
+            start = cutoff_date or summary.get("created_at")
+            if count > points and start and summary.get("rollups_built"):
+                resolution = pick_resolution(now - start, points)
+                if resolution:
+                    history = load_rollup_points(self.db, obj_id, resolution, cutoff_date)
+                    return downsample_points(history, points, method)
+        
+        # Filter server-side so only the requested window is transferred
+        if cutoff_date:
+            projection = {"price_history": {"$filter": {
+                "input": "$price_history",
+                "cond": {"$gte": ["$$this.date", cutoff_date]}
+            }}}
+        else:
+            projection = {"price_history": 1}
+        projection["history_archived_until"] = 1
+        product = self.db.products.find_one({"_id": obj_id}, projection)
+        
+        if not product:
             return []
         
-        price_history = product["price_history"]
+        series = PriceSeries.from_bson(product.get("price_history"))
+        
+        # Older points live in encoded archive buckets
+        archived_until = product.get("history_archived_until")
+        if archived_until and (cutoff_date is None or cutoff_date <= archived_until):
+            series = PriceSeries.concat(load_archived(self.db, obj_id, cutoff_date), series)
+        
+        if points:
+            series = downsample_series(series, points, method)
+        return series.to_bson()
+    
+    def _load_hot_series(self, product_id) -> PriceSeries:
+        """The product's stored (not yet archived) price history."""
+        product = self.db.products.find_one({"_id": product_id}, {"price_history": 1})
+        return PriceSeries.from_bson((product or {}).get("price_history"))
+    
+    def iter_price_history(self, product_id: str, days: Optional[int] = None, batch_size: int = 500):
+        """
+        Stream price history oldest first without materializing it.
+        
+        Archived buckets are decoded one at a time; stored points are
+        unwound server-side and fetched batch_size at a time.
         
-        if days:
-            # Filter to only include the specified number of days
-            cutoff_date = datetime.utcnow() - datetime.timedelta(days=days)
-            price_history = [p for p in price_history if p["date"] >= cutoff_date]
+        Args:
+            product_id: The ID of the product
+            days: Optional number of days to limit history (None for all)
+            batch_size: Points per cursor batch
+            
+        Returns:
+            Iterator of {"price", "date"} points (empty if the product is unknown)
+        """
+        try:
+            obj_id = ObjectId(product_id)
+        except Exception:
+            return iter(())
         
-        # Sort by date
-        price_history.sort(key=lambda x: x["date"])
+        cutoff_date = datetime.utcnow() - timedelta(days=days) if days else None
+        product = self.db.products.find_one({"_id": obj_id}, {"history_archived_until": 1})
+        if not product:
+            return iter(())
+        
+        def generate():
+            archived_until = product.get("history_archived_until")
+            if archived_until and (cutoff_date is None or cutoff_date <= archived_until):
+                query = {"product_id": obj_id}
+                if cutoff_date:
+                    query["end"] = {"$gte": cutoff_date}
+                buckets = self.db.price_history_archive.find(query, {"data": 1}, sort=[("start", 1)])
+                for bucket in buckets:
+                    series = decode(bytes(bucket["data"]))
+                    if cutoff_date:
+                        series = series.since(cutoff_date)
+                    yield from series.to_bson()
+            
+            pipeline = [
+                {"$match": {"_id": obj_id}},
+                {"$unwind": "$price_history"},
+                {"$replaceRoot": {"newRoot": "$price_history"}},
+            ]
+            if cutoff_date:
+                pipeline.append({"$match": {"date": {"$gte": cutoff_date}}})
+            pipeline.append({"$sort": {"date": 1}})
+            yield from self.db.products.aggregate(pipeline, batchSize=batch_size)
         
-        return price_history
+        return generate()
     
     def update_tracking_preferences(self, user_id: str, product_id: str, preferences: Dict) -> Dict:
         """
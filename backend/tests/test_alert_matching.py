@@ -0,0 +1,44 @@
+# backend/tests/test_alert_matching.py
+import unittest
+
+from services.tracking import crossed_targets_query
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class CrossedTargetsQueryTest(unittest.TestCase):
+    def test_range_is_half_open(self):
+        query = crossed_targets_query("p1", 120.0, 95.0)
+        self.assertEqual(query["$or"][0], {"target_price": {"$gte": 95.0, "$lt": 120.0}})
+        self.assertEqual(query["$or"][1], {"target_price": None})
+
+    def test_unknown_old_price_matches_all_reached_targets(self):
+        query = crossed_targets_query("p1", None, 95.0)
+        self.assertEqual(query["$or"][0], {"target_price": {"$gte": 95.0}})
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class CrossedTargetsMatchingTest(unittest.TestCase):
+    def setUp(self):
+        self.trackers = mongomock.MongoClient().db.user_tracking
+        for user, target in (("a", 100.0), ("b", 90.0), ("c", None), ("d", 130.0)):
+            self.trackers.insert_one({
+                "user_id": user, "product_id": "p1", "target_price": target, "notify_on_price_drop": True
+            })
+        self.trackers.insert_one({
+            "user_id": "e", "product_id": "p1", "target_price": 100.0, "notify_on_price_drop": False
+        })
+
+    def matched(self, old_price, new_price):
+        return sorted(t["user_id"] for t in self.trackers.find(crossed_targets_query("p1", old_price, new_price)))
+
+    def test_only_crossed_targets_alert(self):
+        self.assertEqual(self.matched(120.0, 95.0), ["a", "c"])
+        # A further drop only reaches b; a is not alerted again
+        self.assertEqual(self.matched(95.0, 89.0), ["b", "c"])
+        # Small drop crossing nothing alerts only "any drop" trackers
+        self.assertEqual(self.matched(89.0, 88.0), ["c"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# backend/tests/test_batch_forecasting.py
+import unittest
+
+import numpy as np
+
+from services.batch_forecasting import BatchForecaster, PreloadedHistory, align_series
+
+
+def _series(start, prices):
+    dates = np.datetime64(start, "D") + np.arange(len(prices))
+    return dates, np.asarray(prices, dtype=np.float64)
+
+
+class AlignSeriesTest(unittest.TestCase):
+    def test_forward_and_back_fill(self):
+        series = [
+            _series("2024-01-03", [10.0, 11.0]),
+            _series("2024-01-01", [5.0]),
+        ]
+        Y, observed, end = align_series(series, end=np.datetime64("2024-01-05"), length=5)
+
+        self.assertEqual(end, np.datetime64("2024-01-05"))
+        self.assertEqual(observed.tolist(), [2, 1])
+        np.testing.assert_array_equal(Y[0], [10.0, 10.0, 10.0, 11.0, 11.0])
+        np.testing.assert_array_equal(Y[1], [5.0] * 5)
+
+    def test_price_before_window_seeds_start(self):
+        series = [_series("2024-01-01", [7.0, 8.0])]
+        Y, observed, _ = align_series(series, end=np.datetime64("2024-01-10"), length=3)
+
+        self.assertEqual(observed.tolist(), [0])
+        np.testing.assert_array_equal(Y[0], [8.0, 8.0, 8.0])
+
+
+class BatchForecasterTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        days = np.arange(90)
+        self.smooth = 100 + 0.1 * days + 2 * np.sin(2 * np.pi * days / 7)
+        self.noisy = 100 + rng.normal(0, 20, size=90)
+        self.Y = np.vstack([self.smooth, self.noisy])
+        self.forecaster = BatchForecaster(horizon=14, prophet_mape_threshold=0.05)
+
+    def test_shapes_and_intervals(self):
+        fitted = self.forecaster.fit_predict(self.Y)
+
+        self.assertEqual(fitted["yhat"].shape, (2, 14))
+        self.assertTrue(np.all(fitted["lower"] <= fitted["yhat"]))
+        self.assertTrue(np.all(fitted["yhat"] <= fitted["upper"]))
+        # Intervals widen with the horizon
+        width = fitted["upper"] - fitted["lower"]
+        self.assertTrue(np.all(np.diff(width, axis=1) >= 0))
+
+    def test_routes_poor_fits_to_prophet(self):
+        fitted = self.forecaster.fit_predict(self.Y)
+        routed = self.forecaster.needs_prophet(fitted["mape"], np.array([90, 90]))
+
+        self.assertEqual(routed.tolist(), [False, True])
+
+    def test_to_results_shape(self):
+        fitted = self.forecaster.fit_predict(self.Y[:1])
+        results = self.forecaster.to_results(
+            ["p1"], self.Y[:1], fitted, np.datetime64("2024-03-31"), lambda *args: "wait"
+        )
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["model"], "holt_winters")
+        self.assertEqual(results[0]["predictions"][0]["date"], "2024-04-01")
+        self.assertEqual(len(results[0]["predictions"]), 14)
+
+
+class PreloadedHistoryTest(unittest.TestCase):
+    def test_fallback_run_does_not_reload(self):
+        class Forecasts:
+            def __init__(self):
+                self.ops = []
+
+            def bulk_write(self, ops, ordered=True):
+                self.ops.extend(ops)
+
+        class Service:
+            def __init__(self):
+                self.db = type("Db", (), {"forecasts": Forecasts()})()
+
+            def load_daily_arrays_many(self, *args, **kwargs):
+                raise AssertionError("history reloaded")
+
+            def get_history_versions(self, *args, **kwargs):
+                raise AssertionError("versions reloaded")
+
+            def _generate_recommendation(self, *args):
+                return "wait"
+
+            def build_forecast_doc(self, result, horizon, history_version=None):
+                return {"product_id": result["product_id"], "history_version": history_version}
+
+        service = Service()
+        dates, prices = _series("2024-01-01", 100 + np.random.default_rng(1).normal(0, 20, size=90))
+        preloaded = PreloadedHistory([("p1", dates, prices, 7)])
+        stats, routed = BatchForecaster(14, float("inf")).run(
+            service, preloaded.product_ids(), source=preloaded
+        )
+
+        self.assertEqual((stats["stored"], routed), (1, []))
+        self.assertEqual(len(service.db.forecasts.ops), 1)
+        self.assertEqual(service.db.forecasts.ops[0]._doc["$set"]["history_version"], 7)
+        self.assertEqual(preloaded.load_daily_arrays_many(["p1", "p2"]).keys(), {"p1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+# backend/tests/test_catalog.py
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from benchmarks.catalog import (
+    archive_history, catalog_id, catalog_user_id, generate_products, product_bundle, product_identity,
+    rollup_docs, tracked_indexes, user_bundle
+)
+from core.price_codec import decode
+from core.price_series import PriceSeries
+
+NOW = datetime(2026, 1, 1)
+
+class CatalogTest(unittest.TestCase):
+    def test_deterministic_and_sliceable(self):
+        whole = list(generate_products(20, seed=3, now=NOW))
+        tail = list(generate_products(5, seed=3, now=NOW, start=15))
+        self.assertEqual(whole[15:], tail)
+        self.assertNotEqual(whole, list(generate_products(20, seed=4, now=NOW)))
+        self.assertEqual(whole[7]["_id"], catalog_id(3, 7))
+
+    def test_identity_matches_generated_product(self):
+        product = list(generate_products(1, seed=1, now=NOW, start=42))[0]
+        identity = product_identity(1, 42)
+        self.assertEqual({k: product[k] for k in identity}, identity)
+
+    def test_archive_keeps_seed_point(self):
+        bundle = product_bundle(2, 9, NOW, history_days=3 * 365, changes_per_day=0.3)
+        full = bundle["products"][0]["price_history"]
+        product = dict(bundle["products"][0], price_history=list(full))
+        cutoff = NOW - timedelta(days=180)
+        buckets = archive_history(product, cutoff)
+
+        archived = PriceSeries.concat(*(decode(bytes(b["data"])) for b in buckets))
+        self.assertEqual(len(archived) + len(product["price_history"]), len(full))
+        self.assertLess(product["price_history"][0]["date"], cutoff)
+        self.assertGreaterEqual(product["price_history"][1]["date"], cutoff)
+        self.assertEqual(product["history_archived_until"], archived[-1][0])
+
+    def test_rollups(self):
+        at = datetime(2026, 1, 1, 10, 5)
+        points = [{"price": 10, "date": at}, {"price": 8, "date": at + timedelta(minutes=20)},
+                  {"price": 12, "date": at + timedelta(hours=3)}]
+        docs = {(d["resolution"], d["bucket"]): d for d in rollup_docs("p", points)}
+        day = docs[("day", datetime(2026, 1, 1))]
+        self.assertEqual((day["open"], day["close"], day["low"], day["high"], day["count"]), (10, 12, 8, 12, 3))
+        hour = docs[("hour", datetime(2026, 1, 1, 10))]
+        self.assertEqual((hour["open"], hour["close"], hour["count"]), (10, 8, 2))
+        self.assertEqual(len(docs), 3)
+
+    def test_user_bundle(self):
+        bundle = user_bundle(5, 2, products=1000, password_hash="x", now=NOW, tracked_mean=30,
+                             notifications_mean=2, retention_days={"price_drop": 30, "back_in_stock": 14})
+        user_id = catalog_user_id(5, 2)
+        self.assertEqual(str(bundle["users"][0]["_id"]), user_id)
+        product_ids = {t["product_id"] for t in bundle["user_tracking"]}
+        self.assertEqual(len(product_ids), len(bundle["user_tracking"]))
+        for notification in bundle["notifications"]:
+            self.assertEqual(notification["user_id"], user_id)
+            self.assertGreater(notification["expires_at"], notification["created_at"])
+
+    def test_fan_out_is_long_tailed(self):
+        rng = random.Random(0)
+        counts = sorted(len(tracked_indexes(rng, 100000, 20)) for _ in range(2000))
+        self.assertLess(counts[len(counts) // 2], 20)
+        self.assertGreater(counts[-1], 100)
+
+if __name__ == "__main__":
+    unittest.main()
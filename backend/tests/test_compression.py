@@ -0,0 +1,92 @@
+# backend/tests/test_compression.py
+import gzip
+import json
+import unittest
+from unittest import mock
+
+from flask import Flask, jsonify
+
+import core.compression as compression
+from core.compression import EncodedBody, init_compression
+from core.json_provider import init_json
+from core.streaming import ndjson_response
+
+class CompressionMiddlewareTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_json(self.app)
+        self.app.config["COMPRESS_MIN_SIZE"] = 512
+        init_compression(self.app)
+
+        @self.app.route("/big")
+        def big():
+            return jsonify({"points": [{"price": 100.0 + i, "n": i} for i in range(500)]})
+
+        @self.app.route("/small")
+        def small():
+            return jsonify({"ok": True})
+
+        @self.app.route("/stream")
+        def stream():
+            return ndjson_response({"n": i} for i in range(500))
+
+        self.client = self.app.test_client()
+
+    def test_gzip_when_accepted(self):
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response.headers["Vary"])
+        self.assertEqual(int(response.headers["Content-Length"]), len(response.data))
+        self.assertEqual(len(json.loads(gzip.decompress(response.data))["points"]), 500)
+
+    def test_identity_without_accept_encoding(self):
+        response = self.client.get("/big")
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(len(response.get_json()["points"]), 500)
+
+    def test_small_and_streamed_responses_untouched(self):
+        self.assertNotIn("Content-Encoding", self.client.get("/small", headers={"Accept-Encoding": "gzip"}).headers)
+        streamed = self.client.get("/stream", headers={"Accept-Encoding": "gzip"})
+        self.assertNotIn("Content-Encoding", streamed.headers)
+
+    @unittest.skipUnless(compression.brotli, "brotli required")
+    def test_brotli_preferred(self):
+        response = self.client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.headers["Content-Encoding"], "br")
+        self.assertEqual(len(json.loads(compression.brotli.decompress(response.data))["points"]), 500)
+
+class EncodedBodyTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_json(self.app)
+        self.app.config["COMPRESS_MIN_SIZE"] = 512
+        with self.app.app_context():
+            self.body = EncodedBody.from_obj({"values": list(range(1000))})
+
+    def test_compresses_each_encoding_once(self):
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as spy:
+            for _ in range(3):
+                with self.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+                    response = self.body.to_response()
+                    self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(spy.call_count, 1)
+        self.assertEqual(json.loads(gzip.decompress(response.get_data()))["values"][-1], 999)
+
+    def test_identity_response(self):
+        with self.app.test_request_context():
+            response = self.body.to_response()
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertEqual(response.get_data(), self.body.data)
+
+    def test_uncompressed_when_disabled(self):
+        self.app.config["COMPRESS_ENABLED"] = False
+        with mock.patch.object(compression, "compress", wraps=compression.compress) as spy:
+            with self.app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+                response = self.body.to_response()
+        spy.assert_not_called()
+        self.assertNotIn("Content-Encoding", response.headers)
+        self.assertNotIn("Accept-Encoding", response.vary)
+        self.assertEqual(response.get_data(), self.body.data)
+
+if __name__ == "__main__":
+    unittest.main()
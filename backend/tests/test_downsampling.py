@@ -0,0 +1,61 @@
+# backend/tests/test_downsampling.py
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from core.price_series import PriceSeries
+from services.downsampling import downsample_points, downsample_series, lttb, minmax
+from services.price_rollups import bucket_start, pick_resolution
+
+class DownsamplingTest(unittest.TestCase):
+    def setUp(self):
+        start = datetime(2024, 1, 1)
+        prices = 100 + 10 * np.sin(np.arange(1000) / 25)
+        prices[500] = 50.0  # a spike that must survive minmax
+        self.points = [
+            {"price": float(p), "date": start + timedelta(minutes=30 * i)}
+            for i, p in enumerate(prices)
+        ]
+
+    def test_lttb_keeps_endpoints_and_size(self):
+        x = np.arange(1000, dtype=float)
+        y = np.array([p["price"] for p in self.points])
+        indices = lttb(x, y, 100)
+        self.assertEqual(len(indices), 100)
+        self.assertEqual((indices[0], indices[-1]), (0, 999))
+        self.assertTrue(np.all(np.diff(indices) > 0))
+
+    def test_minmax_keeps_extremes(self):
+        y = np.array([p["price"] for p in self.points])
+        indices = minmax(y, 100)
+        self.assertLessEqual(len(indices), 100)
+        self.assertIn(500, indices)
+
+    def test_downsample_points_passthrough(self):
+        few = self.points[:5]
+        self.assertIs(downsample_points(few, 10), few)
+        sampled = downsample_points(self.points, 50, "minmax")
+        self.assertLessEqual(len(sampled), 50)
+        self.assertEqual(sampled, sorted(sampled, key=lambda p: p["date"]))
+
+    def test_downsample_series_matches_points(self):
+        series = PriceSeries.from_bson(self.points)
+        self.assertIs(downsample_series(series, 2000), series)
+        for method in ("lttb", "minmax"):
+            sampled = downsample_series(series, 60, method)
+            self.assertEqual(sampled.to_bson(), downsample_points(self.points, 60, method))
+
+class RollupHelpersTest(unittest.TestCase):
+    def test_bucket_start(self):
+        at = datetime(2024, 3, 5, 14, 37, 12)
+        self.assertEqual(bucket_start(at, "hour"), datetime(2024, 3, 5, 14))
+        self.assertEqual(bucket_start(at, "day"), datetime(2024, 3, 5))
+
+    def test_pick_resolution(self):
+        self.assertEqual(pick_resolution(timedelta(days=365), 200), "day")
+        self.assertEqual(pick_resolution(timedelta(days=30), 200), "hour")
+        self.assertIsNone(pick_resolution(timedelta(days=2), 200))
+
+if __name__ == "__main__":
+    unittest.main()
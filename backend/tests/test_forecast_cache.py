@@ -0,0 +1,66 @@
+# backend/tests/test_forecast_cache.py
+import threading
+import unittest
+
+from services.forecast_cache import ForecastCache
+
+class ForecastCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = ForecastCache(max_entries=2)
+        self.calls = 0
+
+    def compute(self, value):
+        def _compute():
+            self.calls += 1
+            return value
+        return _compute
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.cache.get(("p1", "forecast", 7), 1, self.compute("a")), ("a", "miss"))
+        self.assertEqual(self.cache.get(("p1", "forecast", 7), 1, self.compute("b")), ("a", "hit"))
+        self.assertEqual(self.calls, 1)
+
+    def test_new_version_serves_stale_and_revalidates(self):
+        self.cache.get(("p1", "forecast", 7), 1, self.compute("old"))
+        done = threading.Event()
+
+        def recompute():
+            done.set()
+            return "new"
+
+        value, state = self.cache.get(("p1", "forecast", 7), 2, recompute)
+        self.assertEqual((value, state), ("old", "stale"))
+        self.assertTrue(done.wait(2))
+        self.cache._executor.shutdown(wait=True)
+        self.assertEqual(self.cache.get(("p1", "forecast", 7), 2, self.compute("x")), ("new", "hit"))
+
+    def test_lru_eviction(self):
+        self.cache.get(("p1", "forecast", 7), 1, self.compute("a"))
+        self.cache.get(("p2", "forecast", 7), 1, self.compute("b"))
+        self.cache.get(("p1", "forecast", 7), 1, self.compute("a"))
+        self.cache.get(("p3", "forecast", 7), 1, self.compute("c"))
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.get(("p2", "forecast", 7), 1, self.compute("b2"))[1], "miss")
+        self.assertEqual(self.cache.stats["evictions"], 2)
+
+    def test_invalidate_product(self):
+        self.cache.get(("p1", "forecast", 7), 1, self.compute("a"))
+        self.cache.get(("p1", "analysis", 0), 1, self.compute("b"))
+        self.cache.invalidate("p1")
+        self.assertEqual(len(self.cache), 0)
+
+    def test_rejected_values_are_not_stored(self):
+        failed = lambda value: value != "error"
+        self.assertEqual(self.cache.get(("p1", "forecast", 7), 1, self.compute("error"), failed), ("error", "miss"))
+        self.assertEqual(self.cache.get(("p1", "forecast", 7), 1, self.compute("ok"), failed), ("ok", "miss"))
+        self.assertEqual(self.calls, 2)
+
+    def test_rejected_revalidation_drops_entry(self):
+        self.cache.get(("p1", "forecast", 7), 1, self.compute("old"))
+        self.cache.get(("p1", "forecast", 7), 2, self.compute("error"), lambda value: value != "error")
+        self.cache._executor.shutdown(wait=True)
+        self.assertEqual(len(self.cache), 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# backend/tests/test_forecasting.py
+import unittest
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from services.forecasting import ForecastingService, is_storable, resample_daily
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class ResampleDailyTest(unittest.TestCase):
+    def test_forward_fills_gaps(self):
+        points = [
+            {"price": 100.0, "date": datetime(2024, 1, 1, 9)},
+            {"price": 90.0, "date": datetime(2024, 1, 4, 18)},
+        ]
+        series = resample_daily(points)
+        self.assertEqual([p["date"] for p in series], ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"])
+        self.assertEqual([p["price"] for p in series], [100.0, 100.0, 100.0, 90.0])
+
+    def test_last_price_of_day_wins_and_extends_to_end(self):
+        points = [
+            {"price": 80.0, "date": datetime(2024, 1, 1, 20)},
+            {"price": 100.0, "date": datetime(2024, 1, 1, 8)},
+        ]
+        series = resample_daily(points, end=datetime(2024, 1, 3, 12))
+        self.assertEqual([p["price"] for p in series], [80.0, 80.0, 80.0])
+
+    def test_empty(self):
+        self.assertEqual(resample_daily([]), [])
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class StoredForecastTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.service = ForecastingService(self.db)
+        self.product_id = ObjectId()
+        self.db.products.insert_one({"_id": self.product_id, "history_version": 3})
+        self.result = {
+            "status": "success",
+            "model": "simple",
+            "product_id": str(self.product_id),
+            "current_price": 10.0,
+            "predictions": [{"date": "2024-01-02", "predicted_price": 9.5}],
+            "trend": "decreasing"
+        }
+
+    def test_stored_forecast_follows_history_version(self):
+        self.service.save_forecast(self.result, 7, history_version=3)
+        self.assertIsNotNone(self.service.get_stored_forecast(self.product_id, 7, 24, history_version=3))
+        self.assertIsNone(self.service.get_stored_forecast(self.product_id, 7, 24, history_version=4))
+
+    def test_version_bump_refits(self):
+        self.service.save_forecast(self.result, 7, history_version=2)
+        calls = []
+        self.service.forecast_price = lambda product_id, days_ahead: calls.append(product_id) or self.result
+        self.service.get_or_create_forecast(self.product_id, 7, 24)
+        self.assertEqual(len(calls), 1)
+        stored = self.db.forecasts.find_one({"product_id": str(self.product_id)})
+        self.assertEqual(stored["history_version"], 3)
+        self.service.get_or_create_forecast(self.product_id, 7, 24)
+        self.assertEqual(len(calls), 1)
+
+    def test_only_real_fits_are_storable(self):
+        self.assertTrue(is_storable(self.result))
+        self.assertFalse(is_storable(dict(self.result, model="demo")))
+        self.assertFalse(is_storable({"status": "insufficient_data"}))
+        self.assertFalse(is_storable({"error": "Forecast failed"}))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+# backend/tests/test_http_cache.py
+import unittest
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+
+import core.http_cache as http_cache
+from core.http_cache import VersionMap, conditional, get_version_map
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+class CountingProducts:
+    """Stand-in products collection that counts reads."""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    def find_one(self, query, projection=None):
+        self.reads += 1
+        return self.docs.get(query["_id"])
+
+
+class FakeDb:
+    def __init__(self, docs):
+        self.products = CountingProducts(docs)
+
+
+class VersionMapTest(unittest.TestCase):
+    def test_reads_once_within_ttl(self):
+        oid = ObjectId()
+        db = FakeDb({oid: {"_id": oid, "version": 3, "history_version": 2}})
+        versions = VersionMap(ttl_seconds=60)
+        self.assertEqual(versions.get(db, str(oid)), {"version": 3, "history_version": 2})
+        versions.get(db, str(oid))
+        self.assertEqual(db.products.reads, 1)
+        versions.invalidate(oid)
+        versions.get(db, str(oid))
+        self.assertEqual(db.products.reads, 2)
+
+    def test_unknown_and_malformed_ids(self):
+        versions = VersionMap()
+        self.assertIsNone(versions.get(FakeDb({}), str(ObjectId())))
+        self.assertIsNone(versions.get(FakeDb({}), "not-an-id"))
+
+    def test_evicts_least_recently_used(self):
+        versions = VersionMap(max_entries=2)
+        for key in ("a", "b", "c"):
+            versions.put(key, {"version": 1, "history_version": 1})
+        self.assertEqual(len(versions), 2)
+
+
+class ConditionalTest(unittest.TestCase):
+    def setUp(self):
+        http_cache._map = None
+        self.oid = ObjectId()
+        self.doc = {"_id": self.oid, "version": 1, "history_version": 1}
+        self.app = Flask(__name__)
+        self.app.db = FakeDb({self.oid: self.doc})
+        self.app.config["HTTP_CACHE_VERSION_TTL_SECONDS"] = 60
+        self.calls = 0
+
+        @self.app.route("/products/<product_id>")
+        @conditional("version")
+        def product(product_id):
+            self.calls += 1
+            return jsonify({"id": product_id}), 200
+
+        @self.app.route("/stale/<product_id>")
+        @conditional("history_version")
+        def stale(product_id):
+            response = jsonify({})
+            response.headers["X-Cache"] = "stale"
+            return response
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        http_cache._map = None
+
+    def test_not_modified_without_db_read(self):
+        url = f"/products/{self.oid}"
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first.headers["Cache-Control"], http_cache.CACHE_CONTROL)
+        etag = first.headers["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        reads = self.app.db.products.reads
+        second = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers["ETag"], etag)
+        self.assertEqual(self.app.db.products.reads, reads)
+        self.assertEqual(self.calls, 1)
+
+    def test_version_bump_changes_etag(self):
+        url = f"/products/{self.oid}"
+        etag = self.client.get(url).headers["ETag"]
+        self.doc["version"] = 2
+        get_version_map().invalidate(self.oid)
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_query_and_accept_vary_etag(self):
+        url = f"/products/{self.oid}"
+        plain = self.client.get(url).headers["ETag"]
+        self.assertNotEqual(plain, self.client.get(url + "?days=7").headers["ETag"])
+        self.assertNotEqual(plain, self.client.get(url, headers={"Accept": "application/x-ndjson"}).headers["ETag"])
+
+    def test_stale_and_missing_get_no_etag(self):
+        self.assertNotIn("ETag", self.client.get(f"/stale/{self.oid}").headers)
+        missing = self.client.get(f"/products/{ObjectId()}")
+        self.assertNotIn("ETag", missing.headers)
+
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class ProductWritesBumpVersionTest(unittest.TestCase):
+    """Every write to a product must change the ETag of GET /api/products/<id>."""
+
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.db = mongomock.MongoClient().db
+        now = datetime.utcnow()
+        self.product_id = self.app.db.products.insert_one({
+            "url": "https://shop.example/p/1",
+            "current_price": 10.0,
+            "version": 1,
+            "history_version": 1,
+            "price_history": [{"price": 12.0, "date": now - timedelta(days=400)},
+                              {"price": 11.0, "date": now - timedelta(days=300)},
+                              {"price": 10.0, "date": now - timedelta(days=1)}]
+        }).inserted_id
+        self.versions = get_version_map()
+        self.versions.clear()
+
+    def assert_bumped(self, write):
+        db = self.app.db
+        before = self.versions.get(db, str(self.product_id))["version"]
+        with self.app.app_context():
+            write()
+        self.assertEqual(self.versions.get(db, str(self.product_id))["version"], before + 1)
+
+    def test_track_existing_url(self):
+        from services.tracking import TrackingService
+        self.assert_bumped(lambda: TrackingService().track_product(
+            "u1", {"url": "https://shop.example/p/1", "current_price": 9.0, "name": "P"}
+        ))
+
+    def test_scheduling(self):
+        from services.scheduling import RefreshScheduler
+        product = self.app.db.products.find_one({"_id": self.product_id})
+        self.assert_bumped(lambda: RefreshScheduler().reschedule(product))
+        self.assert_bumped(lambda: RefreshScheduler().backoff(self.product_id))
+
+    def test_archive(self):
+        from services.price_archive import archive_product
+        product = self.app.db.products.find_one({"_id": self.product_id})
+        self.assert_bumped(lambda: archive_product(self.app.db, product, datetime.utcnow() - timedelta(days=200)))
+        history_version = self.app.db.products.find_one({"_id": self.product_id})["history_version"]
+        self.assertEqual(history_version, 1)
+
+if __name__ == "__main__":
+    unittest.main()
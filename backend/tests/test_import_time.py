@@ -0,0 +1,51 @@
+# backend/tests/test_import_time.py
+import os
+import unittest
+from unittest import mock
+
+from benchmarks.import_time import (
+    DEFAULT_BUDGET_MS, STARTUP_MODULES, heavy_imports, parse_importtime, profile, total_ms
+)
+
+REPORT = """\
+import time:       120 |        120 | _io
+-- startup imports done
+import time: self [us] | cumulative | imported package
+import time:       300 |        300 |     bson.objectid
+import time:      1000 |       1300 |   core.db
+import time:       500 |       1800 | app
+import time:       200 |        200 | sklearn
+"""
+
+class ParseImporttimeTest(unittest.TestCase):
+    def test_parses_records_after_marker(self):
+        records = parse_importtime(REPORT)
+        self.assertEqual([r.module for r in records], ["bson.objectid", "core.db", "app", "sklearn"])
+        self.assertEqual([r.depth for r in records], [2, 1, 0, 0])
+        self.assertEqual(total_ms(records), 2.0)
+        self.assertEqual(heavy_imports(records), ["sklearn"])
+
+class StartupModulesTest(unittest.TestCase):
+    def test_api_modules_are_registered_by_create_app(self):
+        from app import create_app
+
+        with mock.patch.dict(os.environ, {"SCHEDULER_ENABLED": "false"}), mock.patch("app.init_db"):
+            app = create_app()
+        registered = {bp.import_name for bp in app.iter_blueprints()}
+        expected = {m for m in STARTUP_MODULES if m.startswith("api.")}
+        self.assertEqual(expected - registered, set())
+
+class StartupBudgetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.records = profile()
+
+    def test_no_heavy_modules_at_startup(self):
+        self.assertEqual(heavy_imports(self.records), [])
+
+    def test_within_budget(self):
+        budget = float(os.getenv("IMPORT_BUDGET_MS", DEFAULT_BUDGET_MS))
+        self.assertLess(total_ms(self.records), budget)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+# backend/tests/test_json_provider.py
+import json
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+
+from core.json_provider import StdlibProvider, init_json
+from core.schemas import ProductOut
+
+class JsonProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_json(self.app)
+        self.oid = ObjectId()
+        self.payload = {
+            "_id": self.oid,
+            "created_at": datetime(2024, 1, 2, 3, 4, 5),
+            "price": Decimal("19.99"),
+            "count": np.int64(3),
+            "mean": np.float32(1.5),
+            "series": np.array([1.0, 2.0]),
+            "product": ProductOut(title="Mouse", price=9.5, url="https://x", source="shop"),
+        }
+        self.expected = {
+            "_id": str(self.oid),
+            "created_at": "2024-01-02T03:04:05+00:00",
+            "price": 19.99,
+            "count": 3,
+            "mean": 1.5,
+            "series": [1.0, 2.0],
+        }
+
+    def check(self, body):
+        data = json.loads(body)
+        self.assertEqual({k: data[k] for k in self.expected}, self.expected)
+        self.assertEqual(data["product"]["title"], "Mouse")
+
+    def test_jsonify_mongo_documents(self):
+        with self.app.test_request_context():
+            response = jsonify(self.payload)
+        self.assertEqual(response.mimetype, "application/json")
+        self.check(response.get_data())
+
+    def test_stdlib_fallback_matches(self):
+        self.check(StdlibProvider(self.app).dumps(self.payload))
+
+    def test_unknown_type_still_fails(self):
+        with self.assertRaises(TypeError):
+            self.app.json.dumps({"x": object()})
+
+if __name__ == "__main__":
+    unittest.main()
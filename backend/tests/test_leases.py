@@ -0,0 +1,107 @@
+# backend/tests/test_leases.py
+# backend/tests/test_leases.py
+import time
+import unittest
+from datetime import datetime, timedelta
+
+from core.leases import LeaseKeeper, LeaseManager, SHARD_KEY_SPACE, random_shard_key, shard_ranges
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class ShardRangesTest(unittest.TestCase):
+    def test_ranges_cover_key_space(self):
+        for count in (1, 3, 16, 100):
+            ranges = shard_ranges(count)
+            self.assertEqual(len(ranges), count)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], SHARD_KEY_SPACE)
+            for (_, hi), (lo, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(hi, lo)
+
+    def test_invalid_count_falls_back_to_one_shard(self):
+        self.assertEqual(shard_ranges(0), [(0, SHARD_KEY_SPACE)])
+
+    def test_random_shard_key_in_range(self):
+        for _ in range(100):
+            self.assertTrue(0 <= random_shard_key() < SHARD_KEY_SPACE)
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class LeaseManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.a = LeaseManager(self.db, owner="worker-a")
+        self.b = LeaseManager(self.db, owner="worker-b")
+
+    def test_acquire_creates_lease(self):
+        self.assertTrue(self.a.acquire("refresh:0", 60))
+        lease = self.db.job_leases.find_one({"_id": "refresh:0"})
+        self.assertEqual(lease["owner"], "worker-a")
+        self.assertGreater(lease["expires_at"], datetime.utcnow())
+
+    def test_held_lease_is_not_taken(self):
+        self.assertTrue(self.a.acquire("refresh:0", 60))
+        # The upsert hits the existing _id and raises DuplicateKeyError
+        self.assertFalse(self.b.acquire("refresh:0", 60))
+        self.assertEqual(self.db.job_leases.find_one({"_id": "refresh:0"})["owner"], "worker-a")
+        self.assertTrue(self.a.acquire("refresh:0", 60))
+
+    def test_takeover_after_expiry(self):
+        self.assertTrue(self.a.acquire("refresh:0", 60))
+        self.db.job_leases.update_one(
+            {"_id": "refresh:0"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        self.assertTrue(self.b.acquire("refresh:0", 60))
+        self.assertFalse(self.a.renew("refresh:0", 60))
+        self.assertFalse(self.a.acquire("refresh:0", 60))
+
+    def test_non_owner_cannot_renew_or_release(self):
+        self.a.acquire("refresh:0", 60)
+        expires_at = self.db.job_leases.find_one({"_id": "refresh:0"})["expires_at"]
+        self.assertFalse(self.b.renew("refresh:0", 600))
+        self.b.release("refresh:0")
+        self.assertEqual(self.db.job_leases.find_one({"_id": "refresh:0"})["expires_at"], expires_at)
+        self.assertFalse(self.b.acquire("refresh:0", 60))
+
+    def test_release_frees_lease(self):
+        with self.a.hold("cleanup", 60) as held:
+            self.assertTrue(held)
+            with self.b.hold("cleanup", 60) as other:
+                self.assertFalse(other)
+        self.assertLessEqual(self.db.job_leases.find_one({"_id": "cleanup"})["expires_at"], datetime.utcnow())
+        # Mongo stores milliseconds, so the lease is free from the next one on
+        time.sleep(0.002)
+        self.assertTrue(self.b.acquire("cleanup", 60))
+
+    def test_get_leases_by_prefix(self):
+        for name in ("refresh:1", "refresh:0", "cleanup"):
+            self.a.acquire(name, 60)
+        self.assertEqual([l["_id"] for l in self.a.get_leases("refresh:")], ["refresh:0", "refresh:1"])
+
+    def test_keeper_renews_when_due(self):
+        self.a.acquire("refresh:0", 60)
+        keeper = LeaseKeeper(self.a, "refresh:0", 60)
+        before = self.db.job_leases.find_one({"_id": "refresh:0"})["expires_at"]
+        # Not due yet: no write
+        self.assertTrue(keeper.keep_alive())
+        self.assertEqual(self.db.job_leases.find_one({"_id": "refresh:0"})["expires_at"], before)
+        keeper._last_renewal -= timedelta(seconds=21)
+        self.db.job_leases.update_one({"_id": "refresh:0"}, {"$set": {"expires_at": before - timedelta(seconds=30)}})
+        self.assertTrue(keeper.keep_alive())
+        self.assertGreaterEqual(self.db.job_leases.find_one({"_id": "refresh:0"})["expires_at"], before)
+
+    def test_keeper_reports_lost_lease(self):
+        self.a.acquire("refresh:0", 60)
+        keeper = LeaseKeeper(self.a, "refresh:0", 60)
+        self.db.job_leases.update_one(
+            {"_id": "refresh:0"}, {"$set": {"expires_at": datetime.utcnow() - timedelta(seconds=1)}}
+        )
+        self.assertTrue(self.b.acquire("refresh:0", 60))
+        keeper._last_renewal -= timedelta(seconds=21)
+        with self.assertLogs("core.leases", "WARNING"):
+            self.assertFalse(keeper.keep_alive())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# backend/tests/test_load.py
+import asyncio
+import threading
+import unittest
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.load import DEFAULT_MIX, HttpConnection, LoadReport, parse_mix, percentile, run_load
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    paths = []
+
+    def do_GET(self):
+        Handler.paths.append((self.command, self.path, self.headers.get("Authorization")))
+        if self.path.startswith("/chunked"):
+            self.send_response(200)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in (b"hello ", b"world"):
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = b'{"ok": true}'
+        self.send_response(404 if self.path.startswith("/api/tracking/forecast") else 200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.do_GET()
+
+    def log_message(self, *args):
+        pass
+
+class LoadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.port = cls.server.server_address[1]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("search=3, history=1"), {"search": 3.0, "history": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("checkout=1")
+        with self.assertRaises(ValueError):
+            parse_mix("search=0")
+
+    def test_percentile(self):
+        values = [float(v) for v in range(1, 101)]
+        self.assertEqual([percentile(values, q) for q in (50, 95, 99, 100)], [50, 95, 99, 100])
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_keep_alive_and_chunked(self):
+        async def exchange():
+            connection = HttpConnection("127.0.0.1", self.port)
+            first = await connection.request("GET", "/plain")
+            writer = connection.writer
+            second = await connection.request("GET", "/chunked")
+            self.assertIs(connection.writer, writer)
+            connection.close()
+            return first, second
+
+        first, second = asyncio.run(exchange())
+        self.assertEqual((first[0], first[2]), (200, b'{"ok": true}'))
+        self.assertEqual((second[0], second[2]), (200, b"hello world"))
+
+    def test_run_reports_per_route(self):
+        Handler.paths.clear()
+        options = Namespace(
+            host="127.0.0.1", port=self.port, users=4, duration=0.5, ramp_up=0.1, think_time=0.01,
+            products=100, catalog_users=2, seed=0, mix=dict(DEFAULT_MIX), timeout=5,
+            jwt_secret="load-test-secret-load-test-secret!"
+        )
+        summary = asyncio.run(run_load(options)).summary()
+        routes = summary["routes"]
+        self.assertIn("POST /api/search", routes)
+        forecast = routes.get("GET /api/tracking/forecast/<id>")
+        if forecast:
+            self.assertEqual(forecast["errors"], forecast["requests"])
+        self.assertTrue(all(auth.startswith("Bearer ") for _, _, auth in Handler.paths))
+        # Revalidated routes get 304s once an ETag is cached
+        history = routes.get("GET /api/tracking/history/<id>")
+        if history and history["requests"] > 1:
+            self.assertTrue(set(history["statuses"]) <= {"200", "304"})
+        self.assertIn("p99_ms", routes["POST /api/search"])
+
+    def test_table(self):
+        report = LoadReport()
+        report.record("GET /a", 200, 0.010)
+        report.record("GET /a", 500, 0.030)
+        table = report.format_table()
+        self.assertIn("GET /a", table)
+        self.assertIn("2 requests, 1 errors", table)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+# backend/tests/test_metrics.py
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from flask import Flask
+
+import core.metrics as metrics
+from core.metrics import MongoCommandTimer, init_metrics, timed_job
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def sample(name, **labels):
+    return metrics.prometheus_client.REGISTRY.get_sample_value(name, labels) or 0.0
+
+@unittest.skipUnless(metrics.prometheus_client, "prometheus_client required")
+class MetricsTest(unittest.TestCase):
+    def test_request_latency_by_route(self):
+        app = Flask(__name__)
+        init_metrics(app)
+
+        @app.route("/items/<item_id>")
+        def item(item_id):
+            return "ok"
+
+        labels = {"method": "GET", "route": "/items/<item_id>", "status": "200"}
+        before = sample("pricehawk_http_request_duration_seconds_count", **labels)
+        client = app.test_client()
+        client.get("/items/1")
+        client.get("/items/2")
+        self.assertEqual(sample("pricehawk_http_request_duration_seconds_count", **labels) - before, 2)
+
+        response = client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"pricehawk_http_request_duration_seconds_bucket", response.data)
+
+    def test_mongo_command_timer(self):
+        timer = MongoCommandTimer()
+        labels = {"command": "find", "collection": "products", "status": "ok"}
+        before = sample("pricehawk_mongo_command_duration_seconds_count", **labels)
+        timer.started(SimpleNamespace(command_name="find", command={"find": "products"},
+                                      connection_id=("h", 1), request_id=7))
+        timer.succeeded(SimpleNamespace(command_name="find", connection_id=("h", 1), request_id=7,
+                                        duration_micros=2500))
+        self.assertEqual(sample("pricehawk_mongo_command_duration_seconds_count", **labels) - before, 1)
+        self.assertEqual(timer._collections, {})
+
+    def test_job_failures_recorded(self):
+        @timed_job("test_job")
+        def failing(app):
+            raise RuntimeError("boom")
+
+        before = sample("pricehawk_job_duration_seconds_count", job="test_job", status="error")
+        with self.assertRaises(RuntimeError):
+            failing(None)
+        self.assertEqual(sample("pricehawk_job_duration_seconds_count", job="test_job", status="error") - before, 1)
+
+    def test_adapter_calls_timed(self):
+        from adapters.base import BaseAdapter
+
+        class FakeAdapter(BaseAdapter):
+            def search(self, query, max_results=10):
+                return []
+
+            def fetch_price_history(self, product_id):
+                return []
+
+            def fetch_product(self, url):
+                return {"price": 1.0}
+
+        labels = {"adapter": "FakeAdapter", "operation": "fetch_product", "status": "ok"}
+        FakeAdapter().fetch_product("https://example.com")
+        self.assertEqual(sample("pricehawk_adapter_duration_seconds_count", **labels), 1)
+
+    def test_multiprocess_aggregation(self):
+        record = "from core.metrics import record_cache; record_cache('forecast', 'hit')"
+        collect = (
+            "from prometheus_client import CollectorRegistry, multiprocess;"
+            "r = CollectorRegistry(); multiprocess.MultiProcessCollector(r);"
+            "print(r.get_sample_value('pricehawk_cache_requests_total', {'cache': 'forecast', 'result': 'hit'}))"
+        )
+        with tempfile.TemporaryDirectory() as path:
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": path}
+            for _ in range(2):
+                subprocess.run([sys.executable, "-c", record], cwd=BACKEND_DIR, env=env, check=True)
+            result = subprocess.run([sys.executable, "-c", collect], cwd=BACKEND_DIR, env=env,
+                                    check=True, capture_output=True, text=True)
+        self.assertEqual(float(result.stdout), 2.0)
+
+    def test_missing_multiprocess_dir_is_created(self):
+        record = "from core.metrics import record_cache; record_cache('forecast', 'hit')"
+        with tempfile.TemporaryDirectory() as parent:
+            path = os.path.join(parent, "metrics")
+            env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": path}
+            subprocess.run([sys.executable, "-c", record], cwd=BACKEND_DIR, env=env, check=True)
+            self.assertTrue(os.listdir(path))
+
+if __name__ == "__main__":
+    unittest.main()
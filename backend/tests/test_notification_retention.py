@@ -0,0 +1,84 @@
+# backend/tests/test_notification_retention.py
+import unittest
+from datetime import datetime, timedelta
+from flask import Flask
+from pymongo.errors import OperationFailure
+
+from core.db import _ensure_index
+from core.utils import parse_int_mapping
+from services.notifications import NotificationService, get_retention_days, notification_expires_at
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class NotificationRetentionTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.config.update(
+            NOTIFICATION_RETENTION_DAYS=45,
+            NOTIFICATION_RETENTION_BY_TYPE={"price_drop": 60},
+        )
+
+    def test_parse_int_mapping(self):
+        self.assertEqual(parse_int_mapping("a=1, b=2,bad,c=x"), {"a": 1, "b": 2})
+        self.assertEqual(parse_int_mapping(""), {})
+
+    def test_retention_per_type(self):
+        with self.app.app_context():
+            self.assertEqual(get_retention_days("price_drop"), 60)
+            self.assertEqual(get_retention_days("test"), 1)
+            self.assertEqual(get_retention_days("something_else"), 45)
+
+    def test_expires_at(self):
+        created = datetime(2024, 1, 1)
+        with self.app.app_context():
+            self.assertEqual(notification_expires_at("back_in_stock", created), created + timedelta(days=14))
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class ArchiveReadTest(unittest.TestCase):
+    def test_archives_legacy_is_read(self):
+        app = Flask(__name__)
+        app.db = mongomock.MongoClient().db
+        old = datetime.utcnow() - timedelta(days=30)
+        app.db.notifications.insert_many([
+            {"user_id": "u", "type": "price_drop", "read": True, "created_at": old},
+            {"user_id": "u", "type": "price_drop", "is_read": True, "created_at": old},
+            {"user_id": "u", "type": "price_drop", "is_read": False, "created_at": old},
+        ])
+        with app.app_context():
+            self.assertEqual(NotificationService().archive_read_notifications(older_than_days=7), 2)
+        self.assertEqual(app.db.notifications.count_documents({}), 1)
+        self.assertEqual(app.db.notifications_archive.count_documents({}), 2)
+
+class EnsureIndexTest(unittest.TestCase):
+    def test_index_with_changed_key_is_rebuilt(self):
+        calls = []
+
+        class Collection:
+            name = "notifications"
+
+            def create_index(self, keys, name, **options):
+                calls.append(("create", name))
+                if len(calls) == 1:
+                    raise OperationFailure("Index with name already exists with a different key", code=86)
+
+            def drop_index(self, name):
+                calls.append(("drop", name))
+
+        _ensure_index(Collection(), [("user_id", 1)], name="notifications_user_created")
+        self.assertEqual(calls, [("create", "notifications_user_created"), ("drop", "notifications_user_created"),
+                                 ("create", "notifications_user_created")])
+
+    def test_failure_does_not_raise(self):
+        class Collection:
+            name = "products"
+
+            def create_index(self, keys, name, **options):
+                raise OperationFailure("conflict", code=85)
+
+        _ensure_index(Collection(), [("a", 1)], name="a")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+# backend/tests/test_pagination.py
+import unittest
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+
+from core.pagination import (
+    InvalidCursor, decode_cursor, encode_cursor, iterate, paginate, paging_requested, parse_fields,
+    parse_page_size
+)
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class PaginationTest(unittest.TestCase):
+    def test_cursor_round_trip(self):
+        doc = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1, 12, 30, 0, 123000)}
+        value, doc_id = decode_cursor(encode_cursor(doc))
+        self.assertEqual(value, doc["created_at"])
+        self.assertEqual(doc_id, doc["_id"])
+
+    def test_cursor_with_string_id(self):
+        doc = {"_id": "3f0c-uuid", "created_at": datetime(2024, 5, 1)}
+        self.assertEqual(decode_cursor(encode_cursor(doc))[1], "3f0c-uuid")
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not-a-cursor")
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(parse_page_size(None), 50)
+        self.assertEqual(parse_page_size("0"), 1)
+        self.assertEqual(parse_page_size("100000"), 200)
+        self.assertEqual(parse_page_size("abc", default=10), 10)
+
+    def test_fields_projection(self):
+        self.assertIsNone(parse_fields("", ["name"]))
+        self.assertIsNone(parse_fields("secret", ["name"]))
+        self.assertEqual(parse_fields("name,secret", ["name"]), {"name": 1, "created_at": 1, "_id": 1})
+
+    def test_paging_requested(self):
+        self.assertFalse(paging_requested({}))
+        self.assertTrue(paging_requested({"limit": "10"}))
+        self.assertTrue(paging_requested({"cursor": "abc"}))
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class PaginateTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.items
+        start = datetime(2024, 1, 1)
+        # 10 documents, with created_at shared in groups of three
+        self.collection.insert_many([
+            {"_id": ObjectId(), "n": n, "created_at": start + timedelta(minutes=n // 3)}
+            for n in range(10)
+        ])
+        self.expected = [d["_id"] for d in self.collection.find().sort([("created_at", -1), ("_id", -1)])]
+
+    def walk(self, limit):
+        pages, cursor = [], None
+        while True:
+            docs, cursor = paginate(self.collection, {}, limit=limit, cursor=cursor)
+            pages.append([d["_id"] for d in docs])
+            if cursor is None:
+                return pages
+
+    def test_pages_cover_every_document_once(self):
+        for limit in (1, 2, 3, 4, 7):
+            pages = self.walk(limit)
+            self.assertEqual([i for page in pages for i in page], self.expected, limit)
+            self.assertTrue(all(len(page) == limit for page in pages[:-1]))
+
+    def test_exact_multiple_has_no_empty_last_page(self):
+        pages = self.walk(5)
+        self.assertEqual([len(p) for p in pages], [5, 5])
+        docs, cursor = paginate(self.collection, {}, limit=10)
+        self.assertEqual((len(docs), cursor), (10, None))
+
+    def test_ties_on_created_at_break_on_id(self):
+        # Page boundary falls inside a group of equal timestamps
+        first, cursor = paginate(self.collection, {}, limit=2)
+        second, _ = paginate(self.collection, {}, limit=2, cursor=cursor)
+        self.assertEqual(first[-1]["created_at"], second[0]["created_at"])
+        self.assertGreater(first[-1]["_id"], second[0]["_id"])
+
+    def test_filter_and_iterate_agree(self):
+        query = {"n": {"$gte": 4}}
+        docs, _ = paginate(self.collection, query, limit=3)
+        _, cursor = paginate(self.collection, query, limit=1)
+        rest = [d["_id"] for d in iterate(self.collection, query, cursor=cursor)]
+        self.assertEqual(len(rest), 5)
+        self.assertEqual(rest[:2], [d["_id"] for d in docs[1:]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+# backend/tests/test_price_codec.py
+import unittest
+from datetime import datetime, timedelta
+
+import bson
+import numpy as np
+
+from core.price_codec import PriceCodecError, choose_scale, decode, decode_arrays, encode
+from core.price_series import PriceSeries
+
+class PriceCodecTest(unittest.TestCase):
+    def setUp(self):
+        start = datetime(2023, 1, 1)
+        rng = np.random.default_rng(1)
+        prices = np.round(199.99 + np.cumsum(rng.choice([0, 0, 0, -1.5, 2.25], size=5000)), 2)
+        self.points = [
+            {"price": float(p), "date": start + timedelta(minutes=30 * i, milliseconds=int(rng.integers(0, 3)))}
+            for i, p in enumerate(prices)
+        ]
+        self.series = PriceSeries.from_bson(self.points)
+
+    def test_round_trip(self):
+        decoded = decode(encode(self.series))
+        np.testing.assert_array_equal(decoded.dates, self.series.dates)
+        np.testing.assert_allclose(decoded.prices, self.series.prices)
+        self.assertEqual(decoded.to_bson()[:3], self.points[:3])
+
+    def test_order_of_magnitude_smaller_than_bson(self):
+        packed = len(encode(self.series))
+        plain = len(bson.encode({"price_history": self.points}))
+        self.assertLess(packed * 10, plain)
+
+    def test_negative_deltas_and_scale(self):
+        series = PriceSeries.from_arrays(
+            np.array(["2024-01-03", "2024-01-01", "2024-01-02"], dtype="datetime64[ms]"),
+            [10.5, 12.125, 9.0]
+        )
+        self.assertEqual(choose_scale(series.prices), 1000)
+        dates, prices = decode_arrays(encode(series))
+        self.assertEqual(prices.tolist(), [12.125, 9.0, 10.5])
+        self.assertEqual(str(dates[0]), "2024-01-01T00:00:00.000")
+
+    def test_empty_and_single(self):
+        self.assertEqual(len(decode(encode(PriceSeries.empty()))), 0)
+        one = PriceSeries.from_bson([{"price": 5.0, "date": datetime(2024, 1, 1)}])
+        self.assertEqual(decode(encode(one)).to_bson(), one.to_bson())
+
+    def test_rejects_bad_payloads(self):
+        blob = encode(self.series)
+        with self.assertRaises(PriceCodecError):
+            decode(b"\x09" + blob[1:])
+        with self.assertRaises(PriceCodecError):
+            decode(blob[:-1] + b"\x80")
+        with self.assertRaises(PriceCodecError):
+            decode(blob[:len(blob) // 2])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+# backend/tests/test_price_export.py
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from services.price_export import PYARROW_AVAILABLE
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+@unittest.skipUnless(PYARROW_AVAILABLE and mongomock, "pyarrow and mongomock required")
+class PriceExportTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.now = datetime.utcnow().replace(microsecond=0)
+        for k in range(3):
+            history = [
+                {"price": 100.0 + k + (i % 5), "date": self.now - timedelta(days=120) + timedelta(hours=12 * i)}
+                for i in range(200)
+            ]
+            self.db.products.insert_one({"price_history": history, "source": "shop", "category": "audio"})
+        self.out = tempfile.mkdtemp()
+
+    def test_partitioned_export(self):
+        from services.price_export import export_to_directory
+
+        stats = export_to_directory(self.db, self.out, batch_rows=128)
+        self.assertEqual(stats["rows"], 600)
+        self.assertEqual(stats["products"], 3)
+        months = sorted(d for d in os.listdir(self.out) if d.startswith("month="))
+        self.assertEqual(len(months), stats["files"])
+
+    def test_stream_is_one_parquet_file(self):
+        import pyarrow.parquet as pq
+        from services.price_export import stream_parquet
+
+        since = self.now - timedelta(days=30)
+        data = b"".join(stream_parquet(self.db, batch_rows=64, since=since))
+        table = pq.read_table(io.BytesIO(data))
+        self.assertGreater(table.num_rows, 0)
+        self.assertTrue(all(d >= since for d in table.column("date").to_pylist()))
+
+    def test_parquet_source_matches_loader_shape(self):
+        from services.price_export import ParquetHistorySource, export_to_directory
+
+        export_to_directory(self.db, self.out)
+        source = ParquetHistorySource(self.out)
+        ids = source.product_ids()
+        loaded = source.load_daily_arrays_many(ids, days=30, now=self.now)
+        self.assertEqual(len(loaded), 3)
+        dates, prices = next(iter(loaded.values()))
+        self.assertEqual(len(dates), 31)
+        self.assertEqual(len(prices), 31)
+
+    def test_snapshot_forecasts_are_never_served_as_current(self):
+        from services.forecasting import ForecastingService
+        from services.price_export import ParquetHistorySource, export_to_directory
+
+        export_to_directory(self.db, self.out)
+        source = ParquetHistorySource(self.out)
+        ids = source.product_ids()
+        versions = source.get_history_versions(ids)
+        self.assertEqual(set(versions), set(ids))
+
+        service = ForecastingService(self.db)
+        product_id = ids[0]
+        self.db.forecasts.insert_one({
+            "product_id": product_id, "days_ahead": 14, "history_version": versions[product_id],
+            "generated_at": datetime.utcnow(), "forecast": [], "trend": "stable"
+        })
+        live = service.get_history_version(product_id)
+        self.assertIsNone(service.get_stored_forecast(product_id, 7, 24, live))
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class FinishImportTest(unittest.TestCase):
+    def test_stats_cover_imported_points(self):
+        from bson.binary import Binary
+        from core.price_codec import encode
+        from core.price_series import PriceSeries
+        from services.price_export import finish_import
+
+        db = mongomock.MongoClient().db
+        now = datetime.utcnow().replace(microsecond=0)
+        recent = [{"price": 100.0, "date": now - timedelta(days=1)}]
+        product_id = db.products.insert_one({
+            "price_history": recent, "version": 4, "history_version": 2,
+            "price_stats": {"count": 1, "min_price": 100.0}
+        }).inserted_id
+        imported = PriceSeries.from_bson([
+            {"price": 70.0, "date": now - timedelta(days=400)},
+            {"price": 130.0, "date": now - timedelta(days=300)},
+        ])
+        db.price_history_archive.insert_one({
+            "product_id": product_id, "start": imported[0][0], "end": imported[-1][0],
+            "count": len(imported), "data": Binary(encode(imported))
+        })
+
+        finish_import(db, product_id, imported[-1][0])
+        product = db.products.find_one({"_id": product_id})
+        stats = product["price_stats"]
+        self.assertEqual((stats["count"], stats["min_price"], stats["max_price"]), (3, 70.0, 130.0))
+        self.assertEqual(stats["current_price"], 100.0)
+        self.assertEqual((product["version"], product["history_version"]), (5, 3))
+        self.assertEqual(product["history_archived_until"], imported[-1][0])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+# backend/tests/test_price_series.py
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+from bson.objectid import ObjectId
+from flask import Flask
+
+from core.price_series import PriceSeries
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class PriceSeriesTest(unittest.TestCase):
+    def setUp(self):
+        self.points = [
+            {"price": 90.0, "date": datetime(2024, 1, 4, 18)},
+            {"price": 100.0, "date": datetime(2024, 1, 1, 9)},
+            {"price": 95.0, "date": datetime(2024, 1, 4, 8)},
+            {"price": None, "date": datetime(2024, 1, 5)},
+        ]
+        self.series = PriceSeries.from_bson(self.points)
+
+    def test_sorted_and_skips_incomplete_points(self):
+        self.assertEqual(len(self.series), 3)
+        self.assertEqual(self.series.prices.tolist(), [100.0, 95.0, 90.0])
+        self.assertEqual(self.series.dates.dtype, np.dtype("datetime64[ms]"))
+        self.assertEqual(self.series.nbytes, 48)
+
+    def test_bson_round_trip(self):
+        self.assertEqual(self.series.to_bson(), sorted(self.points[:3], key=lambda p: p["date"]))
+
+    def test_windows(self):
+        self.assertEqual(len(self.series.since(datetime(2024, 1, 4))), 2)
+        self.assertEqual(self.series.price_at(datetime(2024, 1, 3)), 100.0)
+        self.assertIsNone(self.series.price_at(datetime(2023, 12, 31)))
+        window = self.series.window_from(datetime(2024, 1, 3))
+        self.assertEqual(window.prices.tolist(), [100.0, 95.0, 90.0])
+        self.assertEqual(window[0][0], datetime(2024, 1, 3))
+
+    def test_slices_share_buffers(self):
+        view = self.series[1:]
+        self.assertTrue(np.shares_memory(view.prices, self.series.prices))
+        frame = self.series.to_pandas()
+        self.assertTrue(np.shares_memory(frame.to_numpy(), self.series.prices))
+
+    def test_resample_daily(self):
+        dates, prices = self.series.resample_daily(end=datetime(2024, 1, 6))
+        self.assertEqual(str(dates[0]), "2024-01-01")
+        self.assertEqual(prices.tolist(), [100.0, 100.0, 100.0, 90.0, 90.0, 90.0])
+
+    def test_append_and_empty(self):
+        grown = self.series.append(80.0, datetime(2024, 1, 2))
+        self.assertEqual(grown.prices.tolist(), [100.0, 80.0, 95.0, 90.0])
+        self.assertEqual(len(PriceSeries.from_bson(None)), 0)
+        self.assertEqual(len(PriceSeries.empty().resample_daily()[0]), 0)
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class TrackingHistoryTest(unittest.TestCase):
+    def test_price_history_merges_archive_and_downsamples(self):
+        from services.price_archive import archive_product
+        from services.tracking import TrackingService
+
+        app = Flask(__name__)
+        app.db = mongomock.MongoClient().db
+        start = datetime.utcnow() - timedelta(days=100)
+        history = [{"price": 100.0 + i % 7, "date": start + timedelta(hours=6 * i)} for i in range(300)]
+        product_id = ObjectId()
+        app.db.products.insert_one({"_id": product_id, "price_history": history, "version": 1})
+        with app.app_context():
+            archive_product(app.db, app.db.products.find_one({"_id": product_id}), start + timedelta(days=50))
+            service = TrackingService()
+            full = service.get_price_history(str(product_id))
+            self.assertEqual([(p["date"], p["price"]) for p in full],
+                             [(p["date"].replace(microsecond=p["date"].microsecond // 1000 * 1000), p["price"])
+                              for p in history])
+            sampled = service.get_price_history(str(product_id), points=40, method="minmax")
+            self.assertLessEqual(len(sampled), 40)
+            self.assertEqual((sampled[0], sampled[-1]), (full[0], full[-1]))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# backend/tests/test_price_stats.py
+import math
+import unittest
+from datetime import datetime, timedelta
+
+from unittest import mock
+
+from flask import Flask
+
+from services import price_stats
+from services.price_stats import add_price, compute_stats, expire_window, summarize, variance, window_expired
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class PriceStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime(2024, 6, 1)
+        self.history = [
+            {"price": 120.0, "date": self.now - timedelta(days=200)},
+            {"price": 90.0, "date": self.now - timedelta(days=30)},
+            {"price": 110.0, "date": self.now - timedelta(days=10)},
+            {"price": 100.0, "date": self.now - timedelta(days=1)},
+        ]
+
+    def test_welford_matches_batch(self):
+        stats = compute_stats(self.history, self.now)
+        prices = [p["price"] for p in self.history]
+        mean = sum(prices) / len(prices)
+        self.assertEqual(stats["count"], 4)
+        self.assertAlmostEqual(stats["mean"], mean)
+        self.assertAlmostEqual(variance(stats), sum((p - mean) ** 2 for p in prices) / len(prices))
+        self.assertAlmostEqual(stats["sum_sq"], sum(p * p for p in prices))
+
+    def test_all_time_and_window_extremes(self):
+        stats = compute_stats(self.history, self.now)
+        self.assertEqual((stats["min_price"], stats["max_price"]), (90.0, 120.0))
+        # 120 was in force when the window opened, so it still counts, with its real date
+        self.assertEqual((stats["window_min_price"], stats["window_max_price"]), (90.0, 120.0))
+        self.assertEqual(stats["window_max_date"], self.now - timedelta(days=200))
+        self.assertEqual(stats["window_carried_until"], self.now - timedelta(days=30))
+        self.assertEqual(stats["previous_price"], 110.0)
+        self.assertEqual(stats["last_change_at"], self.now - timedelta(days=1))
+
+    def test_incremental_update_and_expiry(self):
+        stats = compute_stats(self.history, self.now)
+        later = self.now + timedelta(days=70)
+        stats = add_price(stats, 95.0, later)
+        history = self.history + [{"price": 95.0, "date": later}]
+
+        self.assertTrue(window_expired(stats, later))
+        stats = expire_window(stats, history, later)
+        self.assertEqual((stats["window_min_price"], stats["window_max_price"]), (90.0, 110.0))
+        self.assertFalse(window_expired(stats, later))
+
+    def test_carried_extreme_expires_when_replaced_point_ages_out(self):
+        stats = compute_stats(self.history, self.now)
+        self.assertFalse(window_expired(stats, self.now + timedelta(days=59)))
+        # The 90.0 point from day -30 is now older than the window, so 120.0 is no longer in force
+        later = self.now + timedelta(days=61)
+        self.assertTrue(window_expired(stats, later))
+        stats = expire_window(stats, self.history, later)
+        self.assertEqual((stats["window_min_price"], stats["window_max_price"]), (90.0, 110.0))
+        self.assertEqual(stats["window_min_date"], self.now - timedelta(days=30))
+
+    def test_flat_product_is_not_rescanned(self):
+        history = [{"price": 50.0, "date": self.now - timedelta(days=200)}]
+        stats = compute_stats(history, self.now)
+        self.assertEqual(stats["window_min_date"], self.now - timedelta(days=200))
+        for day in range(1, 400, 7):
+            self.assertFalse(window_expired(stats, self.now + timedelta(days=day)))
+        # A new price replaces the carried one; it expires once that price leaves the window
+        changed_at = self.now + timedelta(days=10)
+        stats = add_price(stats, 60.0, changed_at)
+        self.assertFalse(window_expired(stats, changed_at + timedelta(days=89)))
+        self.assertTrue(window_expired(stats, changed_at + timedelta(days=91)))
+
+    def test_summarize(self):
+        summary = summarize(compute_stats(self.history, self.now))
+        self.assertEqual(summary["current_price"], 100.0)
+        self.assertEqual(summary["savings_opportunity"], 10.0)
+        self.assertEqual(summary["price_trend"], "decreasing")
+        self.assertTrue(math.isclose(summary["avg_price"], 105.0))
+        self.assertIsNone(summarize(None))
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class FlatProductUpdateTest(unittest.TestCase):
+    def test_repeated_unchanged_prices_do_not_rescan(self):
+        from services.tracking import TrackingService
+
+        app = Flask(__name__)
+        app.db = mongomock.MongoClient().db
+        app.db.products.insert_one({
+            "_id": "p1",
+            "current_price": 50.0,
+            "price_history": [{"price": 50.0, "date": datetime.utcnow() - timedelta(days=200)}]
+        })
+        with app.app_context(), mock.patch(
+            "services.tracking.expire_window", wraps=price_stats.expire_window
+        ) as rescan:
+            service = TrackingService()
+            service.update_price("p1", 50.0)
+            # The first update builds stats for a product that predates them
+            self.assertEqual(rescan.call_count, 1)
+            for _ in range(5):
+                service.update_price("p1", 50.0)
+            self.assertEqual(rescan.call_count, 1)
+        stats = app.db.products.find_one({"_id": "p1"})["price_stats"]
+        self.assertEqual(stats["window_min_price"], 50.0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# backend/tests/test_products_api.py
+import os
+import unittest
+from unittest import mock
+
+try:
+    import mongomock
+except ImportError:  # pragma: no cover
+    mongomock = None
+
+from app import create_app
+from core.http_cache import get_version_map
+
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class ProductsApiTest(unittest.TestCase):
+    """The products blueprint exercised through the real app and /api prefix."""
+
+    @classmethod
+    def setUpClass(cls):
+        with mock.patch.dict(os.environ, {"SCHEDULER_ENABLED": "false"}), \
+                mock.patch("app.init_db"):
+            cls.app = create_app()
+
+    def setUp(self):
+        self.app.db = mongomock.MongoClient().db
+        get_version_map(self.app.config).clear()
+        self.client = self.app.test_client()
+
+    def test_get_product_answers_304_when_etag_matches(self):
+        pid = self.app.db.products.insert_one({"name": "Lamp", "version": 3}).inserted_id
+
+        rv = self.client.get(f"/api/products/{pid}")
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(rv.get_json()["name"], "Lamp")
+        etag = rv.headers["ETag"]
+        self.assertTrue(etag.startswith("W/"))
+
+        rv = self.client.get(f"/api/products/{pid}", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 304)
+        self.assertEqual(rv.headers["ETag"], etag)
+
+    def test_get_product_new_etag_after_version_bump(self):
+        pid = self.app.db.products.insert_one({"name": "Lamp", "version": 3}).inserted_id
+        etag = self.client.get(f"/api/products/{pid}").headers["ETag"]
+
+        self.app.db.products.update_one({"_id": pid}, {"$inc": {"version": 1}})
+        get_version_map(self.app.config).invalidate(str(pid))
+
+        rv = self.client.get(f"/api/products/{pid}", headers={"If-None-Match": etag})
+        self.assertEqual(rv.status_code, 200)
+        self.assertNotEqual(rv.headers["ETag"], etag)
+
+    def test_listing_without_paging_params_is_a_bare_list(self):
+        self.app.db.products.insert_many([{"name": f"P{i}", "price_history": [1]} for i in range(3)])
+
+        rv = self.client.get("/api/products/")
+        self.assertEqual(rv.status_code, 200)
+        body = rv.get_json()
+        self.assertIsInstance(body, list)
+        self.assertEqual(len(body), 3)
+        self.assertNotIn("price_history", body[0])
+        self.assertIn("id", body[0])
+
+    def test_listing_next_cursor_round_trips(self):
+        self.app.db.products.insert_many([{"name": f"P{i}"} for i in range(5)])
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            url = "/api/products/?limit=2" + (f"&cursor={cursor}" if cursor else "")
+            rv = self.client.get(url)
+            self.assertEqual(rv.status_code, 200)
+            body = rv.get_json()
+            self.assertLessEqual(len(body["items"]), 2)
+            seen.extend(p["id"] for p in body["items"])
+            pages += 1
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+        # newest first
+        expected = [str(p["_id"]) for p in self.app.db.products.find().sort("_id", -1)]
+        self.assertEqual(seen, expected)
+
+    def test_listing_rejects_bad_cursor(self):
+        rv = self.client.get("/api/products/?cursor=not-a-cursor")
+        self.assertEqual(rv.status_code, 400)
+
+    def test_listing_fields_and_ndjson(self):
+        self.app.db.products.insert_many([{"name": f"P{i}", "url": "u"} for i in range(3)])
+
+        body = self.client.get("/api/products/?limit=10&fields=name").get_json()
+        self.assertEqual(set(body["items"][0]), {"id", "name"})
+
+        rv = self.client.get("/api/products/", headers={"Accept": "application/x-ndjson"})
+        self.assertEqual(rv.status_code, 200)
+        lines = rv.get_data(as_text=True).strip().splitlines()
+        self.assertEqual(len(lines), 3)
+
+    def test_writes_require_auth(self):
+        rv = self.client.post("/api/products/", json={"name": "Lamp"})
+        self.assertEqual(rv.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+# backend/tests/test_refresh_runs.py
+import unittest
+from datetime import datetime, timedelta
+
+from jobs.runs import RefreshRunStore
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class RefreshRunStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.runs = RefreshRunStore(self.db, "worker-a", checkpoint_every=2, retention_days=7)
+
+    def test_empty_run_is_not_persisted(self):
+        run = self.runs.start(0, 4)
+        run.finish()
+        self.assertEqual(self.db.refresh_runs.count_documents({}), 0)
+
+    def test_finished_run_expires(self):
+        run = self.runs.start(0, 4)
+        run.advance({"_id": 1, "next_check_at": datetime.utcnow()}, "changed")
+        run.finish()
+        doc = self.db.refresh_runs.find_one({"_id": run.id})
+        self.assertEqual((doc["status"], doc["counts"]["checked"]), ("completed", 1))
+        self.assertAlmostEqual(
+            (doc["expires_at"] - doc["finished_at"]).total_seconds(), timedelta(days=7).total_seconds(), delta=1
+        )
+
+    def test_checkpointed_run_is_resumed(self):
+        run = self.runs.start(1, 4)
+        for n in range(2):
+            run.advance({"_id": n, "next_check_at": datetime.utcnow()}, "unchanged")
+        self.assertEqual(self.db.refresh_runs.find_one({"_id": run.id})["status"], "running")
+
+        resumed = RefreshRunStore(self.db, "worker-b").start(1, 4)
+        self.assertEqual(resumed.id, run.id)
+        self.assertEqual((resumed.doc["owner"], resumed.doc["resume_count"]), ("worker-b", 1))
+        # A resumed run is already stored, so finishing it is recorded even without new work
+        resumed.finish()
+        self.assertEqual(self.db.refresh_runs.find_one({"_id": run.id})["status"], "completed")
+
+    def test_runs_from_other_shard_count_are_abandoned(self):
+        run = self.runs.start(0, 4)
+        run.save()
+        self.runs.start(0, 8)
+        doc = self.db.refresh_runs.find_one({"_id": run.id})
+        self.assertEqual(doc["status"], "abandoned")
+        self.assertIn("expires_at", doc)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+# backend/tests/test_scheduling.py
+import unittest
+from datetime import datetime, timedelta
+
+from services.scheduling import compute_check_interval
+
+NOW = datetime(2024, 6, 1, 12, 0)
+
+def history(changes_in_window):
+    return [{"price": 100 - i, "date": NOW - timedelta(hours=6 * i)} for i in range(changes_in_window)]
+
+class RefreshSchedulingTest(unittest.TestCase):
+    def test_volatile_products_are_checked_sooner(self):
+        stable = compute_check_interval(history(0), 100, [None], now=NOW)
+        volatile = compute_check_interval(history(20), 100, [None], now=NOW)
+        self.assertLess(volatile, stable)
+
+    def test_untracked_products_slow_down(self):
+        tracked = compute_check_interval([], 100, [None], now=NOW)
+        untracked = compute_check_interval([], 100, [], now=NOW)
+        self.assertGreater(untracked, tracked)
+
+    def test_near_target_is_checked_sooner(self):
+        far = compute_check_interval([], 100, [50], now=NOW)
+        near = compute_check_interval([], 100, [99], now=NOW)
+        self.assertLess(near, far)
+
+    def test_interval_is_clamped(self):
+        fastest = compute_check_interval(history(200), 100, [99.9] * 50, now=NOW)
+        slowest = compute_check_interval([], 100, [], now=NOW, base_hours=1000)
+        self.assertEqual(fastest, timedelta(minutes=30))
+        self.assertEqual(slowest, timedelta(hours=48))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+# backend/tests/test_slow_queries.py
+import json
+import unittest
+from types import SimpleNamespace
+
+from flask import Flask
+
+from core.slow_queries import (
+    MONITOR_ORIGIN, SlowQueryMonitor, command_shape, current_origin, query_origin,
+    slow_query_report, summarize_plan
+)
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+COLLSCAN_EXPLAIN = {
+    "queryPlanner": {
+        "winningPlan": {"stage": "SORT", "inputStage": {"stage": "COLLSCAN", "direction": "forward"}},
+        "rejectedPlans": [{"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "unused"}}]
+    }
+}
+AGGREGATE_EXPLAIN = {
+    "stages": [{"$cursor": {"queryPlanner": {"winningPlan": {
+        "stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "user_tracking_price_drop"}
+    }}}}]
+}
+
+def events(monitor, command_name, command, duration_ms, request_id=1):
+    monitor.started(SimpleNamespace(command_name=command_name, command=command,
+                                    connection_id=("localhost", 27017), request_id=request_id))
+    monitor.succeeded(SimpleNamespace(command_name=command_name, database_name="pricehawk",
+                                      connection_id=("localhost", 27017), request_id=request_id,
+                                      duration_micros=int(duration_ms * 1000)))
+
+class ShapeTest(unittest.TestCase):
+    def test_literals_replaced(self):
+        shape = command_shape("find", {
+            "find": "products",
+            "filter": {"source": "amazon", "current_price": {"$lt": 50}, "$or": [{"a": 1}, {"b": [1, 2]}]},
+            "sort": {"created_at": -1}
+        })
+        self.assertEqual(shape, {
+            "filter": {"source": "?", "current_price": {"$lt": "?"}, "$or": [{"a": "?"}, {"b": ["?"]}]},
+            "sort": {"created_at": -1}
+        })
+
+    def test_same_shape_for_different_values(self):
+        a = command_shape("update", {"update": "products", "updates": [{"q": {"_id": 1}, "u": {"$set": {"x": 1}}}]})
+        b = command_shape("update", {"update": "products", "updates": [{"q": {"_id": 2}, "u": {"$set": {"x": 9}}}]})
+        self.assertEqual(a, b)
+
+    def test_summarize_plan(self):
+        self.assertEqual(summarize_plan(COLLSCAN_EXPLAIN), {"collscan": True, "stages": ["SORT", "COLLSCAN"], "indexes": []})
+        plan = summarize_plan(AGGREGATE_EXPLAIN)
+        self.assertFalse(plan["collscan"])
+        self.assertEqual(plan["indexes"], ["user_tracking_price_drop"])
+
+class MonitorTest(unittest.TestCase):
+    def setUp(self):
+        self.monitor = SlowQueryMonitor(threshold_ms=50)
+
+    def test_records_only_slow_commands_grouped_by_shape(self):
+        with query_origin("job:refresh_prices"):
+            events(self.monitor, "find", {"find": "products", "filter": {"url": "a"}}, 80, 1)
+            events(self.monitor, "find", {"find": "products", "filter": {"url": "b"}}, 120, 2)
+            events(self.monitor, "find", {"find": "products", "filter": {"url": "c"}}, 10, 3)
+        self.assertEqual(len(self.monitor._pending), 1)
+        entry = next(iter(self.monitor._pending.values()))
+        self.assertEqual((entry["count"], entry["total_ms"], entry["max_ms"]), (2, 200, 120))
+        self.assertEqual(entry["origin"], "job:refresh_prices")
+        self.assertEqual(entry["sample"]["filter"], {"url": "b"})
+        self.assertEqual(self.monitor._inflight, {})
+
+    def test_monitor_traffic_ignored(self):
+        with query_origin(MONITOR_ORIGIN):
+            events(self.monitor, "update", {"update": "slow_queries", "updates": [{"q": {}}]}, 500)
+        self.assertEqual(self.monitor._pending, {})
+
+    def test_origin_from_request(self):
+        app = Flask(__name__)
+
+        @app.route("/items/<item_id>")
+        def item(item_id):
+            return current_origin()
+
+        self.assertEqual(app.test_client().get("/items/3").get_data(as_text=True), "GET /items/<item_id>")
+        self.assertEqual(current_origin(), "background")
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class ReportTest(unittest.TestCase):
+    def setUp(self):
+        self.db = mongomock.MongoClient().db
+        self.monitor = SlowQueryMonitor(threshold_ms=50)
+
+    def test_flush_merges_and_report_ranks(self):
+        events(self.monitor, "find", {"find": "products", "filter": {"url": "a"}}, 100, 1)
+        self.monitor.flush(self.db)
+        events(self.monitor, "find", {"find": "products", "filter": {"url": "b"}}, 300, 2)
+        events(self.monitor, "count", {"count": "notifications", "query": {"read": False}}, 60, 3)
+        self.assertEqual(self.monitor.flush(self.db), 2)
+
+        report = slow_query_report(self.db)
+        self.assertEqual([r["collection"] for r in report], ["products", "notifications"])
+        self.assertEqual((report[0]["count"], report[0]["total_ms"], report[0]["max_ms"]), (2, 400, 300))
+        self.assertEqual(report[0]["avg_ms"], 200)
+        self.assertNotIn("sample", report[0])
+        self.assertEqual(json.loads(report[0]["shape"])["filter"], {"url": "?"})
+
+    def test_explain_top_flags_collscan(self):
+        events(self.monitor, "find", {"find": "products", "filter": {"url": "a"}}, 100)
+        self.monitor.flush(self.db)
+        explained = []
+
+        class FakeDatabase:
+            def command(self, name, sample, verbosity=None):
+                explained.append(sample)
+                return COLLSCAN_EXPLAIN
+
+        client = {"pricehawk": FakeDatabase()}
+        self.assertEqual(self.monitor.explain_top(client, self.db, top=5), 1)
+        self.assertEqual(explained[0]["filter"], {"url": "a"})
+        # Not explained again within the interval
+        self.assertEqual(self.monitor.explain_top(client, self.db, top=5), 0)
+        report = slow_query_report(self.db, collscan_only=True)
+        self.assertEqual(len(report), 1)
+        self.assertTrue(report[0]["plan"]["collscan"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+# backend/tests/test_streaming.py
+import json
+import unittest
+from datetime import datetime, timedelta
+
+from bson.objectid import ObjectId
+from flask import Flask, jsonify
+
+from core.json_provider import init_json
+from core.pagination import InvalidCursor, encode_cursor, iterate
+from core.streaming import NDJSON_MIMETYPE, ndjson_response, wants_ndjson
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+class NdjsonResponseTest(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        init_json(self.app)
+        self.app.config["NDJSON_FLUSH_BYTES"] = 256
+
+        @self.app.route("/rows")
+        def rows():
+            docs = ({"_id": ObjectId(), "n": i, "at": datetime(2024, 1, 1)} for i in range(100))
+            if wants_ndjson():
+                return ndjson_response(docs, transform=lambda d: {**d, "double": d["n"] * 2})
+            return jsonify(list(docs))
+
+        self.client = self.app.test_client()
+
+    def test_streams_one_row_per_line(self):
+        response = self.client.get("/rows", headers={"Accept": NDJSON_MIMETYPE}, buffered=False)
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        self.assertTrue(response.is_streamed)
+        chunks = list(response.response)
+        self.assertGreater(len(chunks), 1)
+        lines = b"".join(chunks).splitlines()
+        self.assertEqual(len(lines), 100)
+        self.assertEqual(json.loads(lines[3])["double"], 6)
+
+    def test_json_stays_default(self):
+        for accept in (None, "*/*", "application/json"):
+            headers = {"Accept": accept} if accept else {}
+            response = self.client.get("/rows", headers=headers)
+            self.assertEqual(response.mimetype, "application/json")
+
+@unittest.skipUnless(mongomock, "mongomock required")
+class IterateTest(unittest.TestCase):
+    def setUp(self):
+        self.collection = mongomock.MongoClient().db.items
+        start = datetime(2024, 1, 1)
+        self.collection.insert_many([{"created_at": start + timedelta(minutes=i), "n": i} for i in range(25)])
+
+    def test_iterates_after_cursor_newest_first(self):
+        newest = list(iterate(self.collection, {}, batch_size=7))
+        self.assertEqual([d["n"] for d in newest], list(range(24, -1, -1)))
+        token = encode_cursor(newest[9])
+        self.assertEqual([d["n"] for d in iterate(self.collection, {}, cursor=token)], list(range(14, -1, -1)))
+
+    def test_bad_cursor_fails_before_streaming(self):
+        with self.assertRaises(InvalidCursor):
+            iterate(self.collection, {}, cursor="not-a-token")
+
+if __name__ == "__main__":
+    unittest.main()
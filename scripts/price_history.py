@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# scripts/price_history.py
+"""
+Bulk export/import of PriceHawk price history as Parquet.
+
+Examples:
+    python scripts/price_history.py export --out exports/history
+    python scripts/price_history.py export --out exports/q1 --since 2024-01-01 --until 2024-04-01
+    python scripts/price_history.py import exports/history
+    python scripts/price_history.py retrain exports/history
+
+Exports are partitioned by month (month=YYYY-MM/part-NNNNN.parquet). retrain
+fits forecasts from an export instead of Mongo; they are marked as built from
+a snapshot, so the API refits them from live history before serving.
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app import create_app
+from jobs.tasks import retrain_forecasts_from_parquet
+from services.price_export import export_to_directory, import_from_parquet
+
+def _date(value):
+    return datetime.fromisoformat(value)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import price history as Parquet")
+    parser.add_argument("--batch-rows", type=int, default=None, help="Rows per Arrow record batch")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="Write month-partitioned Parquet files")
+    export.add_argument("--out", required=True, help="Output directory")
+    export.add_argument("--product-id", action="append", dest="product_ids", help="Limit to product (repeatable)")
+    export.add_argument("--since", type=_date, help="Inclusive start date (ISO)")
+    export.add_argument("--until", type=_date, help="Exclusive end date (ISO)")
+    export.add_argument("--source", help="Only products from this source")
+    export.add_argument("--category", help="Only products in this category")
+
+    backfill = commands.add_parser("import", help="Backfill history from Parquet files")
+    backfill.add_argument("path", help="Parquet file or export directory")
+
+    retrain = commands.add_parser("retrain", help="Fit forecasts from Parquet files instead of Mongo")
+    retrain.add_argument("path", help="Parquet file or export directory")
+
+    args = parser.parse_args(argv)
+    app = create_app()
+
+    with app.app_context():
+        batch_rows = args.batch_rows or app.config.get("PRICE_EXPORT_BATCH_ROWS", 50000)
+        if args.command == "export":
+            stats = export_to_directory(
+                app.db, args.out, batch_rows=batch_rows,
+                product_ids=args.product_ids, since=args.since, until=args.until,
+                source=args.source, category=args.category
+            )
+            print(f"📦 Exported {stats['rows']} points for {stats['products']} products into {stats['files']} files")
+        elif args.command == "retrain":
+            stats = retrain_forecasts_from_parquet(app, args.path)
+            if stats is None:
+                print("⏳ Forecast generation is running elsewhere; try again later")
+                return 1
+            print(f"🔮 Stored {stats['stored']} forecasts ({stats['skipped']} skipped, "
+                  f"{stats['routed_to_prophet']} refit with Prophet)")
+        else:
+            stats = import_from_parquet(app.db, args.path, batch_rows=batch_rows)
+            print(f"📥 Imported {stats['imported']} points for {stats['products']} products "
+                  f"({stats['skipped']} skipped)")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
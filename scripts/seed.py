@@ -3,8 +3,23 @@
 """
 Seed script for PriceHawk database.
 Creates sample users, products, and tracking data for testing.
+
+Examples:
+    python scripts/seed.py                                   # demo data only
+    python scripts/seed.py --products 100000 --users 1000    # plus a synthetic catalog
+
+    python scripts/seed.py --products 2000000 --users 200000 --workers 8
+
+The synthetic catalog (benchmarks/catalog.py) is deterministic by --seed
+and --now: multi-year price histories (archived past PRICE_HISTORY_HOT_DAYS,
+with rollups), users tracking a long-tailed number of mostly popular
+products, and their recent notifications. Products and users are generated
+in slices by parallel worker processes, each writing with batched
+insert_many. The load generator (python -m benchmarks.load) derives product
+and user ids from the same --seed, --products and --users.
 """
 
+import argparse
 import sys
 import os
 from datetime import datetime, timedelta
@@ -16,7 +31,100 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
 from app import create_app
 from core.security import hash_password
 
-def seed_database():
+# Collections the synthetic catalog writes
+CATALOG_COLLECTIONS = ("products", "price_rollups", "price_history_archive", "users", "user_tracking", "notifications")
+
+_worker = {}
+
+def _init_worker(mongo_uri, options):
+    from pymongo import MongoClient
+    # One client per process; connections are not shared across fork
+    _worker["db"] = MongoClient(mongo_uri).get_default_database()
+    _worker["options"] = options
+
+class _BatchWriter:
+    """Buffers documents per collection and writes them with insert_many."""
+    
+    def __init__(self, db, batch_size):
+        self.db = db
+        self.batch_size = batch_size
+        self.pending = {}
+        self.counts = {}
+    
+    def add(self, bundle):
+        for name, docs in bundle.items():
+            buffer = self.pending.setdefault(name, [])
+            buffer.extend(docs)
+            if len(buffer) >= self.batch_size:
+                self.flush(name)
+    
+    def flush(self, name=None):
+        for collection in ([name] if name else list(self.pending)):
+            docs = self.pending.pop(collection, [])
+            if docs:
+                self.db[collection].insert_many(docs, ordered=False)
+                self.counts[collection] = self.counts.get(collection, 0) + len(docs)
+        return self.counts
+
+def _seed_slice(task):
+    """Generate and insert one slice of products or users; returns counts per collection."""
+    from benchmarks.catalog import product_bundle, user_bundle
+    
+    kind, start, count = task
+    options = _worker["options"]
+    writer = _BatchWriter(_worker["db"], options["batch_size"])
+    for index in range(start, start + count):
+        if kind == "products":
+            writer.add(product_bundle(
+                options["seed"], index, options["now"], options["history_days"], options["changes_per_day"],
+                hot_days=options["hot_days"], rollups=options["rollups"]
+            ))
+        else:
+            writer.add(user_bundle(
+                options["seed"], index, options["products"], options["password_hash"], options["now"],
+                options["tracked_per_user"], options["notifications_per_tracker"], options["retention_days"]
+            ))
+    return writer.flush()
+
+def seed_catalog(mongo_uri, options, workers=None, slice_size=2000, progress=print):
+    """
+    Insert a synthetic catalog from parallel worker processes.
+    
+    Products and users are split into slices of slice_size; each worker
+    generates its slices (deterministically, from options["seed"] and the
+    index) and writes them with batched insert_many.
+    
+    Returns:
+        Dict: Documents inserted per collection
+    """
+    import multiprocessing
+    
+    tasks = [("products", s, min(slice_size, options["products"] - s))
+             for s in range(0, options["products"], slice_size)]
+    tasks += [("users", s, min(slice_size, options["users"] - s))
+              for s in range(0, options["users"], slice_size)]
+    totals = {}
+    started = datetime.utcnow()
+    
+    def merge(counts, done):
+        for name, count in counts.items():
+            totals[name] = totals.get(name, 0) + count
+        elapsed = max((datetime.utcnow() - started).total_seconds(), 1e-9)
+        progress(f"  [{done}/{len(tasks)}] products={totals.get('products', 0)} users={totals.get('users', 0)} "
+                 f"({round(sum(totals.values()) / elapsed)} docs/s)")
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(mongo_uri, options)
+        for done, task in enumerate(tasks, 1):
+            merge(_seed_slice(task), done)
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(mongo_uri, options)) as pool:
+            for done, counts in enumerate(pool.imap_unordered(_seed_slice, tasks), 1):
+                merge(counts, done)
+    return totals
+
+def seed_database(args=None):
     app = create_app()
     
     with app.app_context():
@@ -30,6 +138,8 @@ def seed_database():
         db.products.delete_many({})
         db.user_tracking.delete_many({})
         db.notifications.delete_many({})
+        db.price_rollups.delete_many({})
+        db.price_history_archive.delete_many({})
         
         # Create sample users
         print("Creating sample users...")
@@ -213,6 +323,54 @@ def seed_database():
         print(f"  Password: password123")
         print(f"\n  Email: john@example.com")
         print(f"  Password: password123")
+        
+        if args is not None and args.products:
+            from services.notifications import get_retention_days
+            
+            now = args.now or datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+            options = {
+                "seed": args.seed,
+                "now": now,
+                "products": args.products,
+                "users": args.users,
+                "history_days": args.history_days,
+                "changes_per_day": args.changes_per_day,
+                "hot_days": app.config.get("PRICE_HISTORY_HOT_DAYS", 180) if args.archive else None,
+                "rollups": args.rollups,
+                "tracked_per_user": args.tracked_per_user,
+                "notifications_per_tracker": args.notifications_per_tracker,
+                "retention_days": {t: get_retention_days(t) for t in ("price_drop", "back_in_stock")},
+                "password_hash": hash_password("password123"),
+                "batch_size": args.batch_size,
+            }
+            print(f"\n🏭 Creating synthetic catalog (seed {args.seed}, now {now.isoformat()})...")
+            counts = seed_catalog(app.config["MONGO_URI"], options, args.workers, args.slice_size)
+            for name in CATALOG_COLLECTIONS:
+                print(f"  {name}: {counts.get(name, 0)}")
+            print(f"  Synthetic users log in as loadtest<N>@pricehawk.test / password123")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed the PriceHawk database")
+    parser.add_argument("--products", type=int, default=0, help="Synthetic products to add (0: demo data only)")
+    parser.add_argument("--users", type=int, default=100, help="Synthetic users")
+    parser.add_argument("--seed", type=int, default=0, help="Catalog seed; the same seed yields the same data")
+    parser.add_argument("--now", type=datetime.fromisoformat, default=None,
+                        help="Reference time (ISO); defaults to today 00:00 UTC so reruns on a day match")
+    parser.add_argument("--history-days", type=int, default=3 * 365, help="Days of price history per product")
+    parser.add_argument("--changes-per-day", type=float, default=0.2, help="Mean price changes per product per day")
+    parser.add_argument("--no-archive", dest="archive", action="store_false",
+                        help="Keep all history in price_history instead of archiving points older than "
+                             "PRICE_HISTORY_HOT_DAYS")
+    parser.add_argument("--no-rollups", dest="rollups", action="store_false",
+                        help="Skip price_rollups (about two per price point); refresh_prices backfills them")
+    parser.add_argument("--tracked-per-user", type=float, default=20,
+                        help="Mean products tracked per user (lognormal; popular products get more trackers)")
+    parser.add_argument("--notifications-per-tracker", type=float, default=1,
+                        help="Mean notifications per tracker within retention")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--slice-size", type=int, default=2000, help="Products or users per worker task")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per insert_many")
+    seed_database(parser.parse_args(argv))
 
 if __name__ == "__main__":
-    seed_database()
+    main()